@@ -5,11 +5,16 @@ from .download_external_ti_resource import DownloadFalconTiResource
 from .job_request_resource import JobRequestResource
 from .job_setting_resource import JobSettingResource
 from .metric_processing_resource import MetricProcessingResource
+from .metric_service_resource import MetricServiceResource
 from .metric_task_resource import MetricTaskResource
+from .report_batch_error_export_resource import ReportBatchErrorExportResource
 from .report_batch_error_resource import ReportBatchErrorResource
+from .report_batch_error_summary_resource import ReportBatchErrorSummaryResource
 from .support_log_search_resource import SupportLogSearchResource
 from .task_resource import TaskResource
 from .task_status_resource import TaskStatusResource
 from .util.api_error import APIError
+from .util.app_pool import AppPool, AppPoolTimeout
 from .util.custom_error_handler import custom_error_handler
 from .util.redirect_resource import RedirectResource
+from .util.request_limiter import RequestLimiter, RequestLimitReached
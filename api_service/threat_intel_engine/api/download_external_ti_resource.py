@@ -104,7 +104,7 @@ class DownloadFalconTiResource(ResourceABC):
         # handle the conversion/processing, if the user selected the option in the UI
         if any([req.context.params.convert, req.context.params.enrich]):
             ti_transform: 'TransformABC' = convert_transform(self.settings, self.tcex)
-            transform = self.tcex.api.tc.ti_transforms(response_media, ti_transform.transform)
+            transform = ti_transform.ti_transforms(response_media)
             response_media = transform.batch
 
             # handle sending the TI object to the batch API,
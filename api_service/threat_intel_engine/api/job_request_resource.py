@@ -8,11 +8,11 @@ import arrow
 import falcon
 from api.resource_abc import ResourceABC
 from model import FilterParamPaginatedModel, JobRequestModel
+from more.datetime_util import any_to_datetime
 from pydantic import BaseModel, Field, validator
 from schema import JobRequestSchema
 from sqlalchemy import func
 from sqlalchemy.orm import Query
-from tcex.utils import Utils
 
 
 class GetQueryParamModel(FilterParamPaginatedModel):
@@ -36,7 +36,7 @@ class PostBodyModel(BaseModel, arbitrary_types_allowed=True):
 
         All date inputs are assumed to be in UTC.
         """
-        return Utils().any_to_datetime(value, 'UTC')
+        return any_to_datetime(value, 'UTC')
 
 
 # pylint: disable=unused-argument
@@ -95,13 +95,16 @@ class JobRequestResource(ResourceABC):
         sort = self._db_sort(req.context.params, JobRequestSchema, default_sort='request_id')
         paginator = self._db_paginator(query, req, sort)
 
-        # generate and return the response
-        resp.media = self.response_media(
-            req,
-            self._db_result_get(paginator.query),
-            JobRequestModel,
-            req.context.params,
-            paginator,
+        # generate and stream the response (job request pages are the largest in the UI)
+        self.response_stream(
+            resp,
+            self.response_media(
+                req,
+                self._db_result_get(paginator.query),
+                JobRequestModel,
+                req.context.params,
+                paginator,
+            ),
         )
 
     def on_post(self, req: 'falcon.Request', resp: 'falcon.Response'):
@@ -6,6 +6,7 @@ from typing import List
 import falcon
 from model import FilterParamPaginatedModel, TiProcessingMetricModel
 from schema import TiProcessingMetricSchema
+from sqlalchemy import func
 from sqlalchemy.orm import Query
 
 from .resource_abc import ResourceABC
@@ -23,6 +24,14 @@ class MetricProcessingResource(ResourceABC):
         },
     }
 
+    def cache_version(self, _req: falcon.Request, _params: dict) -> str:
+        """Return the version token for HttpCacheMiddleware."""
+        date_last_updated, count = self.session.query(
+            func.max(TiProcessingMetricSchema.date_last_updated),
+            func.count(TiProcessingMetricSchema.id),
+        ).one()
+        return f'{date_last_updated}|{count}'
+
     def _db_query_get(self) -> Query:
         """Return DB query."""
         return self.session.query(TiProcessingMetricSchema)
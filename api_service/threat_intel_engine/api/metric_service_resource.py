@@ -0,0 +1,14 @@
+"""Class for /api/metric/service endpoint"""
+# third-party
+import falcon
+
+from .resource_abc import ResourceABC
+
+
+# pylint: disable=unused-argument
+class MetricServiceResource(ResourceABC):
+    """Class for /api/metric/service endpoint"""
+
+    def on_get(self, _req: falcon.Request, resp: falcon.Response):
+        """Handle GET requests."""
+        resp.media = self.service_metrics()
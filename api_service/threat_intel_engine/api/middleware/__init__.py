@@ -1,8 +1,10 @@
 """Middleware"""
 
 # flake8:noqa
+from .compression_middleware import CompressionMiddleware
 from .db_middleware import DbMiddleware
 from .error_middleware import ErrorMiddleware
+from .http_cache_middleware import HttpCacheMiddleware
 from .injectables_middleware import InjectablesMiddleware
 from .tcex_middleware import TcExMiddleware
 from .validation_middleware import ValidationMiddleware
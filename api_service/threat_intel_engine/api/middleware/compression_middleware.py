@@ -0,0 +1,148 @@
+"""Response compression middleware."""
+# standard library
+import logging
+import zlib
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Tuple
+
+# third-party
+from api.middleware.middleware_abc import MiddlewareABC
+
+try:
+    # third-party
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+if TYPE_CHECKING:
+    # third-party
+    import falcon
+
+logger = logging.getLogger('tcex')
+
+
+# pylint: disable=unused-argument
+class CompressionMiddleware(MiddlewareABC):
+    """Compress responses (br or gzip) negotiated using the Accept-Encoding header.
+
+    Bodies built from text/data/media are only compressed when larger than minimum_size. Stream
+    bodies (e.g., streamed JSON, static files) are compressed chunk by chunk as the WSGI server
+    consumes them, so the plain body is not built in full before it is compressed (the tcex
+    API service still joins the compressed chunks into a single body).
+
+    Brotli is only offered when the optional "brotli" package is installed.
+
+    Note: this middleware must be the first middleware so that its process_response runs last.
+    """
+
+    chunk_size = 65_536
+    compressible_types = (
+        'application/javascript',
+        'application/json',
+        'application/x-ndjson',
+        'image/svg+xml',
+        'text/',
+    )
+
+    def __init__(self, minimum_size: int = 1_024, gzip_level: int = 6, brotli_quality: int = 5):
+        """Initialize class properties."""
+        self.brotli_quality = brotli_quality
+        self.gzip_level = gzip_level
+        self.minimum_size = minimum_size
+
+        # br is preferred when the client supports both
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def _compressor(self, encoding: str) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+        """Return the compress and flush methods for the encoding."""
+        if encoding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            return compressor.process, compressor.finish
+
+        # wbits=31 -> gzip header and trailer
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush
+
+    def _iter_compressed(self, stream: object, encoding: str) -> Iterator[bytes]:
+        """Yield the compressed chunks of a file-like or iterable stream."""
+        compress, flush = self._compressor(encoding)
+        if hasattr(stream, 'read'):
+            chunks = iter(lambda: stream.read(self.chunk_size), b'')
+        else:
+            chunks = stream
+
+        try:
+            for chunk in chunks:
+                data = compress(chunk)
+                if data:
+                    yield data
+            yield flush()
+        finally:
+            if hasattr(stream, 'close'):
+                stream.close()
+
+    def _negotiate(self, req: 'falcon.Request') -> Optional[str]:
+        """Return the best encoding supported by both the client and the server."""
+        accept_encoding = req.get_header('Accept-Encoding')
+        if not accept_encoding:
+            return None
+
+        accepted = {}
+        for coding in accept_encoding.lower().split(','):
+            name, _, params = coding.strip().partition(';')
+            quality = 1.0
+            if params.strip().startswith('q='):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    quality = 0.0
+            accepted[name.strip()] = quality
+
+        for encoding in self.encodings:
+            if accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return encoding
+        return None
+
+    def process_response(
+        self, req: 'falcon.Request', resp: 'falcon.Response', resource: object, req_succeeded: bool
+    ):
+        """Compress the response body."""
+        if req.method == 'HEAD' or not resp.status.startswith('200'):
+            return
+
+        if resp.get_header('Content-Encoding') is not None:
+            return
+
+        # falcon applies the default media type when the body is rendered
+        content_type = (resp.content_type or resp.options.default_media_type).lower()
+        if not content_type.startswith(self.compressible_types):
+            return
+
+        # the response varies on Accept-Encoding whether or not this response is compressed
+        resp.append_header('Vary', 'Accept-Encoding')
+
+        encoding = self._negotiate(req)
+        if encoding is None:
+            return
+
+        if resp.stream is not None:
+            resp.stream = self._iter_compressed(resp.stream, encoding)
+            resp.content_length = None
+        else:
+            body = resp.render_body()
+            if body is None or len(body) < self.minimum_size:
+                return
+
+            compress, flush = self._compressor(encoding)
+            resp.data = compress(body) + flush()
+            # media/text take precedence over data when the body is rendered
+            resp.media = None
+            resp.text = None
+
+        resp.set_header('Content-Encoding', encoding)
+
+        # the compressed representation is not byte for byte equal, downgrade strong ETags
+        etag = resp.get_header('ETag')
+        if etag is not None and not etag.startswith('W/'):
+            resp.set_header('ETag', f'W/{etag}')
+
+        logger.debug(f'event=compress-response, encoding={encoding}, path={req.path}')
@@ -0,0 +1,102 @@
+"""HTTP caching (ETag) middleware."""
+# standard library
+import hashlib
+import io
+import logging
+import os
+from typing import TYPE_CHECKING, Optional
+
+# third-party
+import falcon
+from api.middleware.middleware_abc import MiddlewareABC
+
+if TYPE_CHECKING:
+    # standard library
+    from typing import Dict
+
+logger = logging.getLogger('tcex')
+
+
+# pylint: disable=unused-argument
+class HttpCacheMiddleware(MiddlewareABC):
+    """Emit ETags for read-mostly resources and answer conditional requests with a 304.
+
+    A resource opts in by defining a cheap "cache_version(req, params)" method that returns a
+    version token (or None to disable caching for the request). The token must change whenever
+    the response for the request would change. The ETag is a hash of the token and the request
+    path/query string, so the full payload is only built and serialized when it changed.
+
+    Static (UI) files are handled in process_response using the size and mtime of the file.
+    """
+
+    cacheable_methods = ('GET', 'HEAD')
+
+    @staticmethod
+    def _etag(*parts: str) -> str:
+        """Return a quoted ETag for the provided parts."""
+        return f'"{hashlib.sha1("|".join(parts).encode()).hexdigest()[:20]}"'
+
+    @staticmethod
+    def _is_match(req: 'falcon.Request', etag: str) -> bool:
+        """Return True if the If-None-Match header of the request matches the ETag."""
+        if_none_match = req.if_none_match
+        if not if_none_match:
+            return False
+        # falcon returns the etag value without the enclosing quotes
+        return any(tag == '*' or f'"{tag}"' == etag for tag in if_none_match)
+
+    @staticmethod
+    def _not_modified(resp: 'falcon.Response', etag: str):
+        """Update the response to a 304 Not Modified."""
+        resp.status = falcon.HTTP_304
+        resp.content_type = None
+        resp.etag = etag
+        resp.cache_control = ['no-cache']
+
+    def process_resource(
+        self, req: 'falcon.Request', resp: 'falcon.Response', resource: object, params: 'Dict'
+    ):
+        """Short-circuit the request with a 304 when the version token has not changed."""
+        if req.method not in self.cacheable_methods or not hasattr(resource, 'cache_version'):
+            return
+
+        token: Optional[str] = resource.cache_version(req, params)
+        if token is None:
+            return
+
+        etag = self._etag(req.path, req.query_string, token)
+        req.context.etag = etag
+        if self._is_match(req, etag):
+            self._not_modified(resp, etag)
+            # skip the responder, process_response is still run for all middleware
+            resp.complete = True
+
+    def process_response(
+        self, req: 'falcon.Request', resp: 'falcon.Response', resource: object, req_succeeded: bool
+    ):
+        """Add the ETag to successful responses."""
+        if req.method not in self.cacheable_methods or req_succeeded is not True:
+            return
+
+        etag: Optional[str] = req.context.get('etag')
+        if etag is not None:
+            if resp.status == falcon.HTTP_200:
+                resp.etag = etag
+                resp.cache_control = ['no-cache']
+            return
+
+        # static files (the UI) are served from a static route, which has no resource
+        if resource is None and isinstance(resp.stream, io.BufferedReader):
+            try:
+                stat = os.fstat(resp.stream.fileno())
+            except (OSError, ValueError):
+                return
+
+            etag = self._etag(resp.stream.name, str(stat.st_size), str(stat.st_mtime_ns))
+            if self._is_match(req, etag):
+                resp.stream.close()
+                resp.stream = None
+                self._not_modified(resp, etag)
+            else:
+                resp.etag = etag
+                resp.cache_control = ['no-cache']
@@ -4,13 +4,16 @@ from typing import TYPE_CHECKING
 
 # third-party
 from more.validation import (
+    compile_validation_plans,
     response_media,
+    response_stream,
     validate_request_body,
     validate_request_form_data,
     validate_request_headers,
     validate_request_query_params,
     validate_response_body,
     validate_response_headers,
+    validation_plan,
 )
 
 if TYPE_CHECKING:
@@ -20,26 +23,46 @@ if TYPE_CHECKING:
 
 # pylint: disable=unused-argument
 class ValidationMiddleware:
-    """Request and Response validation middleware."""
+    """Request and Response validation middleware.
+
+    The validation_models of each resource are compiled into a validation plan once per
+    resource class and method (see compile_resource), and the cached plan is reused for
+    every request.
+    """
+
+    @staticmethod
+    def compile_resource(resource: object):
+        """Compile the validation plans for the resource when the route is added."""
+        compile_validation_plans(resource)
 
     def process_resource(
         self, req: 'falcon.Request', _resp: 'falcon.Response', resource: object, _param: dict
     ):
         """Process resource method."""
-        # inject response_media method in resource
+        # inject response_media and response_stream methods in resource
         resource.response_media = response_media
+        resource.response_stream = response_stream
 
         # validate request using defined models
-        if hasattr(resource, 'validation_models') and isinstance(resource.validation_models, dict):
-            # get the request validation
-            models = resource.validation_models.get(req.method, {}).get('request', {})
+        plan = validation_plan(resource, req.method)
+        if plan is None:
+            return
 
-            validate_request_body(req, models.get('body'))
-            validate_request_headers(req, models.get('headers'))
-            validate_request_query_params(req, models.get('query_params'))
+        if plan.request_body is not None:
+            validate_request_body(req, plan.request_body, plan.request_body_list)
+        if plan.request_headers is not None:
+            validate_request_headers(req, plan.request_headers)
+        if plan.request_query_params is not None:
+            validate_request_query_params(req, plan.request_query_params)
 
-            if req.content_type and 'multipart/form-data' in req.content_type:
-                validate_request_form_data(req, models.get('form_data'))
+        if (
+            plan.request_form_data is not None
+            and req.content_type
+            and 'multipart/form-data' in req.content_type
+        ):
+            validate_request_form_data(
+                req, plan.request_form_data, plan.request_form_data_binary_fields
+            )
 
     def process_response(
         self, req: 'falcon.Request', resp: 'falcon.Response', resource: object, _req_succeeded: bool
@@ -47,13 +70,12 @@ class ValidationMiddleware:
         """Process response method."""
 
         # validate request using defined models
-        if (
-            hasattr(resource, 'validation_models')
-            and isinstance(resource.validation_models, dict)
-            and _req_succeeded is True
-        ):
-            # get the request validation
-            models = resource.validation_models.get(req.method, {}).get('response', {})
+        if resource is None or _req_succeeded is not True:
+            return
+
+        plan = validation_plan(resource, req.method)
+        if plan is None or not plan.has_response:
+            return
 
-            validate_response_body(req, resp, models.get('body'))
-            validate_response_headers(req, resp, models.get('headers'))
+        validate_response_body(req, resp, plan.response_body)
+        validate_response_headers(req, resp, plan.response_headers)
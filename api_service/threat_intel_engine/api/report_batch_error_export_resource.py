@@ -0,0 +1,141 @@
+"""Class for /api/report/batch-error/export endpoint"""
+# standard library
+import csv
+import io
+from datetime import datetime
+from enum import Enum
+from typing import Iterator, Optional
+
+# third-party
+import arrow
+import falcon
+from api.resource_abc import ResourceABC
+from more import engine
+from more.json_util import json_dumps
+from pydantic import BaseModel, Extra, Field
+from schema import BatchErrorSchema
+from sqlalchemy import select
+from sqlalchemy.sql import Select
+
+
+class ExportFormat(str, Enum):
+    """Enum for possible export formats."""
+
+    csv = 'csv'
+    ndjson = 'ndjson'
+
+
+class GetQueryParamModel(BaseModel, extra=Extra.forbid):
+    """Params Model"""
+
+    date_added_end: Optional[datetime] = Field(
+        None, description='Only export errors added before this date.'
+    )
+    date_added_start: Optional[datetime] = Field(
+        None, description='Only export errors added on or after this date.'
+    )
+    format: ExportFormat = Field(ExportFormat.csv, description='The export format: csv|ndjson.')
+    request_id: Optional[str] = Field(None, description='Filter by Request ID.')
+
+
+# pylint: disable=unused-argument
+class ReportBatchErrorExportResource(ResourceABC):
+    """Class for /api/report/batch-error/export endpoint
+
+    Stream the matching batch errors as CSV or NDJSON. Rows are read from the DB and encoded
+    in partitions of partition_size as the response is consumed.
+
+    The tcex API service joins the chunks into a single body (pairwise, the cost grows with the
+    square of the chunk count) and stores it as one Redis value, so the full export is held in
+    memory. The export is capped at max_rows rows, filter on request_id or date_added to export
+    more errors.
+    """
+
+    columns = [
+        BatchErrorSchema.id,
+        BatchErrorSchema.request_id,
+        BatchErrorSchema.date_added,
+        BatchErrorSchema.code,
+        BatchErrorSchema.message,
+        BatchErrorSchema.reason,
+    ]
+    content_types = {
+        ExportFormat.csv: 'text/csv',
+        ExportFormat.ndjson: 'application/x-ndjson',
+    }
+    max_rows = 100_000
+    partition_size = 1_000
+
+    validation_models = {
+        'GET': {
+            'request': {
+                'query_params': GetQueryParamModel,
+            }
+        }
+    }
+
+    def _db_select_get(self, params: GetQueryParamModel) -> Select:
+        """Return DB select statement."""
+        statement = select(*self.columns).order_by(BatchErrorSchema.id).limit(self.max_rows)
+
+        # filter on request id
+        if params.request_id is not None:
+            statement = statement.where(BatchErrorSchema.request_id == params.request_id)
+
+        # filter on date added
+        if params.date_added_start is not None:
+            statement = statement.where(
+                BatchErrorSchema.date_added >= arrow.get(params.date_added_start).to('utc')
+            )
+        if params.date_added_end is not None:
+            statement = statement.where(
+                BatchErrorSchema.date_added < arrow.get(params.date_added_end).to('utc')
+            )
+
+        return statement
+
+    def _iter_rows(self, statement: Select, export_format: ExportFormat) -> Iterator[bytes]:
+        """Yield the encoded rows, one chunk per DB partition.
+
+        The generator owns its DB connection (the request session is closed once the
+        responder returns), the connection is closed when the stream is exhausted or closed.
+        """
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(statement)
+
+            if export_format == ExportFormat.csv:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow([c.name for c in self.columns])
+                for partition in result.partitions(self.partition_size):
+                    writer.writerows(
+                        [
+                            row.id,
+                            row.request_id,
+                            row.date_added.isoformat() if row.date_added else None,
+                            row.code,
+                            row.message,
+                            row.reason,
+                        ]
+                        for row in partition
+                    )
+                    yield buffer.getvalue().encode()
+                    buffer.seek(0)
+                    buffer.truncate()
+
+                # header only export
+                if buffer.tell():
+                    yield buffer.getvalue().encode()
+            else:
+                for partition in result.partitions(self.partition_size):
+                    yield b''.join(json_dumps(dict(row._mapping)) + b'\n' for row in partition)
+
+    def on_get(self, req: falcon.Request, resp: falcon.Response):
+        """Handle GET requests."""
+        params: GetQueryParamModel = req.context.params
+        statement = self._db_select_get(params)
+
+        filename = f'batch-errors-{params.request_id or "all"}.{params.format.value}'
+        resp.content_type = self.content_types[params.format]
+        resp.downloadable_as = filename
+        resp.stream = self._iter_rows(statement, params.format)
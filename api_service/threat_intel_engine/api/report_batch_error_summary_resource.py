@@ -0,0 +1,97 @@
+"""Class for /api/report/batch-error/summary endpoint"""
+# standard library
+from typing import Dict, List, Optional, Tuple
+
+# third-party
+import falcon
+from api.resource_abc import ResourceABC
+from model import BatchErrorSummaryModel, FilterParamModel
+from pydantic import Field
+from schema import BatchErrorSummarySchema
+from sqlalchemy.orm import Query
+
+
+class GetQueryParamModel(FilterParamModel):
+    """Params Model"""
+
+    request_id: Optional[str] = Field(None, description='Filter by Request ID.')
+
+
+# pylint: disable=unused-argument
+class ReportBatchErrorSummaryResource(ResourceABC):
+    """Class for /api/report/batch-error/summary endpoint
+
+    Return the batch error occurrence counts by code and reason template, across all requests
+    or for a single request. Requires batch_error_storage to be "summary" or "both".
+    """
+
+    validation_models = {
+        'GET': {
+            'request': {
+                'query_params': GetQueryParamModel,
+            }
+        }
+    }
+
+    def _db_query_get(self, request_id: Optional[str]) -> Query:
+        """Return DB query."""
+        query = self.session.query(
+            BatchErrorSummarySchema.code,
+            BatchErrorSummarySchema.count,
+            BatchErrorSummarySchema.message,
+            BatchErrorSummarySchema.reason_template,
+            BatchErrorSummarySchema.request_id,
+            BatchErrorSummarySchema.samples,
+        )
+
+        # filter on request id
+        if request_id is not None:
+            query = query.filter(BatchErrorSummarySchema.request_id == request_id)
+
+        return query
+
+    def _db_result_get(self, query: Query) -> List[dict]:
+        """Return the summaries aggregated by code and reason template.
+
+        The rows are aggregated here rather than with GROUP BY, the samples are JSON lists
+        that are merged (up to batch_error_samples distinct reasons), not compared.
+        """
+        summaries: Dict[Tuple[str, str], dict] = {}
+        for row in self._db_get_record(
+            query, 'all', 'Unexpected error occurred while retrieving Batch Error summary.'
+        ):
+            summary = summaries.get((row.code, row.reason_template))
+            if summary is None:
+                summary = summaries[(row.code, row.reason_template)] = {
+                    'code': row.code,
+                    'count': 0,
+                    'message': row.message,
+                    'reason_template': row.reason_template,
+                    'request_ids': set(),
+                    'samples': [],
+                }
+            summary['count'] += row.count
+            summary['message'] = summary['message'] or row.message
+            summary['request_ids'].add(row.request_id)
+            for sample in row.samples or []:
+                if len(summary['samples']) >= self.settings.batch_error_samples:
+                    break
+                if sample not in summary['samples']:
+                    summary['samples'].append(sample)
+
+        for summary in summaries.values():
+            summary['request_count'] = len(summary.pop('request_ids'))
+        return sorted(summaries.values(), key=lambda s: s['count'], reverse=True)
+
+    def on_get(self, req: falcon.Request, resp: falcon.Response):
+        """Handle GET requests."""
+        query = self._db_query_get(req.context.params.request_id)
+
+        # generate and return the response
+        resp.media = self.response_media(
+            req,
+            self._db_result_get(query),
+            BatchErrorSummaryModel,
+            req.context.params,
+            from_orm=False,
+        )
@@ -31,6 +31,8 @@ class ResourceABC(ABC):
     error = callable
     log: 'logging.Logger' = logger
     response_media = callable  # more->validation->response_media
+    response_stream = callable  # more->validation->response_stream
+    service_metrics = callable  # api_service_falcon->service_metrics
     session: 'scoped_session'
     settings: 'SettingsModel'
     tasks: 'Tasks'
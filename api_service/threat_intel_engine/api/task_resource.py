@@ -1,6 +1,7 @@
 """Class for /api/task endpoint"""
 # standard library
 import logging
+import time
 from typing import Optional
 
 # third-party
@@ -32,11 +33,40 @@ class TaskResource(ResourceABC):
         }
     }
 
+    # seconds a cached response is valid while a task is running (e.g., expires_percent)
+    cache_running_seconds = 15
+
     def __init__(self):
         """Initialize."""
         super().__init__()
         self.log = logger
 
+    def cache_version(self, _req: 'falcon.Request', _params: dict) -> str:
+        """Return the version token for HttpCacheMiddleware."""
+        running = False
+        state = []
+        for task in self.tasks.all():
+            pid = None
+            if task.process is not None and task.process.is_alive():
+                pid = task.process.pid
+                running = True
+            state.append(
+                (
+                    task.task_settings.name,
+                    task.task_settings.paused,
+                    task.task_settings.paused_file,
+                    task.task_settings.paused_file_global,
+                    pid,
+                    # e.g., the throttle limit, evaluated in this process even when idle
+                    repr(task.controllers),
+                )
+            )
+
+        if running is True:
+            # process metadata (e.g., heartbeat) changes continuously while running
+            state.append(int(time.time() // self.cache_running_seconds))
+        return repr(state)
+
     # pylint: disable=W0613
     def on_get(
         self, _req: 'falcon.Request', resp: 'falcon.Response', task_name: 'Optional[str]' = None
@@ -18,6 +18,11 @@ class TaskStatusResource(ResourceABC):
     Return the possible status options for a task.
     """
 
+    def cache_version(self, _req: 'falcon.Request', _params: dict) -> str:
+        """Return the version token for HttpCacheMiddleware."""
+        # the status options only depend on the (static) task definitions
+        return ','.join(task.task_settings.name for task in self.tasks.all())
+
     def on_get(self, _req: 'falcon.Request', resp: 'falcon.Response'):
         """Handle GET requests."""
         status = []
@@ -0,0 +1,105 @@
+"""Falcon App Pool Module"""
+# standard library
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Iterator
+
+if TYPE_CHECKING:
+    # third-party
+    import falcon
+
+# logger
+logger = logging.getLogger('tcex')
+
+
+class AppPoolTimeout(RuntimeError):
+    """Raised when no app could be checked out of the pool before the timeout."""
+
+
+class AppPool:
+    """Bounded pool of falcon app objects.
+
+    Requests check out an app, blocking (up to timeout seconds) when every app is in use,
+    instead of spinning over the pool. Apps are returned LIFO so the most recently used
+    (warm) apps are handed out first.
+    """
+
+    def __init__(self, factory: Callable[[], 'falcon.App'], size: int, timeout: float):
+        """Initialize class properties."""
+        self.size = size
+        self.timeout = timeout
+
+        # properties
+        self._apps: 'queue.LifoQueue[falcon.App]' = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        for _ in range(size):
+            self._apps.put(factory())
+
+        # metrics
+        self._checkout_count = 0
+        self._in_use = 0
+        self._in_use_max = 0
+        self._timeout_count = 0
+        self._wait_count = 0
+        self._wait_seconds_max = 0.0
+        self._wait_seconds_total = 0.0
+
+    @contextmanager
+    def checkout(self) -> Iterator['falcon.App']:
+        """Check out an app from the pool, returning it when the context exits."""
+        start = time.perf_counter()
+        waited = False
+        try:
+            app = self._apps.get_nowait()
+        except queue.Empty:
+            waited = True
+            try:
+                app = self._apps.get(timeout=self.timeout)
+            except queue.Empty as ex:
+                with self._lock:
+                    self._timeout_count += 1
+                logger.warning(
+                    f'feature=app-pool, event=checkout-timeout, size={self.size}, '
+                    f'timeout={self.timeout}'
+                )
+                raise AppPoolTimeout(
+                    f'No app available in pool after {self.timeout} seconds.'
+                ) from ex
+
+        wait_seconds = time.perf_counter() - start
+        with self._lock:
+            self._checkout_count += 1
+            self._in_use += 1
+            self._in_use_max = max(self._in_use_max, self._in_use)
+            if waited is True:
+                self._wait_count += 1
+                self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+                self._wait_seconds_total += wait_seconds
+
+        try:
+            yield app
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._apps.put(app)
+
+    @property
+    def metrics(self) -> dict:
+        """Return the pool utilization metrics."""
+        with self._lock:
+            return {
+                'checkout_count': self._checkout_count,
+                'in_use': self._in_use,
+                'in_use_max': self._in_use_max,
+                'size': self.size,
+                'timeout_count': self._timeout_count,
+                'utilization_percent': round(self._in_use / self.size * 100, 2),
+                'wait_count': self._wait_count,
+                'wait_seconds_average': (
+                    round(self._wait_seconds_total / self._wait_count, 6) if self._wait_count else 0
+                ),
+                'wait_seconds_max': round(self._wait_seconds_max, 6),
+            }
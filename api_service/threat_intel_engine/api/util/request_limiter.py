@@ -0,0 +1,110 @@
+"""API Request Limiter Module"""
+# standard library
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+# logger
+logger = logging.getLogger('tcex')
+
+
+class RequestLimitReached(RuntimeError):
+    """Raised when the maximum number of concurrent requests are already in flight."""
+
+
+class LatencyHistogram:
+    """Thread safe latency histogram with fixed millisecond buckets."""
+
+    buckets = (5, 10, 25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000)
+
+    def __init__(self):
+        """Initialize class properties."""
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._max_ms = 0.0
+        self._sum_ms = 0.0
+
+    def observe(self, ms: float):
+        """Record a single observation."""
+        index = next((i for i, b in enumerate(self.buckets) if ms <= b), len(self.buckets))
+        with self._lock:
+            self._counts[index] += 1
+            self._count += 1
+            self._max_ms = max(self._max_ms, ms)
+            self._sum_ms += ms
+
+    @property
+    def metrics(self) -> dict:
+        """Return the histogram as a dict of bucket upper bound (ms) to count."""
+        with self._lock:
+            return {
+                'average_ms': round(self._sum_ms / self._count, 3) if self._count else 0,
+                'buckets': dict(zip([str(b) for b in self.buckets] + ['+Inf'], self._counts)),
+                'count': self._count,
+                'max_ms': round(self._max_ms, 3),
+            }
+
+
+class RequestLimiter:
+    """Admission control for the API requests.
+
+    The tcex API service runs every request on its request thread pool (5 threads), and
+    requests beyond that wait in the pool's unbounded queue. The limit is kept below the number
+    of request threads, so while limit requests are in flight (e.g., behind a locked SQLite DB)
+    a thread is still free to take the queued requests and reject them at once (503) instead of
+    letting them wait.
+    """
+
+    def __init__(self, limit: int):
+        """Initialize class properties."""
+        self.limit = limit
+
+        # properties
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(limit)
+
+        # metrics
+        self._admitted_count = 0
+        self._in_flight = 0
+        self._in_flight_max = 0
+        self._rejected_count = 0
+        self.latency = LatencyHistogram()
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """Admit the request for the duration of the context, raise when the limit is reached."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected_count += 1
+            logger.warning(f'feature=request-limiter, event=limit-reached, limit={self.limit}')
+            raise RequestLimitReached('The API service is busy, retry the request shortly.')
+
+        start = time.perf_counter()
+        with self._lock:
+            self._admitted_count += 1
+            self._in_flight += 1
+            self._in_flight_max = max(self._in_flight_max, self._in_flight)
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            self.latency.observe((time.perf_counter() - start) * 1_000)
+
+    @property
+    def metrics(self) -> dict:
+        """Return the limiter metrics."""
+        with self._lock:
+            return {
+                'admitted_count': self._admitted_count,
+                'in_flight': self._in_flight,
+                'in_flight_max': self._in_flight_max,
+                'latency_ms': self.latency.metrics,
+                'limit': self.limit,
+                'rejected_count': self._rejected_count,
+            }
@@ -1,18 +1,19 @@
 """ThreatConnect API Service Falcon API"""
 # standard library
-import itertools
-import json
 import logging
 import os
-import threading
-from datetime import datetime
-from functools import partial
 
 # third-party
-import arrow
 import falcon
-from api import custom_error_handler
-from api.middleware import DbMiddleware, ErrorMiddleware, TcExMiddleware, ValidationMiddleware
+from api import AppPool, AppPoolTimeout, RequestLimiter, RequestLimitReached, custom_error_handler
+from api.middleware import (
+    CompressionMiddleware,
+    DbMiddleware,
+    ErrorMiddleware,
+    TcExMiddleware,
+    ValidationMiddleware,
+)
+from more.json_util import json_dumps, json_loads
 from tcex import TraceLogger
 from tcex.backports import cached_property
 
@@ -22,18 +23,6 @@ from api_service_app import ApiServiceApp
 logger = logging.getLogger('tcex')
 
 
-class DatetimeEncoder(json.JSONEncoder):
-    """Json Encoder that supports datetime objects."""
-
-    def default(self, o):
-        """Set default encoding for datetime objects."""
-        if isinstance(o, datetime):
-            return o.isoformat()
-        if isinstance(o, arrow.Arrow):
-            return o.isoformat()
-        return super().default(o)
-
-
 class ApiServiceFalcon(ApiServiceApp):
     """ThreatConnect API Service Falcon API"""
 
@@ -43,6 +32,9 @@ class ApiServiceFalcon(ApiServiceApp):
 
         # properties
         self._ui_files = os.path.join(os.getcwd(), 'ui_build')
+        self.app_pool_size = 6
+        self.app_pool_timeout = 30
+        self.max_concurrent_requests = 4
         self.log: 'TraceLogger' = logger
 
     def build_falcon_app(self):
@@ -56,12 +48,21 @@ class ApiServiceFalcon(ApiServiceApp):
         self._configure_app(app)
         return app
 
+    @staticmethod
+    def add_route(app: 'falcon.App', uri_template: str, resource: object, **kwargs):
+        """Add a route to the app and compile the validation plans for the resource.
+
+        Compiling at app construction keeps model introspection (e.g., schema lookups for
+        binary form fields) out of the request path.
+        """
+        app.add_route(uri_template, resource, **kwargs)
+        ValidationMiddleware.compile_resource(resource)
+
     @staticmethod
     def _add_media_handlers(app):
         """Add API handlers."""
-        json_handler = falcon.media.JSONHandler(
-            dumps=partial(json.dumps, cls=DatetimeEncoder),
-        )
+        # orjson is used when available, see more.json_util
+        json_handler = falcon.media.JSONHandler(dumps=json_dumps, loads=json_loads)
         extra_handlers = {
             'application/json': json_handler,
         }
@@ -107,6 +108,8 @@ class ApiServiceFalcon(ApiServiceApp):
     def _middleware(self) -> list:
         """Return the Falcon middleware."""
         return [
+            # must be first, process_response is called in reverse order
+            CompressionMiddleware(),
             TcExMiddleware(self.inputs.model, self.tcex),
             DbMiddleware(),
             ErrorMiddleware(),
@@ -114,22 +117,54 @@ class ApiServiceFalcon(ApiServiceApp):
         ]
 
     @cached_property
-    def app_pool(self):
-        """Create a pool of WSGI objects to handle requests."""
-        return itertools.cycle([(threading.Lock(), self.build_falcon_app()) for _ in range(6)])
+    def app_pool(self) -> AppPool:
+        """Create a pool of WSGI objects to handle requests.
 
-    def api_event_callback(self, environ, response_handler):
-        """Create the API"""
-        lock, app = next(self.app_pool)
+        Falcon apps are not shared between threads, the middleware injects per request state
+        (e.g., the DB session) onto the resource objects of the app. Each in-flight request
+        checks out its own app from a bounded pool.
+        """
+        return AppPool(self.build_falcon_app, self.app_pool_size, self.app_pool_timeout)
+
+    @staticmethod
+    def _service_unavailable(response_handler, description: str) -> list:
+        """Return a 503 response without using a falcon app."""
+        body = json_dumps({'description': description, 'title': 'Service Unavailable'})
+        response_handler(
+            falcon.HTTP_503,
+            [
+                ('Content-Type', falcon.MEDIA_JSON),
+                ('Content-Length', str(len(body))),
+                ('Retry-After', '1'),
+            ],
+        )
+        return [body]
+
+    @cached_property
+    def request_limiter(self) -> RequestLimiter:
+        """Return the admission control for the requests run on the tcex request threads."""
+        return RequestLimiter(self.max_concurrent_requests)
 
-        # iterate through the app pool until we get an available app
-        while not lock.acquire(blocking=False):
-            lock, app = next(self.app_pool)
+    def _handle_request(self, environ, response_handler):
+        """Handle a single request using an app from the app pool."""
         try:
-            self.log.trace(f'feature=api-service, event=event-callback, app={id(app)}')
-            if not environ['PATH_INFO'].startswith('/'):
-                environ['PATH_INFO'] = '/' + environ['PATH_INFO']
+            with self.app_pool.checkout() as app:
+                self.log.trace(f'feature=api-service, event=event-callback, app={id(app)}')
+                if not environ['PATH_INFO'].startswith('/'):
+                    environ['PATH_INFO'] = '/' + environ['PATH_INFO']
+
+                return app(environ, response_handler)
+        except AppPoolTimeout as ex:
+            return self._service_unavailable(response_handler, str(ex))
 
-            return app(environ, response_handler)
-        finally:
-            lock.release()
+    def api_event_callback(self, environ, response_handler):
+        """Create the API"""
+        try:
+            with self.request_limiter.admit():
+                return self._handle_request(environ, response_handler)
+        except RequestLimitReached as ex:
+            return self._service_unavailable(response_handler, str(ex))
+
+    def service_metrics(self) -> dict:
+        """Return the API service metrics."""
+        return {'app_pool': self.app_pool.metrics, 'request_limiter': self.request_limiter.metrics}
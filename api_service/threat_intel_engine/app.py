@@ -1,7 +1,7 @@
 """ThreatConnect Feed API Service App"""
 # standard library
 from time import sleep, time
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 # third-party
 import schedule
@@ -9,35 +9,34 @@ from api import (
     JobRequestResource,
     JobSettingResource,
     MetricProcessingResource,
+    MetricServiceResource,
     MetricTaskResource,
+    ReportBatchErrorExportResource,
     ReportBatchErrorResource,
+    ReportBatchErrorSummaryResource,
     SupportLogSearchResource,
     TaskResource,
     TaskStatusResource,
 )
-from api.middleware import InjectablesMiddleware
+from api.middleware import HttpCacheMiddleware, InjectablesMiddleware
 from api_service_falcon import ApiServiceFalcon
 from model import SettingsModel
-from more import initialize_db
+from more import HttpPool, ProviderSdk, RateLimiter, initialize_db
 from tasks import (
     Cleaner,
     ConvertPathPipe,
     DownloadPathPipe,
+    RetryFailed,
     ScheduleNextDownload,
     Tasks,
     UploadPathPipe,
 )
 from tcex.backports import cached_property
 from tcex.exit import ExitCode
-from tcex.sessions.auth.hmac_auth import HmacAuth
-from tcex.sessions.tc_session import TcSession
 
 if TYPE_CHECKING:
     # standard library
 
-    # third-party
-    from tcex.input.field_types import Sensitive
-
     # first-party
     from app_inputs import AppBaseModel
 
@@ -50,6 +49,9 @@ class App(ApiServiceFalcon):
         super().__init__(_tcex)
 
         # properties
+        self.app_pool_size = self.settings.api_app_pool_size
+        self.app_pool_timeout = self.settings.api_app_pool_timeout
+        self.max_concurrent_requests = self.settings.api_max_concurrent_requests
         self.tasks = Tasks()
 
         #
@@ -65,14 +67,15 @@ class App(ApiServiceFalcon):
         # add tasks in order of flow
         self.tasks.add_task_path_pipe(
             [
-                DownloadPathPipe(self.settings, self.tcex, self.provider_sdk),
+                DownloadPathPipe(self.settings, self.tcex, self.provider_sdk, self.tasks),
                 ConvertPathPipe(self.settings, self.tcex),
-                UploadPathPipe(self.settings, self.tcex),
+                UploadPathPipe(self.settings, self.tcex, self.http_pool),
             ]
         )
 
         # standalone tasks
         self.tasks.add_task(Cleaner(self.settings, self.tcex, self.tasks))
+        self.tasks.add_task(RetryFailed(self.settings, self.tcex, self.tasks))
 
         # schedule next download
         self.tasks.add_task(ScheduleNextDownload(self.settings, self.tcex))
@@ -90,25 +93,32 @@ class App(ApiServiceFalcon):
         app.add_middleware(
             InjectablesMiddleware(
                 provider_sdk=self.provider_sdk,
+                service_metrics=self.service_metrics,
                 settings=self.settings,
                 tasks=self.tasks,
             )
         )
 
+        # must be added after InjectablesMiddleware, resources use injected values for versioning
+        app.add_middleware(HttpCacheMiddleware())
+
         #
         # Add Routes
         #
 
-        app.add_route('/api/job/request', JobRequestResource())
-        app.add_route('/api/job/setting', JobSettingResource())
-        app.add_route('/api/metric/processing', MetricProcessingResource())
-        app.add_route('/api/metric/task', MetricTaskResource())
-        app.add_route('/api/report/batch-error', ReportBatchErrorResource())
-        # self.app.add_route('/api/report/pdf-tracker', ReportPdfTrackerResource())
-        app.add_route('/api/support/log-search', SupportLogSearchResource())
-        app.add_route('/api/task', TaskResource())
-        app.add_route('/api/task/{task_name}', TaskResource())
-        app.add_route('/api/task/status', TaskStatusResource())
+        self.add_route(app, '/api/job/request', JobRequestResource())
+        self.add_route(app, '/api/job/setting', JobSettingResource())
+        self.add_route(app, '/api/metric/processing', MetricProcessingResource())
+        self.add_route(app, '/api/metric/service', MetricServiceResource())
+        self.add_route(app, '/api/metric/task', MetricTaskResource())
+        self.add_route(app, '/api/report/batch-error', ReportBatchErrorResource())
+        self.add_route(app, '/api/report/batch-error/export', ReportBatchErrorExportResource())
+        self.add_route(app, '/api/report/batch-error/summary', ReportBatchErrorSummaryResource())
+        # self.add_route(app, '/api/report/pdf-tracker', ReportPdfTrackerResource())
+        self.add_route(app, '/api/support/log-search', SupportLogSearchResource())
+        self.add_route(app, '/api/task', TaskResource())
+        self.add_route(app, '/api/task/{task_name}', TaskResource())
+        self.add_route(app, '/api/task/status', TaskStatusResource())
         return app
 
     @staticmethod
@@ -166,6 +176,16 @@ class App(ApiServiceFalcon):
             self.log.error(f'event=preflight-check-tc-api-failed, error={ex}')
             raise RuntimeError('Preflight check for TC API failed.') from ex
 
+    @cached_property
+    def http_pool(self) -> HttpPool:
+        """Return the HTTP connection pool manager shared by the provider and TC sessions."""
+        return HttpPool(
+            pool_connections=self.settings.http_pool_connections,
+            pool_maxsize=self.settings.http_pool_maxsize,
+            keepalive_idle_seconds=self.settings.http_keepalive_idle_seconds,
+            log=self.log,
+        )
+
     @cached_property
     def provider_sdk(self):
         """Return the Stub SDK.
@@ -176,47 +196,40 @@ class App(ApiServiceFalcon):
 
         model: 'AppBaseModel' = self.inputs.model
 
-        class ProviderSdk:
-            """Provider SDK class."""
-
-            def __init__(self, tc_url: str, access_id: str, secret_key: 'Sensitive', log):
-                self.tc_session = TcSession(HmacAuth(access_id, secret_key), tc_url)
-                self.log = log
-
-            def get_all(self, tql: str, owner: str):
-                """Return a generator of indicators."""
-                limit = 1000
-                offset = 0
-                while True:
-                    response = self.tc_session.get(
-                        '/v3/indicators',
-                        params={
-                            'tql': tql,
-                            'owner': owner,
-                            'resultLimit': limit,
-                            'resultStart': offset,
-                        },
-                    )
-                    offset += limit
-                    response.raise_for_status()
-                    data = response.json().get('data')
-                    self.log.warning(f'data={data}')
-                    if data:
-                        yield from data
-                    else:
-                        return
-
-            def get(self, indicator: str):
-                """Return a single indicator."""
-                return self.tc_session.get(f'/v3/indicators/{indicator}').json()
-
         return ProviderSdk(
             model.external_tc_url,
             model.external_tc_api_access_id,
             model.external_tc_api_secret_key,
             self.log,
+            workers=self.settings.provider_fetch_workers,
+            max_retries=self.settings.provider_fetch_retries,
+            http_pool=self.http_pool,
+            rate_limiter=self.rate_limiter,
+        )
+
+    @cached_property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        """Return the provider rate limiter shared by the download processes."""
+        if self.settings.provider_rate_limit_enabled is False:
+            return None
+
+        return RateLimiter(
+            rate=self.settings.provider_rate_limit,
+            rate_min=self.settings.provider_rate_limit_min,
+            rate_max=self.settings.provider_rate_limit_max,
+            concurrency_max=(
+                self.settings.download_window_workers * self.settings.provider_fetch_workers
+            ),
+            latency_target_seconds=self.settings.provider_latency_target_seconds,
+            log=self.log,
         )
 
+    def service_metrics(self) -> dict:
+        """Return the API service metrics."""
+        metrics = super().service_metrics()
+        metrics['http_pool'] = self.http_pool.metrics
+        return metrics
+
     def loop_forever(self):
         """Loop forever running scheduled task as appropriate."""
         self._preflight_check()
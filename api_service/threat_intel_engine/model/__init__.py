@@ -1,6 +1,7 @@
 """Model Definitions"""
 # flake8: noqa
 from .batch_error_model import BatchErrorModel
+from .batch_error_summary_model import BatchErrorSummaryModel
 from .filter_param_model import (
     FilterParamModel,
     FilterParamPaginatedModel,
@@ -12,5 +13,5 @@ from .multipart_form_data_model import MultipartFormDataModel
 from .paginator_response_model import PaginatorResponseModel
 
 # from .report_pdf_tracker_model import ReportPdfTrackerModel
-from .setting_model import SettingsModel
+from .setting_model import BatchErrorStorage, SettingsModel
 from .ti_processing_metric_model import TiProcessingMetricModel
@@ -0,0 +1,22 @@
+"""Model Definition"""
+# standard library
+from typing import List, Optional
+
+# third-party
+from pydantic import BaseModel, Field
+
+
+class BatchErrorSummaryModel(BaseModel):
+    """Model Definition"""
+
+    code: str = Field(..., description='The batch error code.')
+    count: int = Field(..., description='The number of occurrences.')
+    message: Optional[str] = Field(None, description='The short description of the error code.')
+    reason_template: str = Field(..., description='The reason with variable values masked.')
+    request_count: int = Field(..., description='The number of requests with this error.')
+    samples: List[str] = Field([], description='A sample of the raw reasons.')
+
+    class Config:
+        """Model Config"""
+
+        orm_mode = True
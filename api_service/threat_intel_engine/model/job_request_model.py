@@ -17,8 +17,21 @@ class JobRequestModel(JobRequestBaseModel):
     count_batch_error: int = Field(0, description='')
     count_batch_group_success: int = Field(0, description='')
     count_batch_indicator_success: int = Field(0, description='')
+    count_convert_bloom_false_positive: int = Field(
+        0, description='Indicators in the Bloom filter that were not in the indicator hash index.'
+    )
+    count_convert_bloom_negative: int = Field(
+        0, description='Indicators not in the Bloom filter (indicator hash index lookup skipped).'
+    )
+    count_convert_indicator_duplicate: int = Field(
+        0, description='Indicators dropped as already uploaded and unchanged.'
+    )
+    count_convert_indicator_unique: int = Field(
+        0, description='Indicators not found in the indicator hash index.'
+    )
     count_download_group: int = Field(0, description='')
     count_download_indicator: int = Field(0, description='')
+    count_retry: int = Field(0, description='Number of automatic retries of the job request.')
 
     # metrics
     date_convert_start: Optional[arrow.Arrow] = Field(None, description='')
@@ -27,6 +40,9 @@ class JobRequestModel(JobRequestBaseModel):
     date_download_complete: Optional[arrow.Arrow] = Field(None, description='')
     date_upload_start: Optional[arrow.Arrow] = Field(None, description='')
     date_upload_complete: Optional[arrow.Arrow] = Field(None, description='')
+    date_retry: Optional[arrow.Arrow] = Field(
+        None, description='Date of the next automatic retry of the failed job request.'
+    )
 
     # task settings
     last_modified_filter_start: Optional[arrow.Arrow] = Field(None, description='')
@@ -1,5 +1,6 @@
 """Model Definition"""
 # standard library
+from enum import Enum
 from pathlib import Path
 
 # third-party
@@ -7,6 +8,14 @@ import arrow
 from pydantic import BaseModel, Field
 
 
+class BatchErrorStorage(str, Enum):
+    """Enum for possible batch error storage modes."""
+
+    both = 'both'
+    full = 'full'
+    summary = 'summary'
+
+
 class SettingsModel(BaseModel):
     """Model Definition"""
 
@@ -33,7 +42,51 @@ class SettingsModel(BaseModel):
     # Framework Inputs
     #
 
+    api_app_pool_size: int = Field(
+        6, description='Number of falcon apps available to handle concurrent API requests.'
+    )
+    api_app_pool_timeout: int = Field(
+        30, description='Seconds to wait for an available falcon app before returning a 503.'
+    )
+    api_max_concurrent_requests: int = Field(
+        4,
+        description=(
+            'Number of API requests handled at once, further requests get a 503. Keep it below '
+            'the 5 tcex request threads so a thread is free to reject the queued requests.'
+        ),
+    )
+    batch_error_samples: int = Field(
+        5, description='Number of raw reasons sampled per summarized batch error.'
+    )
+    batch_error_storage: BatchErrorStorage = Field(
+        BatchErrorStorage.full,
+        description=(
+            'How batch errors are stored: full (one row per error, used by the batch error '
+            'report and export), summary (occurrence counts per code and reason template, '
+            'without the batch error report and export rows), or both.'
+        ),
+    )
+    batch_latency_target_seconds: int = Field(
+        120, description='Target seconds to submit and poll a batch, used to adjust batch size.'
+    )
+    batch_size: int = Field(
+        5_000, description='Records per batch file (initial size when batch_size_adaptive).'
+    )
+    batch_size_adaptive: bool = Field(
+        True, description='Adjust the batch size to the observed batch submit and poll latency.'
+    )
+    batch_size_max: int = Field(25_000, description='Maximum records per batch file.', ge=1)
+    batch_size_min: int = Field(500, description='Minimum records per batch file.', ge=1)
     date_started: arrow.Arrow = Field(..., description='Date the app started.')
+    download_window_max_count: int = Field(
+        10_000, description='Indicators per download window before the window is split.'
+    )
+    download_window_min_seconds: int = Field(
+        60, description='Minimum width of a download window in seconds.'
+    )
+    download_window_workers: int = Field(
+        4, description='Number of download windows of a job request fetched concurrently.', ge=1
+    )
     extension_csv: str = Field('.csv', description='')
     extension_gzip: str = Field('.gz', description='')
     extension_bzip: str = Field('.bz', description='')
@@ -46,10 +99,107 @@ class SettingsModel(BaseModel):
         '#',
         description='The separator used in configuration file names',
     )
+    http_keepalive_idle_seconds: int = Field(
+        60, description='Idle seconds before a TCP keep-alive probe is sent (0 to disable).'
+    )
+    http_pool_connections: int = Field(
+        4, description='Number of hosts per HTTP session with a cached connection pool.', ge=1
+    )
+    http_pool_maxsize: int = Field(
+        16,
+        description=(
+            'Connections kept per host, should be at least download_window_workers * '
+            'provider_fetch_workers or connections are discarded instead of reused.'
+        ),
+        ge=1,
+    )
+    indicator_bloom_fp_rate: float = Field(
+        0.01,
+        description='Target false-positive rate of the indicator hash index Bloom filter.',
+        gt=0,
+        lt=1,
+    )
+    indicator_bloom_min_capacity: int = Field(
+        1_000_000, description='Minimum number of indicators the Bloom filter is sized for.'
+    )
+    indicator_dedup_enabled: bool = Field(
+        True, description='Drop indicators that were already uploaded and are unchanged.'
+    )
+    indicator_hash_ttl_days: int = Field(
+        30, description='Days an uploaded indicator is kept in the indicator hash index.'
+    )
+    pipe_streaming_enabled: bool = Field(
+        False, description='Convert consumes the chunks of a download while it is running.'
+    )
+    pipe_streaming_upload: bool = Field(
+        False,
+        description=(
+            'Upload consumes the batch files of a convert while it is running (requires '
+            'pipe_streaming_enabled).'
+        ),
+    )
+    provider_fetch_retries: int = Field(
+        3, description='Number of times a failed provider page request is retried.'
+    )
+    provider_fetch_workers: int = Field(
+        4, description='Number of provider pages fetched concurrently during download.', ge=1
+    )
+    provider_latency_target_seconds: float = Field(
+        5.0,
+        description='Successful provider responses slower than the target reduce the concurrency.',
+    )
+    provider_keyset_paging: bool = Field(
+        False,
+        description=(
+            'Page provider results by id, resumable per page, instead of by offset (pages '
+            'fetched concurrently).'
+        ),
+    )
+    provider_rate_limit: float = Field(
+        10.0, description='Initial provider requests per second, shared by all downloads.', gt=0
+    )
+    provider_rate_limit_enabled: bool = Field(
+        True, description='Adapt the provider request rate and concurrency to 429s and latency.'
+    )
+    provider_rate_limit_max: float = Field(
+        100.0, description='Maximum provider requests per second.', gt=0
+    )
+    provider_rate_limit_min: float = Field(
+        0.5, description='Minimum provider requests per second after 429 responses.', gt=0
+    )
+    retry_backoff_max_minutes: int = Field(
+        240, description='Maximum minutes to wait before retrying a failed job request.'
+    )
+    retry_backoff_minutes: int = Field(
+        5, description='Minutes to wait before the first retry, doubled for every retry.'
+    )
+    retry_max_attempts: int = Field(
+        5, description='Number of automatic retries of a failed job request.'
+    )
     status_cancelled: str = Field('cancelled', description='')
     status_failed: str = Field('failed', description='')
     status_pending: str = Field('pending', description='')
-    throttle_limit: int = Field(3, description='Used to throttle download.')
+    throttle_adaptive: bool = Field(
+        True, description='Adjust the throttle limit to the backlog of Convert and Upload.'
+    )
+    throttle_backlog_minutes_max: int = Field(
+        30, description='Minutes a stage may need to drain its queue before the limit drops.'
+    )
+    throttle_disk_max_mb: int = Field(
+        2_048,
+        description='Megabytes in the Convert and Upload working dirs before the limit drops.',
+    )
+    throttle_evaluate_seconds: int = Field(
+        60, description='Seconds between evaluations of the adaptive throttle limit.'
+    )
+    throttle_limit: int = Field(
+        3, description='Number of in-flight job requests before download is throttled (initial).'
+    )
+    throttle_limit_max: int = Field(8, description='Maximum adaptive throttle limit.', ge=1)
+    throttle_limit_min: int = Field(1, description='Minimum adaptive throttle limit.', ge=1)
+    throttle_throughput_window_minutes: int = Field(
+        60, description='Minutes of completed job requests used for the stage throughput.', ge=1
+    )
     working_dir_download: str = Field(..., description='')
     working_dir_batch: str = Field(..., description='')
     working_dir_convert: str = Field(..., description='')
@@ -1,8 +1,15 @@
 """More"""
 
 # flake8:noqa
+from .backpressure_controller import BackpressureController, StageBacklog
+from .checkpoint import Checkpoint
 from .database import Base, engine, initialize_db, session
 from .db_util import DbUtil
 from .error import error
+from .http_pool import HttpPool
+from .indicator_hash_index import IndicatorHashIndex
 from .metrics import Metrics
 from .paginator import Paginator
+from .provider_sdk import KeysetCursor, ProviderSdk
+from .rate_limiter import RateLimiter
+from .time_window_splitter import TimeWindow, TimeWindowSplitter
@@ -0,0 +1,141 @@
+"""Backpressure Controller Module"""
+# standard library
+import logging
+import time
+from collections import deque
+from typing import Deque, List, NamedTuple, Optional
+
+# third-party
+import arrow
+
+logger = logging.getLogger('tcex')
+
+
+class StageBacklog(NamedTuple):
+    """The backlog of a downstream pipe stage."""
+
+    name: str
+    # number of request dirs waiting in or being processed from the working dir in
+    queue_depth: int
+    # bytes on disk in the working dir in
+    size_bytes: int
+    # job requests completed by the stage per minute over the throughput window
+    throughput: float
+
+
+class BackpressureController:
+    """Adaptive limit of in-flight job requests based on the downstream backlog.
+
+    The limit is evaluated when due, at most once per evaluate_seconds:
+
+    * the downstream disk usage is over disk_max_bytes: the limit is halved
+    * a stage needs more than backlog_minutes_max to drain its queue at its recent throughput
+      (or has a queue and completed nothing): the limit is decreased by one
+    * every downstream stage is idle (empty queue): the limit is increased by one
+    * otherwise the limit is kept
+
+    Every evaluation is added to a bounded history with the reasons for the chosen limit.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        limit_min: int = 1,
+        limit_max: int = 8,
+        disk_max_bytes: int = 2_048 * 1_024**2,
+        backlog_minutes_max: int = 30,
+        evaluate_seconds: int = 60,
+        history_size: int = 60,
+        log: Optional[logging.Logger] = None,
+    ):
+        """Initialize class properties.
+
+        Args:
+            limit: The initial limit of in-flight job requests.
+            limit_min: The minimum limit.
+            limit_max: The maximum limit.
+            disk_max_bytes: The maximum bytes on disk in the downstream working dirs.
+            backlog_minutes_max: The maximum minutes a stage may need to drain its queue.
+            evaluate_seconds: The minimum seconds between evaluations.
+            history_size: The number of evaluations kept in the history.
+            log: The logger.
+        """
+        self.backlog_minutes_max = backlog_minutes_max
+        self.disk_max_bytes = disk_max_bytes
+        self.evaluate_seconds = evaluate_seconds
+        self.limit_max = max(1, limit_max)
+        self.limit_min = max(1, min(limit_min, self.limit_max))
+        self.log = log or logger
+
+        # properties
+        self.evaluated: Optional[float] = None
+        self.history: Deque[dict] = deque(maxlen=history_size)
+        self.limit = min(max(limit, self.limit_min), self.limit_max)
+        self.reasons: List[str] = ['initial']
+
+    def _backlog_minutes(self, stage: StageBacklog) -> Optional[float]:
+        """Return the minutes the stage needs to drain its queue, None if it is not draining."""
+        if stage.throughput > 0:
+            return stage.queue_depth / stage.throughput
+        return None
+
+    def _decide(self, stages: List[StageBacklog]) -> List[str]:
+        """Update the limit using the downstream backlog and return the reasons."""
+        size_bytes = sum(s.size_bytes for s in stages)
+        if size_bytes > self.disk_max_bytes:
+            self.limit = max(self.limit_min, self.limit // 2)
+            return [f'disk-over-max:{size_bytes}>{self.disk_max_bytes}']
+
+        reasons = []
+        for stage in stages:
+            backlog_minutes = self._backlog_minutes(stage)
+            if backlog_minutes is None and stage.queue_depth > 1:
+                # one request in the queue is the request in progress
+                reasons.append(f'{stage.name}-stalled:queue={stage.queue_depth}')
+            elif backlog_minutes is not None and backlog_minutes > self.backlog_minutes_max:
+                reasons.append(f'{stage.name}-behind:backlog-minutes={backlog_minutes:.1f}')
+        if reasons:
+            self.limit = max(self.limit_min, self.limit - 1)
+            return reasons
+
+        if all(s.queue_depth == 0 for s in stages):
+            self.limit = min(self.limit_max, self.limit + 1)
+            return ['downstream-idle']
+
+        return ['steady']
+
+    @property
+    def due(self) -> bool:
+        """Return True if evaluate_seconds passed since the last evaluation."""
+        return self.evaluated is None or time.monotonic() - self.evaluated >= self.evaluate_seconds
+
+    def evaluate(self, stages: List[StageBacklog]) -> int:
+        """Update the limit using the backlog of the downstream stages and return it."""
+        self.evaluated = time.monotonic()
+        previous = self.limit
+        self.reasons = self._decide(stages)
+        self.history.append(
+            {
+                'date': arrow.utcnow().isoformat(),
+                'limit': self.limit,
+                'reasons': self.reasons,
+                'stages': [s._asdict() for s in stages],
+            }
+        )
+        if self.limit != previous:
+            self.log.info(
+                f'feature=backpressure-controller, event=limit-change, previous={previous}, '
+                f'limit={self.limit}, reasons={",".join(self.reasons)}'
+            )
+        return self.limit
+
+    @property
+    def state(self) -> dict:
+        """Return the chosen limit, the reasons, and the history of evaluations."""
+        return {
+            'history': list(self.history),
+            'limit': self.limit,
+            'limit_max': self.limit_max,
+            'limit_min': self.limit_min,
+            'reasons': self.reasons,
+        }
@@ -0,0 +1,198 @@
+"""Batch Size Controller Module"""
+# standard library
+import logging
+from typing import List, Optional, Tuple
+
+# third-party
+from more import DbUtil, session
+from schema import BatchSampleSchema
+
+logger = logging.getLogger('tcex')
+
+
+class BatchSizeController:
+    """Batch Size Controller Module
+
+    Chooses the number of records per batch file written by Convert from the latency of the
+    batches submitted by Upload. Upload records every batch (size, submit and poll seconds,
+    success and error counts) in the batch_sample table along with the batch size for the next
+    batches, so the size is shared by the task processes and persisted across restarts.
+
+    The next size is the size of the sample scaled by latency_target_seconds / latency, bounded
+    to 0.5-1.25 per sample, so small batches grow while the job overhead dominates and large
+    batches shrink before they time out. A failed batch (e.g., poll timeout) halves the size.
+    Partial batches (e.g., the last batch of a job) do not change the size.
+
+    The size is read and the sample written in separate statements, not in one transaction.
+    When two processes record at the same time, both adjust the same size and the last written
+    sample wins; the other adjustment is lost, not applied twice. Only the Upload task records
+    samples, one batch at a time, so this is limited to overlapping Upload runs.
+    """
+
+    # ratio of the size below which a batch is partial
+    partial_ratio = 0.5
+    # the number of samples kept in the table
+    history_size = 500
+    # sizes are rounded to a multiple of the step
+    size_step = 100
+
+    def __init__(
+        self,
+        size_initial: int,
+        size_min: int,
+        size_max: int,
+        latency_target_seconds: float,
+        enabled: bool = True,
+    ):
+        """Initialize class properties.
+
+        Args:
+            size_initial: The batch size before the first sample (or when disabled).
+            size_min: The minimum batch size.
+            size_max: The maximum batch size.
+            latency_target_seconds: The target submit + poll seconds of a batch.
+            enabled: If False, the initial size is always used.
+        """
+        self.enabled = enabled
+        self.latency_target_seconds = latency_target_seconds
+        self.size_max = max(1, size_max)
+        self.size_min = max(1, min(size_min, self.size_max))
+        self.size_initial = self._bound(size_initial)
+
+        # properties
+        self.db = DbUtil()
+        self.log = logger
+        self.session = session
+
+    def _bound(self, size: float) -> int:
+        """Return the size rounded to the step and bounded to the min and max size."""
+        size = round(size / self.size_step) * self.size_step
+        return int(min(self.size_max, max(self.size_min, size)))
+
+    def _next(
+        self, size: int, batch_size: int, latency_seconds: float, status: Optional[str]
+    ) -> Tuple[int, str]:
+        """Return the next batch size and the reason."""
+        if status != 'Success':
+            return self._bound(min(size, batch_size) * 0.5), 'failed'
+
+        if batch_size < size * self.partial_ratio:
+            return size, 'partial'
+
+        ratio = self.latency_target_seconds / max(latency_seconds, 0.001)
+        if 0.9 <= ratio <= 1.1:
+            # within 10% of the target
+            return size, 'steady'
+
+        size_next = self._bound(batch_size * min(1.25, max(0.5, ratio)))
+        if size_next > size:
+            return size_next, 'increase'
+        if size_next < size:
+            return size_next, 'decrease'
+        return size, 'steady'
+
+    def _prune(self, last_id: int):
+        """Remove the samples older than the last history_size samples."""
+        query = self.session.query(BatchSampleSchema).filter(
+            BatchSampleSchema.id <= last_id - self.history_size
+        )
+        try:
+            query.delete(synchronize_session=False)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            self.log.exception('failure=failed-pruning-batch-samples')
+
+    @property
+    def batch_size(self) -> int:
+        """Return the batch size for the next batch file."""
+        if self.enabled is False:
+            return self.size_initial
+
+        query = self.session.query(BatchSampleSchema.batch_size_next).order_by(
+            BatchSampleSchema.id.desc()
+        )
+        sample = self.db.get_record(query, 'first', 'Unexpected error getting batch size.')
+        if sample is None:
+            return self.size_initial
+        return self._bound(sample.batch_size_next)
+
+    def record(
+        self,
+        request_id: str,
+        batch_size: int,
+        submit_seconds: float,
+        poll_seconds: float,
+        status: Optional[str],
+        count_success: int = 0,
+        count_error: int = 0,
+    ) -> int:
+        """Record the result of a submitted batch and return the size for the next batches.
+
+        The next size is computed from the latest sample, a concurrent record is last-writer-wins.
+        """
+        size = self.batch_size
+        size_next, reason = size, 'disabled'
+        if self.enabled is True:
+            size_next, reason = self._next(size, batch_size, submit_seconds + poll_seconds, status)
+
+        record = self.db.create_record(
+            BatchSampleSchema,
+            {
+                'batch_size': batch_size,
+                'batch_size_next': size_next,
+                'count_error': count_error,
+                'count_success': count_success,
+                'poll_seconds': round(poll_seconds, 3),
+                'reason': reason,
+                'request_id': request_id,
+                'status': status,
+                'submit_seconds': round(submit_seconds, 3),
+            },
+            'Unexpected error creating batch sample record.',
+        )
+        self.db.add_record(self.session, record, 'Unexpected error adding batch sample record.')
+        if record.id is not None and record.id > self.history_size:
+            self._prune(record.id)
+
+        latency = submit_seconds + poll_seconds
+        self.log.info(
+            f'feature=batch-size-controller, event=record, request-id={request_id}, '
+            f'batch-size={batch_size}, latency={latency:.2f}, status={status}, '
+            f'records-per-second={count_success / max(latency, 0.001):.1f}, reason={reason}, '
+            f'size={size}, size-next={size_next}'
+        )
+        return size_next
+
+    def samples(self, limit: int = 20) -> List[dict]:
+        """Return the most recent samples."""
+        query = (
+            self.session.query(BatchSampleSchema).order_by(BatchSampleSchema.id.desc()).limit(limit)
+        )
+        samples = self.db.get_record(query, 'all', 'Unexpected error getting batch samples.')
+        return [
+            {
+                'batch_size': s.batch_size,
+                'batch_size_next': s.batch_size_next,
+                'count_error': s.count_error,
+                'count_success': s.count_success,
+                'date_added': s.date_added.isoformat() if s.date_added else None,
+                'poll_seconds': s.poll_seconds,
+                'reason': s.reason,
+                'status': s.status,
+                'submit_seconds': s.submit_seconds,
+            }
+            for s in samples or []
+        ]
+
+    @property
+    def state(self) -> dict:
+        """Return the batch size, bounds and the most recent samples."""
+        return {
+            'batch_size': self.batch_size,
+            'enabled': self.enabled,
+            'latency_target_seconds': self.latency_target_seconds,
+            'samples': self.samples(),
+            'size_max': self.size_max,
+            'size_min': self.size_min,
+        }
@@ -0,0 +1,158 @@
+"""Bloom Filter Module"""
+# standard library
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Iterable, Tuple
+
+logger = logging.getLogger('tcex')
+
+
+class BloomFilter:
+    """Memory-mapped Bloom filter persisted to a file.
+
+    The file is a small header (see header_format) followed by the bit array. The bit array is
+    memory-mapped, so the filter is shared through the page cache by every process that opens
+    it and only the pages touched by lookups are read from disk.
+
+    A Bloom filter has no false negatives, "key in filter" being False means the key was never
+    added. True means the key was *probably* added, with a false-positive rate that depends on
+    the bits per key (see fp_rate_estimate).
+    """
+
+    header_format = '<4sHQHQQd'  # magic, version, bits, hashes, capacity, count, fp_rate
+    header_size = struct.calcsize(header_format)
+    magic = b'TIBF'
+    version = 1
+
+    def __init__(self, path: Path, writable: bool = False):
+        """Initialize class properties."""
+        self.path = path
+        self.writable = writable
+
+        with path.open('r+b' if writable else 'rb') as fh:
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=access)
+
+        magic, version, bits, hashes, capacity, count, fp_rate = struct.unpack_from(
+            self.header_format, self._mmap
+        )
+        if magic != self.magic or version != self.version:
+            self.close()
+            raise ValueError(f'Invalid bloom filter file: {path}')
+
+        self.bits = bits
+        self.capacity = capacity
+        self.count = count
+        self.fp_rate = fp_rate
+        self.hashes = hashes
+
+    def __contains__(self, key: str) -> bool:
+        """Return True if the key is probably in the filter."""
+        mm = self._mmap
+        offset = self.header_size
+        bits = self.bits
+        h1, h2 = self._hash(key)
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            if not mm[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __enter__(self) -> 'BloomFilter':
+        """Enter context."""
+        return self
+
+    def __exit__(self, *args):
+        """Exit context."""
+        self.close()
+
+    @staticmethod
+    def _hash(key: str) -> Tuple[int, int]:
+        """Return the two hashes used to derive the bit positions (double hashing)."""
+        h1, h2 = struct.unpack('<QQ', hashlib.blake2b(key.encode(), digest_size=16).digest())
+        # ensure the positions are not all the same
+        return h1, h2 | 1
+
+    @staticmethod
+    def _size(capacity: int, fp_rate: float) -> Tuple[int, int]:
+        """Return the number of bits and hashes for the capacity and false-positive rate."""
+        bits = max(8, math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        return bits, hashes
+
+    def add(self, key: str):
+        """Add the key to the filter (requires the filter to be opened writable)."""
+        mm = self._mmap
+        offset = self.header_size
+        bits = self.bits
+        h1, h2 = self._hash(key)
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            mm[offset + (position >> 3)] |= 1 << (position & 7)
+        self.count += 1
+
+    @classmethod
+    def build(cls, path: Path, keys: Iterable[str], capacity: int, fp_rate: float) -> 'BloomFilter':
+        """Build a new filter from keys and atomically replace the filter at path.
+
+        Processes that have the previous filter open keep using it until they re-open it.
+        """
+        capacity = max(1, capacity)
+        bits, hashes = cls._size(capacity, fp_rate)
+
+        path_tmp = path.with_suffix(f'{path.suffix}.tmp')
+        with path_tmp.open('wb') as fh:
+            fh.write(
+                struct.pack(cls.header_format, cls.magic, cls.version, bits, hashes, capacity, 0, 0)
+            )
+            fh.truncate(cls.header_size + math.ceil(bits / 8))
+
+        bloom = cls(path_tmp, writable=True)
+        bloom.fp_rate = fp_rate
+        for key in keys:
+            bloom.add(key)
+        bloom.flush()
+        bloom.close()
+
+        os.replace(path_tmp, path)
+        logger.info(
+            f'feature=bloom-filter, event=build, path={path}, count={bloom.count}, '
+            f'size-bytes={bloom.size}, fp-rate-estimate={bloom.fp_rate_estimate:.6f}'
+        )
+        return cls(path)
+
+    def close(self):
+        """Close the memory map."""
+        if not self._mmap.closed:
+            self._mmap.close()
+
+    def flush(self):
+        """Write the header and flush the bit array to disk."""
+        struct.pack_into(
+            self.header_format,
+            self._mmap,
+            0,
+            self.magic,
+            self.version,
+            self.bits,
+            self.hashes,
+            self.capacity,
+            self.count,
+            self.fp_rate,
+        )
+        self._mmap.flush()
+
+    @property
+    def fp_rate_estimate(self) -> float:
+        """Return the estimated false-positive rate for the current number of keys."""
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+    @property
+    def size(self) -> int:
+        """Return the size of the bit array in bytes."""
+        return math.ceil(self.bits / 8)
@@ -0,0 +1,70 @@
+"""Checkpoint Module"""
+# standard library
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger('tcex')
+
+
+class Checkpoint:
+    """Checkpoint file of JSON values, written atomically on every update.
+
+    A task stores the progress it has made (e.g., the last key of a paged download) so that a
+    restarted task can resume where the previous run stopped. Updates are thread-safe.
+    """
+
+    def __init__(self, path: Path, log: Optional[logging.Logger] = None):
+        """Initialize class properties."""
+        self.path = Path(path)
+        self.log = log or logger
+        self.lock = threading.Lock()
+        self.data = self._load()
+
+    def _load(self) -> dict:
+        """Return the checkpoint data, an empty dict if no valid checkpoint exists."""
+        try:
+            with self.path.open(encoding='utf-8') as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as ex:
+            self.log.warning(
+                f'feature=checkpoint, event=invalid-checkpoint, path={self.path}, error={ex}'
+            )
+            return {}
+
+        if not isinstance(data, dict):
+            return {}
+
+        self.log.info(f'feature=checkpoint, event=loaded, path={self.path}, keys={len(data)}')
+        return data
+
+    def _save(self):
+        """Write the checkpoint data to a temp file and move it into place."""
+        temp_path = self.path.with_name(f'{self.path.name}.tmp')
+        with temp_path.open('w', encoding='utf-8') as fh:
+            json.dump(self.data, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        """Remove the checkpoint."""
+        with self.lock:
+            self.data = {}
+            self.path.unlink(missing_ok=True)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the checkpoint value for key."""
+        with self.lock:
+            return self.data.get(key, default)
+
+    def set(self, key: str, value: Any):
+        """Set the checkpoint value for key and write the checkpoint."""
+        with self.lock:
+            self.data[key] = value
+            self._save()
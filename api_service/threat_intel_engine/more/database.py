@@ -7,7 +7,7 @@ import os
 from threading import Lock
 
 # third-party
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, literal, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import NullPool
@@ -58,9 +58,43 @@ def vacuum_db():
         logger.warning(f'feature=initialize-db, event=vacuum-db-failed, reason={e}')
 
 
+def migrate_db():
+    """Add columns missing from existing tables.
+
+    create_all only creates missing tables, any column added to the schema of an existing table
+    is added here (e.g., new count columns on job_request).
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            existing_columns = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} '
+                ddl += column.type.compile(dialect=engine.dialect)
+                if column.default is not None and column.default.is_scalar:
+                    default = literal(column.default.arg).compile(
+                        dialect=engine.dialect, compile_kwargs={'literal_binds': True}
+                    )
+                    ddl += f' DEFAULT {default}'
+                conn.execute(text(ddl))
+                logger.info(
+                    f'feature=initialize-db, event=add-column, table={table.name}, '
+                    f'column={column.name}'
+                )
+
+
 def initialize_db():
     """Create all the database schemas."""
     Base.metadata.create_all(engine)
 
+    # add new columns to existing tables
+    migrate_db()
+
     # vacuum
     vacuum_db()
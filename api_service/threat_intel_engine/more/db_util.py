@@ -1,7 +1,8 @@
 """DB Util Module"""
 # standard library
 import logging
-from typing import TYPE_CHECKING, Any, List, Union
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Iterable, List, Union
 
 # third-party
 from sqlalchemy.dialects import sqlite
@@ -42,6 +43,37 @@ class DbUtil:
             if raise_exception is True:
                 raise ex
 
+    def bulk_insert(
+        self,
+        session: 'Session',
+        schema: Any,
+        records: Iterable[dict],
+        error_description: str,
+        chunk_size: int = 5_000,
+        raise_exception: bool = False,
+    ) -> int:
+        """Insert records (dicts) using executemany, committing once per chunk.
+
+        Returns the number of records inserted.
+        """
+        count = 0
+        records = iter(records)
+        try:
+            while True:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    break
+
+                session.execute(schema.__table__.insert(), chunk)
+                session.commit()
+                count += len(chunk)
+        except Exception as ex:
+            session.rollback()
+            self.log.exception(error_description)
+            if raise_exception is True:
+                raise ex
+        return count
+
     def create_record(
         self, schema: Any, data: dict, error_description: str, raise_exception: bool = False
     ):
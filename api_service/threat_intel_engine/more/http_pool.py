@@ -0,0 +1,263 @@
+"""HTTP Pool Module"""
+# standard library
+import logging
+import os
+import socket
+import threading
+import weakref
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+# third-party
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.poolmanager import PoolManager
+
+if TYPE_CHECKING:
+    # third-party
+    from requests import PreparedRequest, Response, Session
+
+logger = logging.getLogger('tcex')
+
+# the pools of the process, reinitialized in the child process after a fork
+_http_pools: 'weakref.WeakSet[HttpPool]' = weakref.WeakSet()
+
+
+class HttpPoolCounters:
+    """Thread-safe request and connection counters of a session."""
+
+    def __init__(self):
+        """Initialize class properties."""
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+
+    def add_connection(self):
+        """Count a new connection."""
+        with self.lock:
+            self.connections += 1
+
+    def add_request(self):
+        """Count a request."""
+        with self.lock:
+            self.requests += 1
+
+    @property
+    def metrics(self) -> dict:
+        """Return the counters and the connection reuse ratio."""
+        with self.lock:
+            reuse_ratio = 0.0
+            if self.requests:
+                reuse_ratio = round(max(0, self.requests - self.connections) / self.requests, 4)
+            return {
+                'connections': self.connections,
+                'requests': self.requests,
+                'reuse_ratio': reuse_ratio,
+            }
+
+
+class _CountingPoolMixin:
+    """Connection pool that counts the connections it opens."""
+
+    http_pool_counters: Optional[HttpPoolCounters] = None
+
+    def _new_conn(self):
+        """Return a new connection."""
+        if self.http_pool_counters is not None:
+            self.http_pool_counters.add_connection()
+        return super()._new_conn()
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    """HTTP connection pool that counts the connections it opens."""
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    """HTTPS connection pool that counts the connections it opens."""
+
+
+class _CountingPoolManager(PoolManager):
+    """Pool manager that creates counting connection pools."""
+
+    def __init__(self, *args, counters: HttpPoolCounters, **kwargs):
+        """Initialize class properties."""
+        super().__init__(*args, **kwargs)
+        self.counters = counters
+        self.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        """Return a new connection pool for the host."""
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.http_pool_counters = self.counters
+        return pool
+
+
+class HttpPoolAdapter(HTTPAdapter):
+    """Requests adapter with TCP keep-alive and connection reuse counters."""
+
+    def __init__(
+        self,
+        counters: HttpPoolCounters,
+        socket_options: List[Tuple[int, int, int]],
+        **kwargs,
+    ):
+        """Initialize class properties."""
+        # set before super().__init__(), which calls init_poolmanager()
+        self.counters = counters
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def __getstate__(self):
+        """Return the adapter state for pickling."""
+        state = super().__getstate__()
+        state['counters'] = self.counters
+        state['socket_options'] = self.socket_options
+        return state
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        """Initialize the pool manager."""
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = _CountingPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            counters=self.counters,
+            socket_options=self.socket_options,
+            **pool_kwargs,
+        )
+
+    def send(self, request: 'PreparedRequest', *args, **kwargs) -> 'Response':
+        """Send the request."""
+        self.counters.add_request()
+        return super().send(request, *args, **kwargs)
+
+
+class HttpPool:
+    """Per-process manager of the HTTP connection pools of requests sessions.
+
+    Mounted sessions get an adapter sized to the number of threads that share the session, so
+    connections are reused instead of discarded when the pool is full, and TCP keep-alive so
+    idle connections are not silently dropped by firewalls between requests.
+
+    A forked child process inherits the open connections of the parent, sharing a socket with
+    the parent corrupts the responses of both. After a fork every mounted session gets new,
+    empty pools in the child and the counters are reset, the parent is not affected.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int = 16,
+        keepalive_idle_seconds: int = 60,
+        log: Optional[logging.Logger] = None,
+    ):
+        """Initialize class properties.
+
+        Args:
+            pool_connections: The number of hosts of a session with a cached pool.
+            pool_maxsize: The maximum number of idle connections kept per host.
+            keepalive_idle_seconds: The idle seconds before the first TCP keep-alive probe.
+            log: The logger.
+        """
+        self.keepalive_idle_seconds = keepalive_idle_seconds
+        self.log = log or logger
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+
+        # properties
+        self._counters: Dict[str, HttpPoolCounters] = {}
+        self._lock = threading.Lock()
+        self._sessions: 'weakref.WeakValueDictionary[str, Session]' = weakref.WeakValueDictionary()
+        self.pid = os.getpid()
+        _http_pools.add(self)
+
+    def _mount_adapter(self, session: 'Session', name: str):
+        """Mount a new adapter with empty pools on the session."""
+        # keep the retry policy of the session (e.g., TcSession mounts a Retry for https)
+        max_retries = session.get_adapter('https://').max_retries
+        for prefix in ('https://', 'http://'):
+            session.mount(
+                prefix,
+                HttpPoolAdapter(
+                    counters=self._counters[name],
+                    max_retries=max_retries,
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    socket_options=self.socket_options,
+                ),
+            )
+
+    def _reinitialize(self):
+        """Replace the pools inherited from the parent process (called after fork)."""
+        # the lock may have been held by another thread of the parent at fork
+        self._lock = threading.Lock()
+        self.pid = os.getpid()
+        for name, session in list(self._sessions.items()):
+            self._counters[name] = HttpPoolCounters()
+            # the inherited adapter is dropped, not closed, closing would not affect the
+            # parent but the connections must never be used by the child
+            self._mount_adapter(session, name)
+
+    def log_metrics(self, event: str = 'metrics'):
+        """Log the connection reuse metrics of the mounted sessions."""
+        for name, metrics in self.metrics['sessions'].items():
+            self.log.info(
+                f'feature=http-pool, event={event}, pid={self.pid}, session={name}, '
+                f'requests={metrics["requests"]}, connections={metrics["connections"]}, '
+                f'reuse-ratio={metrics["reuse_ratio"]}'
+            )
+
+    @property
+    def metrics(self) -> dict:
+        """Return the pool settings and the connection reuse metrics of this process."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            'keepalive_idle_seconds': self.keepalive_idle_seconds,
+            'pid': self.pid,
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'sessions': {name: c.metrics for name, c in sorted(counters.items())},
+        }
+
+    def mount(self, session: 'Session', name: str) -> 'Session':
+        """Mount the pooled adapter on the session and return the session."""
+        with self._lock:
+            self._counters.setdefault(name, HttpPoolCounters())
+            self._sessions[name] = session
+            self._mount_adapter(session, name)
+        self.log.debug(
+            f'feature=http-pool, event=mount, pid={self.pid}, session={name}, '
+            f'pool-connections={self.pool_connections}, pool-maxsize={self.pool_maxsize}'
+        )
+        return session
+
+    @property
+    def socket_options(self) -> List[Tuple[int, int, int]]:
+        """Return the socket options of new connections."""
+        options = list(HTTPConnection.default_socket_options)
+        if self.keepalive_idle_seconds > 0:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            # TCP_KEEPIDLE/TCP_KEEPINTVL are not available on all platforms
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                options.append(
+                    (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keepalive_idle_seconds)
+                )
+            if hasattr(socket, 'TCP_KEEPINTVL'):
+                interval = max(1, self.keepalive_idle_seconds // 4)
+                options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, interval))
+        return options
+
+
+def _reinitialize_http_pools():
+    """Reinitialize the pools of the process in the child process of a fork."""
+    for http_pool in list(_http_pools):
+        http_pool._reinitialize()  # pylint: disable=protected-access
+
+
+os.register_at_fork(after_in_child=_reinitialize_http_pools)
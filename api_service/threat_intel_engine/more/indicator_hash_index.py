@@ -0,0 +1,271 @@
+"""Indicator Hash Index Module"""
+# standard library
+import fcntl
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, Tuple
+
+# third-party
+import arrow
+from more import DbUtil, session
+from more.bloom_filter import BloomFilter
+from schema import IndicatorHashSchema
+from sqlalchemy.dialects.sqlite import insert
+
+logger = logging.getLogger('tcex')
+
+
+class IndicatorHashIndex:
+    """Indicator Hash Index Module
+
+    Persistent index of the indicators (xid + lastModified) that have been uploaded. Convert
+    uses the index to drop indicators that are unchanged since they were uploaded (e.g., when
+    ad-hoc, scheduled and backfill windows overlap). The index is stored in SQLite and looked
+    up in chunks, so memory usage does not grow with the size of the index.
+
+    When base_path is provided, a Bloom filter of the index (rebuilt by the Cleaner) is
+    consulted before the exact DB lookup. Indicators not in the filter are new for certain
+    and skip the DB lookup, indicators in the filter fall back to the exact DB check.
+
+    The Upload processes (add) and the Cleaner (rebuild_bloom) write the filter file, the
+    writes are serialized with an exclusive lock on a separate lock file. The lock is released
+    by the OS if the process holding it is killed.
+    """
+
+    bloom_filename = 'indicator_hash.bloom'
+    bloom_lock_filename = 'indicator_hash.bloom.lock'
+    # ratio of the filter capacity at which the filter is rebuilt
+    bloom_rebuild_fill_ratio = 0.8
+    chunk_size = 500
+
+    def __init__(self, base_path: Optional[Path] = None):
+        """Initialize class properties."""
+        self.base_path = base_path
+
+        # properties
+        self.db = DbUtil()
+        self.log = logger
+        self.session = session
+
+        # bloom filter
+        self.bloom = self._open_bloom()
+        self.bloom_false_positive = 0
+        self.bloom_negative = 0
+
+    @contextmanager
+    def _bloom_lock(self) -> Iterator[None]:
+        """Hold the lock that serializes the writers of the Bloom filter file."""
+        with (Path(self.base_path) / self.bloom_lock_filename).open('a') as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _bloom_rebuild_reason(self, count: int, min_capacity: int, fp_rate: float) -> Optional[str]:
+        """Return the reason the Bloom filter needs a rebuild, None if it does not (lock held)."""
+        bloom = self._open_bloom()
+        if bloom is None:
+            return 'missing'
+
+        with bloom:
+            if bloom.fp_rate != fp_rate:
+                return 'fp-rate-changed'
+            if bloom.capacity < min_capacity:
+                return 'capacity-below-min'
+            # the keys added since the last build include the indicators evicted since
+            if max(bloom.count, count) >= bloom.capacity * self.bloom_rebuild_fill_ratio:
+                return 'fill-ratio'
+        return None
+
+    @staticmethod
+    def _bloom_key(key: Tuple[str, str]) -> str:
+        """Return the Bloom filter key for a (xid, lastModified) key."""
+        return '|'.join(key)
+
+    def _keys(self) -> Iterator[str]:
+        """Yield the Bloom filter keys of all indicators in the index."""
+        query = self.session.query(
+            IndicatorHashSchema.xid, IndicatorHashSchema.last_modified
+        ).yield_per(self.chunk_size * 10)
+        for xid, last_modified in query:
+            yield self._bloom_key((xid, last_modified))
+
+    def _open_bloom(self, writable: bool = False) -> Optional[BloomFilter]:
+        """Return the Bloom filter, if one has been built."""
+        if self.bloom_path is None or not self.bloom_path.is_file():
+            return None
+
+        try:
+            return BloomFilter(self.bloom_path, writable=writable)
+        except (OSError, ValueError):
+            self.log.exception(f'failure=failed-opening-bloom-filter, path={self.bloom_path}')
+            return None
+
+    @staticmethod
+    def _key(indicator: dict) -> Optional[Tuple[str, str]]:
+        """Return the (xid, lastModified) key for a batch indicator."""
+        xid = indicator.get('xid')
+        last_modified = indicator.get('lastModified')
+        if xid and last_modified:
+            return xid, str(last_modified)
+        return None
+
+    def _uploaded(self, xids: List[str]) -> dict:
+        """Return the lastModified of the provided xids that are in the index."""
+        query = self.session.query(
+            IndicatorHashSchema.xid, IndicatorHashSchema.last_modified
+        ).filter(IndicatorHashSchema.xid.in_(xids))
+        return dict(self.db.get_record(query, 'all', 'Unexpected error querying hash index.'))
+
+    def add(self, indicators: List[dict]):
+        """Add (or update) uploaded batch indicators to the index."""
+        table = IndicatorHashSchema.__table__
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.xid],
+            set_={
+                'date_uploaded': statement.excluded.date_uploaded,
+                'last_modified': statement.excluded.last_modified,
+            },
+        )
+
+        keys = [key for key in (self._key(i) for i in indicators) if key is not None]
+        date_uploaded = arrow.utcnow()
+        try:
+            chunk_size = self.chunk_size * 10
+            for index in range(0, len(keys), chunk_size):
+                end = index + chunk_size
+                self.session.execute(
+                    statement,
+                    [
+                        {'date_uploaded': date_uploaded, 'last_modified': lm, 'xid': xid}
+                        for xid, lm in keys[index:end]
+                    ],
+                )
+                self.session.commit()
+        except Exception:
+            self.session.rollback()
+            self.log.exception('failure=failed-updating-indicator-hash-index')
+            return
+
+        # add the keys to the Bloom filter, so they are found before the next rebuild
+        if self.bloom_path is None:
+            return
+
+        with self._bloom_lock():
+            # opened under the lock, a rebuild may have replaced the file
+            bloom = self._open_bloom(writable=True)
+            if bloom is not None:
+                with bloom:
+                    for key in keys:
+                        bloom.add(self._bloom_key(key))
+                    bloom.flush()
+
+    @property
+    def bloom_path(self) -> Optional[Path]:
+        """Return the path of the Bloom filter file."""
+        if self.base_path is None:
+            return None
+        return Path(self.base_path) / self.bloom_filename
+
+    def close(self):
+        """Close the Bloom filter."""
+        if self.bloom is not None:
+            self.bloom.close()
+
+    def evict(self, ttl_days: int) -> int:
+        """Remove indicators uploaded more than ttl_days ago, returning the count removed."""
+        query = self.session.query(IndicatorHashSchema).filter(
+            IndicatorHashSchema.date_uploaded < arrow.utcnow().shift(days=-ttl_days)
+        )
+        try:
+            count = query.delete(synchronize_session=False)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            self.log.exception('failure=failed-evicting-indicator-hash-index')
+            return 0
+
+        self.log.info(f'feature=indicator-hash-index, event=evict, count={count}')
+        return count
+
+    def filter_unchanged(
+        self, indicators: List[dict], seen: Optional[Set[Tuple[str, str]]] = None
+    ) -> Tuple[List[dict], int]:
+        """Return the indicators that were not already uploaded and the duplicate count.
+
+        An indicator is a duplicate when the index has the same xid and lastModified, or when the
+        key is in seen (the keys already processed by the current run, which is updated).
+
+        The bloom_negative (DB lookups skipped) and bloom_false_positive (in the filter, but
+        not in the index) counters are updated when a Bloom filter is available.
+        """
+        seen = seen if seen is not None else set()
+        kept = []
+        for index in range(0, len(indicators), self.chunk_size):
+            end = index + self.chunk_size
+            chunk = indicators[index:end]
+            keys = [self._key(i) for i in chunk]
+
+            # only keys that are (probably) in the bloom filter need the exact lookup
+            candidates = {
+                key
+                for key in keys
+                if key is not None
+                and key not in seen
+                and (self.bloom is None or self._bloom_key(key) in self.bloom)
+            }
+            uploaded = self._uploaded([key[0] for key in candidates]) if candidates else {}
+
+            for indicator, key in zip(chunk, keys):
+                if key is None:
+                    # without a lastModified there is no way to know if the indicator changed
+                    kept.append(indicator)
+                elif key in seen or uploaded.get(key[0]) == key[1]:
+                    continue
+                else:
+                    if self.bloom is not None:
+                        if key in candidates:
+                            self.bloom_false_positive += 1
+                        else:
+                            self.bloom_negative += 1
+                    seen.add(key)
+                    kept.append(indicator)
+
+        return kept, len(indicators) - len(kept)
+
+    def rebuild_bloom(self, min_capacity: int, fp_rate: float) -> bool:
+        """Rebuild the Bloom filter from the index when needed, returning True if rebuilt.
+
+        The filter is rebuilt when it is missing, when the settings changed, or when the keys
+        added to it (or the indicators in the index) reach bloom_rebuild_fill_ratio of its
+        capacity. The filter is sized for twice the current index (at least min_capacity),
+        leaving room for the indicators uploaded before the next rebuild.
+        """
+        if self.bloom_path is None:
+            return False
+
+        try:
+            # the keys added by an upload during the rebuild would be lost by the replace
+            with self._bloom_lock():
+                count = self.session.query(IndicatorHashSchema.xid).count()
+                reason = self._bloom_rebuild_reason(count, min_capacity, fp_rate)
+                if reason is None:
+                    return False
+
+                capacity = max(min_capacity, count * 2)
+                if self.bloom is not None:
+                    self.bloom.close()
+                self.bloom = BloomFilter.build(self.bloom_path, self._keys(), capacity, fp_rate)
+        except Exception:
+            self.session.rollback()
+            self.log.exception('failure=failed-rebuilding-bloom-filter')
+            return False
+
+        self.log.info(
+            f'feature=indicator-hash-index, event=rebuild-bloom, reason={reason}, '
+            f'count={count}, capacity={capacity}'
+        )
+        return True
@@ -0,0 +1,107 @@
+"""JSON Util Module"""
+# standard library
+import json
+from datetime import date, datetime, timedelta
+from typing import Any, Iterator, Union
+
+# third-party
+import arrow
+from pydantic.json import pydantic_encoder
+
+try:
+    # third-party
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# separators used between fragments, matching the output of the active backend
+_ITEM_SEPARATOR = b',' if orjson is not None else b', '
+_KEY_SEPARATOR = b':' if orjson is not None else b': '
+
+
+def json_default(o: Any) -> Any:
+    """Return a JSON serializable value for types not natively supported by the backend."""
+    if isinstance(o, arrow.Arrow):
+        return o.isoformat()
+    if isinstance(o, (date, datetime)):
+        return o.isoformat()
+    if isinstance(o, timedelta):
+        # same as model.json()
+        return o.total_seconds()
+    # fallback to the same encoders pydantic uses for model.json()
+    return pydantic_encoder(o)
+
+
+class DatetimeEncoder(json.JSONEncoder):
+    """Json Encoder that supports datetime objects."""
+
+    def default(self, o):
+        """Set default encoding for datetime objects."""
+        return json_default(o)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Return the obj as JSON encoded (utf-8) bytes.
+
+    orjson is used when installed (datetime values are encoded natively), otherwise the
+    stdlib encoder is used with DatetimeEncoder for Arrow/datetime/timedelta values.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, cls=DatetimeEncoder).encode()
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Return the decoded JSON data."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _iter_json_fragments(media: object) -> Iterator[bytes]:
+    """Yield JSON fragments for the media.
+
+    Only the top-level collection (and any list values of a top-level dict) is split into
+    fragments, each item is encoded with json_dumps. The output is identical to
+    json_dumps(media).
+    """
+    if isinstance(media, list):
+        yield b'['
+        for index, item in enumerate(media):
+            if index:
+                yield _ITEM_SEPARATOR
+            yield json_dumps(item)
+        yield b']'
+    elif isinstance(media, dict):
+        yield b'{'
+        for index, (key, value) in enumerate(media.items()):
+            if index:
+                yield _ITEM_SEPARATOR
+            yield json_dumps(str(key)) + _KEY_SEPARATOR
+            if isinstance(value, list):
+                yield from _iter_json_fragments(value)
+            else:
+                yield json_dumps(value)
+        yield b'}'
+    else:
+        yield json_dumps(media)
+
+
+def iter_json_bytes(media: object, chunk_size: int = 65_536) -> Iterator[bytes]:
+    """Yield the JSON encoded media as utf-8 chunks of roughly chunk_size bytes.
+
+    The fragments are buffered so that the WSGI server is not handed a separate write for
+    every row.
+    """
+    buffer = []
+    buffer_size = 0
+    for fragment in _iter_json_fragments(media):
+        buffer.append(fragment)
+        buffer_size += len(fragment)
+        if buffer_size >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            buffer_size = 0
+
+    if buffer:
+        yield b''.join(buffer)
@@ -0,0 +1,245 @@
+"""Provider SDK Module"""
+# standard library
+import logging
+import random
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Deque, Iterator, List, NamedTuple, Optional, Tuple
+
+# third-party
+from requests import RequestException
+from tcex.sessions.auth.hmac_auth import HmacAuth
+from tcex.sessions.tc_session import TcSession
+
+if TYPE_CHECKING:
+    # third-party
+    from requests import Response
+    from tcex.input.field_types import Sensitive
+
+    from .http_pool import HttpPool
+    from .rate_limiter import RateLimiter
+
+logger = logging.getLogger('tcex')
+
+
+class KeysetCursor(NamedTuple):
+    """The key (id) of the last indicator of a keyset page."""
+
+    id: int
+
+
+class ProviderSdk:
+    """Provider SDK class.
+
+    Typically this would be the SDK for the provider. This is only for demonstration purposes,
+    the "provider" is the v3 indicators endpoint of another ThreatConnect instance.
+    """
+
+    keyset_sorting = 'id ASC'
+    page_size = 1_000
+
+    def __init__(
+        self,
+        tc_url: str,
+        access_id: str,
+        secret_key: 'Sensitive',
+        log: Optional[logging.Logger] = None,
+        workers: int = 4,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        http_pool: Optional['HttpPool'] = None,
+        rate_limiter: Optional['RateLimiter'] = None,
+    ):
+        """Initialize class properties."""
+        self.backoff = backoff
+        self.http_pool = http_pool
+        self.log = log or logger
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        self.tc_session = TcSession(HmacAuth(access_id, secret_key), tc_url)
+        if http_pool is not None:
+            # share connections between the fetch threads and replace them after fork
+            http_pool.mount(self.tc_session, 'provider')
+        self.workers = max(1, workers)
+
+    def _get_page(
+        self,
+        tql: str,
+        owner: str,
+        offset: int,
+        count: bool = False,
+        limit: Optional[int] = None,
+        sorting: Optional[str] = None,
+    ) -> dict:
+        """Return a page of indicators, retrying with backoff on transient errors."""
+        params = {
+            'tql': tql,
+            'owner': owner,
+            'resultLimit': limit or self.page_size,
+            'resultStart': offset,
+        }
+        if count is True:
+            params['count'] = 'true'
+        if sorting is not None:
+            params['sorting'] = sorting
+
+        attempt = 0
+        while True:
+            try:
+                response = self._request('/v3/indicators', params)
+                response.raise_for_status()
+                return response.json()
+            except RequestException as ex:
+                delay = self._retry_delay(ex, attempt)
+                if delay is None:
+                    raise
+
+                attempt += 1
+                self.log.warning(
+                    f'feature=provider-sdk, event=page-retry, offset={offset}, '
+                    f'attempt={attempt}, delay={delay:.2f}, error="{ex}"'
+                )
+                time.sleep(delay)
+
+    def _get_all_sequential(self, tql: str, owner: str, offset: int) -> Iterator[dict]:
+        """Yield indicators page by page starting at offset, until an empty page."""
+        while True:
+            data = self._get_page(tql, owner, offset).get('data')
+            if not data:
+                return
+            yield from data
+            offset += len(data)
+
+    def _request(self, path: str, params: dict) -> 'Response':
+        """Send the request, waiting for the rate limiter and reporting the response to it."""
+        if self.rate_limiter is None:
+            return self.tc_session.get(path, params=params)
+
+        with self.rate_limiter.acquire():
+            start = time.perf_counter()
+            try:
+                response = self.tc_session.get(path, params=params)
+            except RequestException:
+                self.rate_limiter.record(None, time.perf_counter() - start)
+                raise
+            self.rate_limiter.record(
+                response.status_code,
+                time.perf_counter() - start,
+                response.headers.get('Retry-After'),
+            )
+        return response
+
+    def _retry_delay(self, ex: RequestException, attempt: int) -> Optional[float]:
+        """Return the seconds to wait before retrying the request, None if not retryable."""
+        if attempt >= self.max_retries:
+            return None
+
+        response = ex.response
+        if response is not None:
+            if response.status_code == 429:
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    # the rate limiter recorded the Retry-After and pauses all requests
+                    return 0.0 if self.rate_limiter is not None else float(retry_after)
+            elif response.status_code < 500:
+                # client errors (e.g., invalid TQL or credentials) will not succeed on retry
+                return None
+
+        # exponential backoff with jitter, so concurrent page requests do not retry in lockstep
+        return self.backoff * 2**attempt + random.uniform(0, self.backoff)  # nosec
+
+    def count(self, tql: str, owner: str) -> Optional[int]:
+        """Return the number of indicators matching the TQL, None if no count is returned."""
+        return self._get_page(tql, owner, 0, count=True, limit=1).get('count')
+
+    def get(self, indicator: str):
+        """Return a single indicator."""
+        return self.tc_session.get(f'/v3/indicators/{indicator}').json()
+
+    def get_all(self, tql: str, owner: str) -> Iterator[dict]:
+        """Return a generator of indicators.
+
+        The first page is requested with the total count. The remaining pages are fetched
+        concurrently (at most "workers" requests in flight plus as many completed pages
+        buffered) and yielded in order. Indicators added after the count was taken are
+        fetched sequentially once the counted pages are done.
+        """
+        start = time.perf_counter()
+        first = self._get_page(tql, owner, 0, count=True)
+        data = first.get('data') or []
+        total = first.get('count')
+        yield from data
+
+        if not data:
+            return
+
+        if total is None or len(data) < min(self.page_size, total):
+            # no count returned or the server limits the page size, page sequentially
+            self.log.info(
+                f'feature=provider-sdk, event=sequential-fallback, count={total}, '
+                f'page-length={len(data)}'
+            )
+            yield from self._get_all_sequential(tql, owner, len(data))
+            return
+
+        offsets = iter(range(self.page_size, total, self.page_size))
+        pages = 1
+        with ThreadPoolExecutor(self.workers, thread_name_prefix='provider-sdk') as executor:
+            pending: Deque[Future] = deque()
+
+            def _submit():
+                offset = next(offsets, None)
+                if offset is not None:
+                    pending.append(executor.submit(self._get_page, tql, owner, offset))
+
+            for _ in range(self.workers * 2):
+                _submit()
+
+            while pending:
+                data = pending.popleft().result().get('data') or []
+                _submit()
+                pages += 1
+                yield from data
+
+                if len(data) < self.page_size:
+                    # fewer indicators than counted (e.g., removed since the count was taken)
+                    for future in pending:
+                        future.cancel()
+                    self._log_get_all(pages, total, start)
+                    return
+
+        self._log_get_all(pages, total, start)
+
+        # indicators added since the count was taken
+        yield from self._get_all_sequential(tql, owner, pages * self.page_size)
+
+    def get_pages_keyset(
+        self, tql: str, owner: str, cursor: Optional[KeysetCursor] = None
+    ) -> Iterator[Tuple[List[dict], KeysetCursor]]:
+        """Return a generator of pages of indicators and the key of the last indicator.
+
+        Pages are ordered by id and each page is requested with a filter for the ids after the
+        last id of the previous page. Unlike offset paging, the cost of a page does not grow with
+        the depth and indicators modified while paging are not skipped or duplicated. The id is
+        unique and compared as an integer, the lastModified returned by the provider is not used
+        as a key because its format and precision do not match the TQL date comparison.
+        """
+        while True:
+            page_tql = tql
+            if cursor is not None:
+                page_tql = f'({tql}) AND id GT {cursor.id}'
+
+            data = self._get_page(page_tql, owner, 0, sorting=self.keyset_sorting).get('data')
+            if not data:
+                return
+
+            cursor = KeysetCursor(data[-1]['id'])
+            yield data, cursor
+
+    def _log_get_all(self, pages: int, total: int, start: float):
+        """Log the paging metrics of get_all."""
+        self.log.info(
+            f'feature=provider-sdk, event=get-all, count={total}, pages={pages}, '
+            f'workers={self.workers}, elapsed={time.perf_counter() - start:.2f}'
+        )
@@ -0,0 +1,305 @@
+"""Rate Limiter Module"""
+# standard library
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# third-party
+import arrow
+
+logger = logging.getLogger('tcex')
+
+# the limiters of the process, the per-process state is reset in the child after a fork
+_rate_limiters: 'weakref.WeakSet[RateLimiter]' = weakref.WeakSet()
+
+# the reasons of the last decrease
+DECREASE_REASONS = ['none', 'throttled', 'latency', 'error']
+
+# index of the values in the shared state array
+_TOKENS = 0
+_UPDATED = 1
+_RATE = 2
+_CONCURRENCY = 3
+_BACKOFF_UNTIL = 4
+_DECREASE_LAST = 5
+_DECREASE_REASON = 6
+_COUNT_REQUESTS = 7
+_COUNT_THROTTLED = 8
+_COUNT_DECREASES = 9
+_LATENCY = 10
+_WAIT_SECONDS = 11
+_DECREASE_DATE = 12
+_LOCK_HOLDER = 13
+_STATE_SIZE = 14
+
+
+class RateLimiter:
+    """Token bucket rate limiter with AIMD rate and concurrency adjustment.
+
+    The state lives in shared memory created by the service process and is inherited by the
+    forked task processes, so every Download process draws from the same bucket. The rate and
+    the concurrency limit are increased additively for every successful response and halved
+    (at most once per decrease interval) on a 429, a server error or a request without response
+    (e.g., a timeout), or a successful response slower than the latency target (concurrency
+    only). Other client errors (4xx) are not a congestion signal and change neither. A
+    Retry-After header pauses all callers.
+
+    The concurrency limit is shared, the in-flight requests are counted per process. The shared
+    lock is not released when a process holding it is killed. The pid of the holder is kept in
+    the shared state, a caller that waits longer than lock_timeout_seconds releases the lock
+    only if that process no longer exists.
+    """
+
+    # EWMA weight of a new latency sample
+    latency_alpha = 0.2
+    # seconds to wait for the shared lock before checking if its holder was killed
+    lock_timeout_seconds = 5.0
+
+    def __init__(
+        self,
+        rate: float = 10.0,
+        rate_min: float = 0.5,
+        rate_max: float = 100.0,
+        concurrency_max: int = 16,
+        latency_target_seconds: float = 5.0,
+        log: Optional[logging.Logger] = None,
+    ):
+        """Initialize class properties.
+
+        Args:
+            rate: The initial requests per second.
+            rate_min: The minimum requests per second after a decrease.
+            rate_max: The maximum requests per second after an increase.
+            concurrency_max: The initial and maximum number of requests in flight per process.
+            latency_target_seconds: Successful responses slower than the target decrease the
+                concurrency.
+            log: The logger.
+        """
+        self.concurrency_max = max(1, concurrency_max)
+        self.latency_target_seconds = latency_target_seconds
+        self.log = log or logger
+        self.rate_max = rate_max
+        self.rate_min = rate_min
+
+        # shared state, the locks are process-shared semaphores
+        self._lock = multiprocessing.Lock()
+        self._lock_recover = multiprocessing.Lock()
+        self._state = multiprocessing.RawArray('d', _STATE_SIZE)
+        self._state[_TOKENS] = 1
+        self._state[_UPDATED] = time.monotonic()
+        self._state[_RATE] = min(max(rate, rate_min), rate_max)
+        self._state[_CONCURRENCY] = self.concurrency_max
+
+        # per-process state
+        self._reinitialize()
+        _rate_limiters.add(self)
+
+    def _decrease(self, now: float, rate: bool) -> bool:
+        """Halve the concurrency (and the rate) once per decrease interval (lock held)."""
+        # in-flight requests sent before the decrease report the same condition
+        interval = max(1.0, self._state[_LATENCY])
+        if now - self._state[_DECREASE_LAST] < interval:
+            return False
+
+        self._state[_CONCURRENCY] = max(1.0, self._state[_CONCURRENCY] / 2)
+        if rate is True:
+            self._state[_RATE] = max(self.rate_min, self._state[_RATE] / 2)
+            self._state[_TOKENS] = min(self._state[_TOKENS], 0)
+        self._state[_COUNT_DECREASES] += 1
+        self._state[_DECREASE_LAST] = now
+        self._state[_DECREASE_DATE] = time.time()
+        return True
+
+    @staticmethod
+    def _is_alive(pid: int) -> bool:
+        """Return True if the process exists."""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            # the pid was reused by a process of another user
+            pass
+        return True
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the shared lock, releasing it first if it is held by a killed process."""
+        while not self._lock.acquire(timeout=self.lock_timeout_seconds):
+            self._recover_lock()
+
+        self._state[_LOCK_HOLDER] = os.getpid()
+        try:
+            yield
+        finally:
+            self._state[_LOCK_HOLDER] = 0
+            self._lock.release()
+
+    def _recover_lock(self):
+        """Release the shared lock if the process holding it no longer exists."""
+        # one waiting caller at a time, the holder is checked again after a recovery
+        if not self._lock_recover.acquire(timeout=self.lock_timeout_seconds):
+            return
+
+        try:
+            # 0 is a lock that was just acquired (or recovered) and has no holder set yet
+            holder = int(self._state[_LOCK_HOLDER])
+            if holder == 0 or self._is_alive(holder):
+                self.log.warning(
+                    f'feature=rate-limiter, event=lock-wait, holder={holder}, '
+                    f'timeout={self.lock_timeout_seconds}'
+                )
+                return
+
+            self.log.warning(f'feature=rate-limiter, event=lock-recover, holder={holder}')
+            self._state[_LOCK_HOLDER] = 0
+            self._lock.release()
+        finally:
+            self._lock_recover.release()
+
+    def _reinitialize(self):
+        """Reset the per-process state (called after fork)."""
+        self._condition = threading.Condition()
+        self._in_flight = 0
+
+    def _take_token(self) -> float:
+        """Take a token, return 0 or the seconds to wait before trying again."""
+        with self._locked():
+            now = time.monotonic()
+            if now < self._state[_BACKOFF_UNTIL]:
+                return self._state[_BACKOFF_UNTIL] - now
+
+            rate = self._state[_RATE]
+            # the bucket holds at most one second of requests
+            self._state[_TOKENS] = min(
+                max(1.0, rate), self._state[_TOKENS] + (now - self._state[_UPDATED]) * rate
+            )
+            self._state[_UPDATED] = now
+            if self._state[_TOKENS] >= 1:
+                self._state[_TOKENS] -= 1
+                return 0
+            return (1 - self._state[_TOKENS]) / rate
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        """Wait for a concurrency slot and a token, releasing the slot when the context exits."""
+        start = time.monotonic()
+        with self._condition:
+            while self._in_flight >= int(self._state[_CONCURRENCY]):
+                # the limit can be raised by another process, check again periodically
+                self._condition.wait(1)
+            self._in_flight += 1
+
+        try:
+            while True:
+                delay = self._take_token()
+                if delay <= 0:
+                    break
+                time.sleep(min(delay, 1.0))
+
+            wait_seconds = time.monotonic() - start
+            if wait_seconds > 0:
+                with self._locked():
+                    self._state[_WAIT_SECONDS] += wait_seconds
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify()
+
+    def record(
+        self,
+        status_code: Optional[int],
+        latency_seconds: float,
+        retry_after: Optional[str] = None,
+    ):
+        """Adjust the rate and concurrency using the response of a request.
+
+        Args:
+            status_code: The response status code, None if the request failed without response.
+            latency_seconds: The seconds the request took.
+            retry_after: The Retry-After header of the response.
+        """
+        reason = None
+        with self._locked():
+            now = time.monotonic()
+            self._state[_COUNT_REQUESTS] += 1
+            latency = self._state[_LATENCY]
+            self._state[_LATENCY] = (
+                latency_seconds
+                if latency == 0
+                else latency + self.latency_alpha * (latency_seconds - latency)
+            )
+
+            if retry_after is not None and retry_after.isdigit():
+                self._state[_BACKOFF_UNTIL] = max(
+                    self._state[_BACKOFF_UNTIL], now + float(retry_after)
+                )
+
+            if status_code == 429:
+                self._state[_COUNT_THROTTLED] += 1
+                reason = 'throttled'
+            elif status_code is None or status_code >= 500:
+                reason = 'error'
+            elif status_code >= 400:
+                # client errors (e.g., invalid TQL) are not a congestion signal
+                pass
+            elif latency_seconds > self.latency_target_seconds:
+                reason = 'latency'
+            else:
+                # additive increase, about one request per second (and one slot) per second
+                rate = self._state[_RATE]
+                self._state[_RATE] = min(self.rate_max, rate + 1 / max(1.0, rate))
+                concurrency = self._state[_CONCURRENCY]
+                self._state[_CONCURRENCY] = min(
+                    self.concurrency_max, concurrency + 1 / max(1.0, concurrency)
+                )
+
+            if reason is not None and self._decrease(now, rate=reason != 'latency'):
+                self._state[_DECREASE_REASON] = DECREASE_REASONS.index(reason)
+                rate, concurrency = self._state[_RATE], int(self._state[_CONCURRENCY])
+            else:
+                reason = None
+
+        if reason is not None:
+            self.log.warning(
+                f'feature=rate-limiter, event=decrease, reason={reason}, rate={rate:.2f}, '
+                f'concurrency={concurrency}, retry-after={retry_after}'
+            )
+
+    @property
+    def state(self) -> dict:
+        """Return the current rate and backoff state."""
+        with self._locked():
+            now = time.monotonic()
+            decrease_date = self._state[_DECREASE_DATE]
+            return {
+                'backoff_seconds': round(max(0.0, self._state[_BACKOFF_UNTIL] - now), 3),
+                'concurrency_limit': int(self._state[_CONCURRENCY]),
+                'concurrency_max': self.concurrency_max,
+                'count_decreases': int(self._state[_COUNT_DECREASES]),
+                'count_requests': int(self._state[_COUNT_REQUESTS]),
+                'count_throttled': int(self._state[_COUNT_THROTTLED]),
+                'date_decrease': arrow.get(decrease_date).isoformat() if decrease_date else None,
+                'decrease_reason': DECREASE_REASONS[int(self._state[_DECREASE_REASON])],
+                'latency_seconds': round(self._state[_LATENCY], 3),
+                'latency_target_seconds': self.latency_target_seconds,
+                'rate': round(self._state[_RATE], 3),
+                'rate_max': self.rate_max,
+                'rate_min': self.rate_min,
+                'wait_seconds_total': round(self._state[_WAIT_SECONDS], 3),
+            }
+
+
+def _reinitialize_rate_limiters():
+    """Reset the per-process state of the limiters in the child process of a fork."""
+    for rate_limiter in list(_rate_limiters):
+        rate_limiter._reinitialize()  # pylint: disable=protected-access
+
+
+os.register_at_fork(after_in_child=_reinitialize_rate_limiters)
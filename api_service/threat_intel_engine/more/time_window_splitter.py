@@ -0,0 +1,90 @@
+"""Time Window Splitter Module"""
+# standard library
+import logging
+from typing import Callable, List, NamedTuple, Optional
+
+# third-party
+import arrow
+
+logger = logging.getLogger('tcex')
+
+
+class TimeWindow(NamedTuple):
+    """A time window [start, end) and the number of results in it (None if unknown)."""
+
+    start: arrow.Arrow
+    end: arrow.Arrow
+    count: Optional[int]
+
+
+class TimeWindowSplitter:
+    """Adaptive splitter of a time window into sub-windows with a bounded result count.
+
+    A window with more than max_count results is split in half at a whole second, until every
+    window is within max_count or is min_window_seconds wide. Only the left half of each split
+    is counted, the count of the right half is the difference. Empty windows are dropped.
+    """
+
+    def __init__(
+        self,
+        count: Callable[[arrow.Arrow, arrow.Arrow], Optional[int]],
+        max_count: int,
+        min_window_seconds: int = 60,
+        log: Optional[logging.Logger] = None,
+    ):
+        """Initialize class properties.
+
+        Args:
+            count: A callable that returns the number of results in the window [start, end).
+            max_count: The maximum number of results of a window before it is split.
+            min_window_seconds: The minimum width of a window, narrower windows are not split.
+            log: The logger.
+        """
+        self.count = count
+        self.log = log or logger
+        self.max_count = max_count
+        self.min_window_seconds = max(1, min_window_seconds)
+
+        # metrics
+        self.count_requests = 0
+
+    def _count(self, start: arrow.Arrow, end: arrow.Arrow) -> Optional[int]:
+        """Return the number of results in the window."""
+        self.count_requests += 1
+        return self.count(start, end)
+
+    def split(self, start: arrow.Arrow, end: arrow.Arrow) -> List[TimeWindow]:
+        """Return the non-empty sub-windows of [start, end) in chronological order."""
+        windows = []
+        stack = [TimeWindow(start, end, self._count(start, end))]
+        while stack:
+            window = stack.pop()
+            if window.count == 0:
+                continue
+
+            half_seconds = int((window.end - window.start).total_seconds() // 2)
+            if (
+                window.count is None
+                or window.count <= self.max_count
+                or half_seconds < self.min_window_seconds
+            ):
+                windows.append(window)
+                continue
+
+            mid = window.start.shift(seconds=half_seconds)
+            left_count = self._count(window.start, mid)
+            if left_count is None:
+                # counts are not available for this window, download it as a whole
+                windows.append(window)
+                continue
+
+            # push the right half first so the left half is processed first
+            stack.append(TimeWindow(mid, window.end, max(0, window.count - left_count)))
+            stack.append(TimeWindow(window.start, mid, left_count))
+
+        self.log.info(
+            f'feature=time-window-splitter, event=split, start={start}, end={end}, '
+            f'windows={len(windows)}, count-requests={self.count_requests}, '
+            f'max-count={self.max_count}'
+        )
+        return windows
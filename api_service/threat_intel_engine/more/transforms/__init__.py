@@ -1,3 +1,5 @@
 """Transforms"""
 # flake8: noqa
+from .columnar_transform import ColumnarTransform
+from .compiled_ti_transform import CompiledTiTransform, CompiledTiTransforms
 from .indicator_transform import IndicatorTransform
@@ -0,0 +1,307 @@
+"""Columnar Indicator Transform"""
+# standard library
+from inspect import signature
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
+
+# third-party
+import jmespath
+from more.datetime_util import tc_datetime
+from tcex.api.tc.ti_transform.model import IndicatorTransformModel, MetadataTransformModel
+
+if TYPE_CHECKING:
+    # third-party
+    from tcex.api.tc.ti_transform.model import GroupTransformModel
+
+# marker for a value that could not be transformed, the record falls back to the per-record engine
+FALLBACK = object()
+
+
+class ColumnarTransform:
+    """Columnar fast path for indicator transforms that only map flat fields.
+
+    A chunk of TI dicts is loaded into one column per field, the field mappings, defaults and
+    method transforms are applied column by column and the batch items are assembled from the
+    columns. The output is identical to the per-record engine (TiTransform).
+
+    Only a single indicator transform without "applies" is supported, where every field path is
+    a top-level key and every transform is a "method" that does not take ti_dict/transform.
+    Nested fields (associated groups, attributes, security labels, tags) are supported as long
+    as a record has no data at the root key of their path. Every other record (nested data,
+    errors, non-dict TI data) returns None and must be processed by the per-record engine.
+    """
+
+    chunk_size = 5_000
+    datetime_fields = {'dateAdded': 'date_added', 'lastModified': 'last_modified'}
+    flat_fields = (
+        'active',
+        'confidence',
+        'dns_active',
+        'rating',
+        'size',
+        'type',
+        'value1',
+        'value2',
+        'value3',
+        'whois_active',
+        'xid',
+    )
+    nested_fields = ('associated_groups', 'attributes', 'security_labels', 'tags')
+    type_fields = {
+        'File': {'size': 'size'},
+        'Host': {'dnsActive': 'dns_active', 'whoisActive': 'whois_active'},
+    }
+
+    # transform id -> (transform, columnar transform or None if not supported)
+    plans: Dict[int, Tuple[object, Optional['ColumnarTransform']]] = {}
+
+    def __init__(self, transform: IndicatorTransformModel, gate_keys: Set[str]):
+        """Initialize class properties."""
+        self.transform = transform
+        self.gate_keys = sorted(gate_keys)
+
+    @staticmethod
+    def _has_data(value: Any) -> bool:
+        """Return True if a nested path rooted at value could return data."""
+        return value is not None and value != []
+
+    @staticmethod
+    def _is_flat(metadata: Optional[MetadataTransformModel]) -> bool:
+        """Return True if the metadata path is a top-level key and the transforms are simple."""
+        if metadata is None:
+            return True
+        if metadata.path is not None and ColumnarTransform._key(metadata.path) is None:
+            return False
+
+        for t in metadata.transform or []:
+            if t.filter_map is not None or t.static_map is not None:
+                return False
+            if callable(t.method):
+                try:
+                    parameters = signature(t.method, follow_wrapped=True).parameters
+                except (TypeError, ValueError):
+                    continue
+                if 'ti_dict' in parameters or 'transform' in parameters:
+                    return False
+        return True
+
+    @staticmethod
+    def _key(path: str) -> Optional[str]:
+        """Return the key if path is a single top-level key."""
+        node = jmespath.compile(path).parsed
+        if node['type'] == 'field':
+            return node['value']
+        return None
+
+    @classmethod
+    def _root_key(cls, node: dict) -> Optional[str]:
+        """Return the top-level key that all data returned by the path is read from.
+
+        When the key is missing (or an empty array) the path returns None or an empty array.
+        """
+        if node['type'] == 'field':
+            return node['value']
+        if node['type'] in (
+            'filter_projection',
+            'flatten',
+            'index_expression',
+            'projection',
+            'subexpression',
+            'value_projection',
+        ):
+            return cls._root_key(node['children'][0])
+        return None
+
+    def _datetimes(self, metadata: Optional[object], ti_dicts: List[dict]) -> List[Any]:
+        """Return the column of TC datetime values for a datetime field."""
+        if metadata is None or metadata.path is None:
+            return [None] * len(ti_dicts)
+
+        # timestamps repeat within a chunk (e.g., dateAdded), convert each one once
+        cache = {}
+        key = self._key(metadata.path)
+        values = []
+        for ti_dict in ti_dicts:
+            value = ti_dict.get(key)
+            if value is None:
+                values.append(None)
+                continue
+
+            try:
+                converted = cache.get(value, FALLBACK)
+            except TypeError:
+                # unhashable values are handled by the per-record engine
+                values.append(FALLBACK)
+                continue
+
+            if converted is FALLBACK:
+                try:
+                    converted = tc_datetime(value)
+                except Exception:
+                    converted = FALLBACK
+                cache[value] = converted
+            values.append(converted)
+        return values
+
+    def _values(self, metadata: Optional[MetadataTransformModel], ti_dicts: List[dict]) -> List:
+        """Return the column of transformed values for a flat field."""
+        if metadata is None:
+            return [None] * len(ti_dicts)
+
+        default = metadata.default
+        if metadata.path is None:
+            return [default] * len(ti_dicts)
+
+        key = self._key(metadata.path)
+        # only "method" is applied to single values, same as TiTransform._transform_value
+        methods = [(t.method, t.kwargs or {}) for t in metadata.transform or [] if t.method]
+        if not methods:
+            return [
+                default if value is None else value if isinstance(value, str) else str(value)
+                for value in (ti_dict.get(key) for ti_dict in ti_dicts)
+            ]
+
+        values = []
+        for ti_dict in ti_dicts:
+            value = ti_dict.get(key)
+            if value is None:
+                values.append(default)
+                continue
+
+            try:
+                for method, kwargs in methods:
+                    value = method(value, **kwargs)
+            except Exception:
+                values.append(FALLBACK)
+                continue
+
+            if value is None:
+                value = default
+            elif not isinstance(value, str):
+                value = str(value)
+            values.append(value)
+        return values
+
+    @classmethod
+    def get(
+        cls, transforms: List[Union['GroupTransformModel', IndicatorTransformModel]]
+    ) -> Optional['ColumnarTransform']:
+        """Return the columnar transform for transforms, None if not supported."""
+        if len(transforms) != 1:
+            return None
+
+        transform = transforms[0]
+        plan = cls.plans.get(id(transform))
+        if plan is None or plan[0] is not transform:
+            plan = cls.plans[id(transform)] = (transform, cls._plan(transform))
+        return plan[1]
+
+    @classmethod
+    def _plan(cls, transform: object) -> Optional['ColumnarTransform']:
+        """Return the columnar transform for transform, None if not supported."""
+        if (
+            not isinstance(transform, IndicatorTransformModel)
+            or transform.applies is not None
+            or transform.file_occurrences
+        ):
+            return None
+
+        if not all(cls._is_flat(getattr(transform, field)) for field in cls.flat_fields):
+            return None
+
+        for field in cls.datetime_fields.values():
+            metadata = getattr(transform, field)
+            if metadata is not None and metadata.path is not None:
+                if cls._key(metadata.path) is None:
+                    return None
+
+        # records without data at the root key of all nested paths produce no nested output
+        gate_keys = set()
+        for field in cls.nested_fields:
+            for item in getattr(transform, field) or []:
+                value = item.value
+                if (
+                    not isinstance(value, MetadataTransformModel)
+                    or value.path is None
+                    or value.default is not None
+                ):
+                    return None
+
+                root_key = cls._root_key(jmespath.compile(value.path).parsed)
+                if root_key is None:
+                    return None
+                gate_keys.add(root_key)
+
+        return cls(transform, gate_keys)
+
+    def transform_chunk(self, ti_dicts: List[Any]) -> List[Optional[dict]]:
+        """Return the batch item of each TI dict, None if the per-record engine is required."""
+        items: List[Optional[dict]] = [None] * len(ti_dicts)
+        positions = [
+            index
+            for index, ti_dict in enumerate(ti_dicts)
+            if isinstance(ti_dict, dict)
+            and not any(self._has_data(ti_dict.get(key)) for key in self.gate_keys)
+        ]
+        rows = [ti_dicts[index] for index in positions]
+
+        transform = self.transform
+        columns = {
+            field: self._values(getattr(transform, field), rows) for field in self.flat_fields
+        }
+        datetimes = {
+            name: self._datetimes(getattr(transform, field), rows)
+            for name, field in self.datetime_fields.items()
+        }
+
+        for row, index in enumerate(positions):
+            item = self._item(row, columns, datetimes)
+            if item is not None:
+                items[index] = dict(sorted(item.items()))
+        return items
+
+    def _item(
+        self, row: int, columns: Dict[str, List], datetimes: Dict[str, List]
+    ) -> Optional[dict]:
+        """Return the batch item for a row of the columns, None if the row falls back."""
+        # type is processed first, a missing type is an error
+        type_ = columns['type'][row]
+        if type_ is None or type_ is FALLBACK:
+            return None
+
+        values = [columns['value1'][row], columns['value2'][row], columns['value3'][row]]
+        if any(value is FALLBACK for value in values) or not any(values):
+            return None
+
+        item = {
+            'summary': ' : '.join([value for value in values if value is not None]),
+            'type': type_,
+        }
+
+        # metadata fields, only added when the value is truthy (TiTransform.add_metadata)
+        metadata = {'active': 'active', 'xid': 'xid'}
+        metadata.update(self.type_fields.get(type_, {}))
+        for name, field in metadata.items():
+            value = columns[field][row]
+            if value is FALLBACK:
+                return None
+            if value:
+                item[name] = value
+
+        for name, cast in (('confidence', int), ('rating', float)):
+            value = columns[name][row]
+            if value is FALLBACK:
+                return None
+            if value is not None:
+                try:
+                    item[name] = cast(value)
+                except (TypeError, ValueError):
+                    return None
+
+        for name, column in datetimes.items():
+            value = column[row]
+            if value is FALLBACK:
+                return None
+            if value:
+                item[name] = value
+
+        return item
@@ -0,0 +1,180 @@
+"""Compiled TI Transform"""
+# standard library
+import traceback
+from inspect import signature
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, List, Optional, Union
+
+# third-party
+import jmespath
+from more.datetime_util import tc_datetime
+from pydantic import BaseModel
+from tcex.api.tc.ti_transform import TiTransform, TiTransforms
+from tcex.api.tc.ti_transform.model import GroupTransformModel, IndicatorTransformModel
+from tcex.api.tc.ti_transform.model.transform_model import PathTransformModel
+
+from .columnar_transform import ColumnarTransform
+
+if TYPE_CHECKING:
+    # third-party
+    from jmespath.parser import ParsedResult
+
+
+class CompiledTiTransform(TiTransform):
+    """TI Transform using jmespath expressions and callable signatures compiled once.
+
+    The tcex TiTransform parses every path on every search, inspects the signature of every
+    callable on every call, and parses datetime values with the multi-format any_to_datetime.
+    This class shares the compiled expressions and signatures across all instances and uses
+    the memoized datetime_util parser. The state is populated by compile() in the parent
+    process and inherited copy-on-write by forked tasks.
+
+    The overridden methods (_path_search, _process_metadata_datetime and
+    _transform_value_callable) are internal to tcex, the tcex version is pinned in
+    requirements.txt and the output is compared to TiTransform by the tests.
+    """
+
+    expressions: Dict[str, 'ParsedResult'] = {}
+    parameters: Dict[Callable, FrozenSet[str]] = {}
+
+    @classmethod
+    def _compile_model(cls, model: object):
+        """Compile the paths and callables of a (nested) transform model."""
+        if isinstance(model, BaseModel):
+            for name, value in model:
+                if name == 'path' and isinstance(model, PathTransformModel):
+                    cls._expression(value)
+                elif name in ('for_each', 'method') and callable(value):
+                    cls._parameters(value)
+                else:
+                    cls._compile_model(value)
+        elif isinstance(model, (list, tuple)):
+            for item in model:
+                cls._compile_model(item)
+
+    @classmethod
+    def _expression(cls, path: str) -> 'ParsedResult':
+        """Return the compiled jmespath expression for path."""
+        expression = cls.expressions.get(path)
+        if expression is None:
+            expression = cls.expressions[path] = jmespath.compile(path)
+        return expression
+
+    @classmethod
+    def _parameters(cls, c: Callable) -> FrozenSet[str]:
+        """Return the parameter names of the callable."""
+        parameters = cls.parameters.get(c)
+        if parameters is None:
+            try:
+                parameters = frozenset(signature(c, follow_wrapped=True).parameters)
+            except (TypeError, ValueError):
+                # signature doesn't work for many built-in methods/functions
+                parameters = frozenset()
+            cls.parameters[c] = parameters
+        return parameters
+
+    def _path_search(self, path: Optional[str]) -> any:
+        """Return the value of the provided path."""
+        if path is not None:
+            return self._expression(path).search(self.ti_dict, options=self.jmespath_options)
+        return None
+
+    def _process_metadata_datetime(self, key: str, metadata: Optional[object]):
+        """Process metadata fields that should be a TC datetime."""
+        if metadata is not None:
+            value = self._path_search(metadata.path)
+            if value is not None:
+                self.add_metadata(key, tc_datetime(value))
+
+    def _transform_value_callable(
+        self, value: Union[dict, list, str], c: Callable, kwargs: Optional[dict] = None
+    ) -> Union[Optional[str], Optional[List[str]]]:
+        """Transform values in the TI data."""
+        kwargs = dict(kwargs or {})
+        parameters = self._parameters(c)
+        if 'ti_dict' in parameters:
+            kwargs['ti_dict'] = self.ti_dict
+        if 'transform' in parameters:
+            kwargs['transform'] = self
+
+        # pass value to transform callable/method, which should always return a string
+        return c(value, **kwargs)
+
+    @classmethod
+    def compile(
+        cls,
+        transforms: Union[
+            'GroupTransformModel',
+            'IndicatorTransformModel',
+            List[Union['GroupTransformModel', 'IndicatorTransformModel']],
+        ],
+    ):
+        """Compile all paths and callables of the transforms and the columnar fast path."""
+        transforms = transforms if isinstance(transforms, list) else [transforms]
+        cls._compile_model(transforms)
+        ColumnarTransform.get(transforms)
+
+
+class CompiledTiTransforms(TiTransforms):
+    """TI Transforms using CompiledTiTransform.
+
+    When the transform only maps flat fields, the TI dicts are transformed in chunks using the
+    columnar fast path. Records the fast path does not support are processed by the per-record
+    engine, in the same order.
+    """
+
+    def _batch_record(self, ti_dict: dict, batch: dict):
+        """Add the batch data of a single TI dict using the per-record engine."""
+        t = CompiledTiTransform(ti_dict, self.transforms)
+        try:
+            data = t.batch
+        except Exception as ex:
+            self.log.error(
+                f'feature=ti-transforms, event=transform-error, error="{ex}", '
+                f'traceback={traceback.format_exc()}'
+            )
+            return
+
+        # now that batch is called we can identify the ti type
+        if isinstance(t.transform, GroupTransformModel):
+            batch['group'].append(data)
+        elif isinstance(t.transform, IndicatorTransformModel):
+            batch['indicator'].append(data)
+
+        # append adhoc groups and indicators
+        batch['group'].extend(t.adhoc_groups)
+        batch['indicator'].extend(t.adhoc_indicators)
+
+    @property
+    def batch(self) -> dict:
+        """Return the data in batch format."""
+        columnar = ColumnarTransform.get(self.transforms)
+        if columnar is None:
+            return super().batch
+
+        batch = {
+            'group': [],
+            'indicator': [],
+        }
+        fallback_count = 0
+        for index in range(0, len(self.ti_dicts), columnar.chunk_size):
+            end = index + columnar.chunk_size
+            chunk = self.ti_dicts[index:end]
+            for ti_dict, data in zip(chunk, columnar.transform_chunk(chunk)):
+                if data is None:
+                    fallback_count += 1
+                    self._batch_record(ti_dict, batch)
+                else:
+                    batch['indicator'].append(data)
+
+        self.log.trace(
+            f'feature=ti-transform-batch, ti-count={len(self.ti_dicts)}, '
+            f'columnar-count={len(self.ti_dicts) - fallback_count}, '
+            f'fallback-count={fallback_count}'
+        )
+        return batch
+
+    def process(self):
+        """Process the mapping."""
+        self.transformed_collection = [
+            CompiledTiTransform(ti_dict, self.transforms) for ti_dict in self.ti_dicts
+        ]
@@ -2,12 +2,15 @@
 # standard library
 import logging
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, List, Union
 
 # third-party
 from more import DbUtil, Metrics, session
+from more.datetime_util import tc_datetime
 from tcex.backports import cached_property
 
+from .compiled_ti_transform import CompiledTiTransform, CompiledTiTransforms
+
 if TYPE_CHECKING:
     # third-party
     from pydantic import BaseModel
@@ -29,9 +32,7 @@ class TransformABC(ABC):
         self.tcex = tcex
 
         # properties
-        self.db = DbUtil()
         self.log = logger
-        self.metrics = Metrics()
         self.session = session
         self.ti_tracker = {
             'actor': {},
@@ -45,6 +46,19 @@ class TransformABC(ABC):
         """Generate group xids."""
         return f'{ti_type}-{id_}'.upper()
 
+    def compile(self):
+        """Compile the paths and callables of the transform.
+
+        Tasks call this method before forking, so the compiled state is shared copy-on-write
+        by every run instead of being rebuilt in each forked process.
+        """
+        CompiledTiTransform.compile(self.transform)
+
+    @cached_property
+    def db(self) -> DbUtil:
+        """Return an instance of DbUtil."""
+        return DbUtil()
+
     @cached_property
     def _map_target_country(self):
         """Return target country map."""
@@ -58,10 +72,19 @@ class TransformABC(ABC):
             'Vietnam': 'Viet Nam',
         }
 
+    @cached_property
+    def metrics(self) -> Metrics:
+        """Return an instance of Metrics."""
+        return Metrics()
+
+    def ti_transforms(self, ti_dicts: List[dict]) -> CompiledTiTransforms:
+        """Return the TI transforms of ti_dicts using the compiled transform."""
+        return CompiledTiTransforms(ti_dicts, self.transform)
+
     def _transform_datetime(self, timestamp: str) -> str:
         """Convert timestamp value to epoch."""
         try:
-            return self.tcex.utils.any_to_datetime(timestamp).strftime('%Y-%m-%dT%H:%M:%SZ')
+            return tc_datetime(timestamp)
         except Exception:
             return None
 
@@ -3,13 +3,13 @@
 import json
 import logging
 import traceback
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 # third-party
 import falcon
-from model import PaginatorResponseModel
 from more import error
-from pydantic import ValidationError, parse_obj_as
+from more.json_util import iter_json_bytes
+from pydantic import ValidationError, create_model, parse_obj_as
 
 if TYPE_CHECKING:
     # third-party
@@ -20,6 +20,99 @@ if TYPE_CHECKING:
 logger = logging.getLogger('tcex')
 
 
+# cache of compiled validation plans, keyed on (resource class, http method)
+_validation_plans: Dict[Tuple[type, str], Optional['ValidationPlan']] = {}
+
+
+def _binary_fields(model: Optional['BaseModel']) -> List[str]:
+    """Return the form data fields that are defined as MultipartFormDataModel."""
+    # build model schema data for future lookups
+    # "properties": {
+    #     "file": {
+    #          "title": "File",
+    #          "description": "Multi-part file data.",
+    #          "allOf": [
+    #            {
+    #              "$ref": "#/definitions/MultipartFormDataModel"
+    #            }
+    #          ]
+    #     },
+    binary_fields = []
+    if model is not None:
+        for field, data in model.schema().get('properties').items():
+            for ref in data.get('allOf', []):
+                if ref.get('$ref') == '#/definitions/MultipartFormDataModel':
+                    binary_fields.append(field)
+    return binary_fields
+
+
+def _list_model(model: Optional['BaseModel']) -> Optional['BaseModel']:
+    """Return a model that parses a list of the provided model (same as parse_obj_as)."""
+    if model is None:
+        return None
+    return create_model(f'{model.__name__}List', __root__=(List[model], ...))
+
+
+class ValidationPlan:
+    """Precompiled request and response validation for a single resource method.
+
+    Everything that only depends on the resource definition (models, binary form fields,
+    list parsers) is resolved once, so the per request work is only the validation itself.
+    """
+
+    def __init__(self, models: dict):
+        """Initialize class properties."""
+        request_models = models.get('request', {})
+        response_models = models.get('response', {})
+
+        # request
+        self.request_body: Optional['BaseModel'] = request_models.get('body')
+        self.request_body_list = _list_model(self.request_body)
+        self.request_form_data: Optional['BaseModel'] = request_models.get('form_data')
+        self.request_form_data_binary_fields = _binary_fields(self.request_form_data)
+        self.request_headers: Optional['BaseModel'] = request_models.get('headers')
+        self.request_query_params: Optional['BaseModel'] = request_models.get('query_params')
+
+        # response
+        self.response_body: Optional['BaseModel'] = response_models.get('body')
+        self.response_headers: Optional['BaseModel'] = response_models.get('headers')
+
+    @property
+    def has_response(self) -> bool:
+        """Return True if the plan has any response validation."""
+        return self.response_body is not None or self.response_headers is not None
+
+
+def compile_validation_plans(resource: object):
+    """Compile and cache the validation plans for every method of the resource."""
+    validation_models = getattr(resource, 'validation_models', None)
+    if isinstance(validation_models, dict):
+        for method in validation_models:
+            validation_plan(resource, method)
+
+
+def validation_plan(resource: object, method: str) -> Optional[ValidationPlan]:
+    """Return the cached validation plan for the resource method.
+
+    Resources without validation_models (or without models for the method) return None.
+    """
+    key = (type(resource), method)
+    try:
+        return _validation_plans[key]
+    except KeyError:
+        pass
+
+    plan = None
+    validation_models = getattr(resource, 'validation_models', None)
+    if isinstance(validation_models, dict) and method in validation_models:
+        plan = ValidationPlan(validation_models[method])
+    _validation_plans[key] = plan
+    logger.debug(
+        f'event=compile-validation-plan, resource={type(resource).__name__}, method={method}'
+    )
+    return plan
+
+
 def _process_validation_request_errors(ex: 'ValidationError', req: 'falcon.Request'):
     """Process any validation errors."""
     errors = json.loads(ex.json())
@@ -64,6 +157,19 @@ def format_validation_errors(
     )
 
 
+def _response_item(
+    model: 'BaseModel', data: Union['Base', dict], dict_param: dict, from_orm: bool
+) -> dict:
+    """Return a single row as a dict with the field filters applied.
+
+    The dict is built directly from the validated model, the Arrow/datetime values are left
+    as-is and encoded once by the JSON media handler when the response is serialized.
+    """
+    if from_orm is True:
+        return model.from_orm(data).dict(**dict_param)
+    return model(**data).dict(**dict_param)
+
+
 def response_media(
     req: 'falcon.Request',
     db_data: Union['Base', List['Base']],
@@ -72,28 +178,21 @@ def response_media(
     paginator: Optional['Paginator'] = None,
     from_orm: bool = True,
 ) -> dict:
-    """Apply field filters and return response text."""
-    json_param = {
+    """Apply field filters and return response media."""
+    dict_param = {
         'exclude': params.exclude_filter,
         'exclude_defaults': params.exclude_defaults,
         'exclude_none': params.exclude_none,
         'exclude_unset': params.exclude_unset,
         'include': params.include_filter,
-        'sort_keys': True,
     }
     try:
         if isinstance(db_data, list):
             # handle collection response
-            if from_orm is True:
-                media = [json.loads(model.from_orm(a).json(**json_param)) for a in db_data]
-            else:
-                media = [json.loads(model(**a).json(**json_param)) for a in db_data]
+            media = [_response_item(model, a, dict_param, from_orm) for a in db_data]
         else:
             # handle item response
-            if from_orm is True:
-                media = json.loads(model.from_orm(db_data).json(**json_param))
-            else:
-                media = json.loads(model(**db_data).json(**json_param))
+            media = _response_item(model, db_data, dict_param, from_orm)
 
         if paginator is not None:
             paginated_data = {
@@ -103,7 +202,9 @@ def response_media(
                 'previous': paginator.previous_url,
                 'total_count': paginator.total_count,
             }
-            media = PaginatorResponseModel(**paginated_data).dict(exclude_none=True)
+            # equivalent to PaginatorResponseModel(**paginated_data).dict(exclude_none=True),
+            # without validating (copying) every row in data a second time
+            media = {k: v for k, v in paginated_data.items() if v is not None}
 
         return media
     except ValidationError as ex:
@@ -119,7 +220,21 @@ def response_media(
         raise falcon.HTTPInternalServerError(**err) from ex
 
 
-def validate_request_body(req: 'falcon.Request', model: 'BaseModel'):
+def response_stream(resp: 'falcon.Response', media: Union[dict, list]):
+    """Stream the JSON encoded media to the response.
+
+    The media (typically the output of response_media) is encoded in chunks as the WSGI
+    server reads resp.stream, so no single encode of the full document is needed. The tcex API
+    service joins the chunks into one body, the large chunk size of iter_json_bytes keeps the
+    number of chunks (and the cost of the join) low.
+    """
+    resp.content_type = falcon.MEDIA_JSON
+    resp.stream = iter_json_bytes(media)
+
+
+def validate_request_body(
+    req: 'falcon.Request', model: 'BaseModel', model_list: Optional['BaseModel'] = None
+):
     """Validate request query parameters."""
     if model is not None:
         try:
@@ -127,7 +242,10 @@ def validate_request_body(req: 'falcon.Request', model: 'BaseModel'):
             media = req.get_media()
 
             if isinstance(media, list):
-                req.context.body = parse_obj_as(List[model], media)
+                if model_list is not None:
+                    req.context.body = model_list.parse_obj(media).__root__
+                else:
+                    req.context.body = parse_obj_as(List[model], media)
             elif isinstance(media, dict):
                 req.context.body = model(**media)
 
@@ -152,25 +270,13 @@ def validate_request_body(req: 'falcon.Request', model: 'BaseModel'):
             raise falcon.HTTPBadRequest(**err) from ex
 
 
-def validate_request_form_data(req: 'falcon.Request', model: 'BaseModel'):
+def validate_request_form_data(
+    req: 'falcon.Request', model: 'BaseModel', binary_fields: Optional[List[str]] = None
+):
     """Validate request query parameters."""
     if model is not None:
-        # build model schema data for future lookups
-        # "properties": {
-        #     "file": {
-        #          "title": "File",
-        #          "description": "Multi-part file data.",
-        #          "allOf": [
-        #            {
-        #              "$ref": "#/definitions/MultipartFormDataModel"
-        #            }
-        #          ]
-        #     },
-        binary_fields = []
-        for field, data in model.schema().get('properties').items():
-            for ref in data.get('allOf', []):
-                if ref.get('$ref') == '#/definitions/MultipartFormDataModel':
-                    binary_fields.append(field)
+        if binary_fields is None:
+            binary_fields = _binary_fields(model)
 
         try:
             _form_data = {}
@@ -1,7 +1,10 @@
 """Schema Definitions"""
 # flake8:noqa
 from .batch_error_schema import BatchErrorSchema
+from .batch_error_summary_schema import BatchErrorSummarySchema
+from .batch_sample_schema import BatchSampleSchema
 from .group_tracker_schema import GroupTrackerSchema
+from .indicator_hash_schema import IndicatorHashSchema
 from .job_request_schema import JobRequestSchema
 from .report_pdf_tracker_schema import ReportPdfTrackerSchema
 from .ti_processing_metric_schema import TiProcessingMetricSchema
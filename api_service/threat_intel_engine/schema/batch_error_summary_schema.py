@@ -0,0 +1,27 @@
+"""Database Schema Definition"""
+# third-party
+import arrow
+from more import Base
+from schema.arrow_date_time import ArrowDateTime
+from sqlalchemy import JSON, Column, ForeignKey, Integer, String, Text, UniqueConstraint
+
+
+class BatchErrorSummarySchema(Base):
+    """Database Schema Definition
+
+    One row per distinct (code, reason template) of a request, with an occurrence count and a
+    bounded sample of the raw reasons.
+    """
+
+    __tablename__ = 'batch_error_summary'
+    __table_args__ = (UniqueConstraint('request_id', 'code', 'reason_template'),)
+
+    id = Column(Integer, primary_key=True)
+    code = Column(String(10), nullable=False)
+    count = Column(Integer, default=0, nullable=False)
+    date_added = Column(ArrowDateTime, default=arrow.utcnow)
+    date_last_updated = Column(ArrowDateTime, default=arrow.utcnow, onupdate=arrow.utcnow)
+    message = Column(String)
+    reason_template = Column(Text, nullable=False)
+    request_id = Column(String, ForeignKey('job_request.request_id', ondelete='CASCADE'))
+    samples = Column(JSON, default=list)
@@ -0,0 +1,28 @@
+"""Database Schema Definition"""
+# third-party
+import arrow
+from more import Base
+from schema.arrow_date_time import ArrowDateTime
+from sqlalchemy import Column, Float, Integer, String
+
+
+class BatchSampleSchema(Base):
+    """Database Schema Definition
+
+    One row per submitted batch with its size, latency, and result, and the batch size chosen
+    for the next batches (see BatchSizeController).
+    """
+
+    __tablename__ = 'batch_sample'
+
+    id = Column(Integer, primary_key=True)
+    batch_size = Column(Integer, nullable=False)
+    batch_size_next = Column(Integer, nullable=False)
+    count_error = Column(Integer, default=0)
+    count_success = Column(Integer, default=0)
+    date_added = Column(ArrowDateTime, default=arrow.utcnow)
+    poll_seconds = Column(Float, default=0)
+    reason = Column(String(20))
+    request_id = Column(String)
+    status = Column(String(20))
+    submit_seconds = Column(Float, default=0)
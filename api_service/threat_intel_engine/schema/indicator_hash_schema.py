@@ -0,0 +1,19 @@
+"""Database Schema Definition"""
+# third-party
+import arrow
+from more import Base
+from schema.arrow_date_time import ArrowDateTime
+from sqlalchemy import Column, String
+
+
+class IndicatorHashSchema(Base):
+    """Database Schema Definition
+
+    Index of the indicators (xid + lastModified) that have been uploaded to ThreatConnect.
+    """
+
+    __tablename__ = 'indicator_hash'
+
+    xid = Column(String, primary_key=True)
+    date_uploaded = Column(ArrowDateTime, default=arrow.utcnow, index=True)
+    last_modified = Column(String, nullable=False)
@@ -14,8 +14,13 @@ class JobRequestSchema(JobRequestBaseSchema):
     count_batch_error = Column(Integer, default=0)
     count_batch_group_success = Column(Integer, default=0)
     count_batch_indicator_success = Column(Integer, default=0)
+    count_convert_bloom_false_positive = Column(Integer, default=0)
+    count_convert_bloom_negative = Column(Integer, default=0)
+    count_convert_indicator_duplicate = Column(Integer, default=0)
+    count_convert_indicator_unique = Column(Integer, default=0)
     count_download_group = Column(Integer, default=0)
     count_download_indicator = Column(Integer, default=0)
+    count_retry = Column(Integer, default=0)
 
     # track start and complete time of task for metrics and reporting
     date_convert_start = Column(ArrowDateTime, nullable=True)
@@ -25,6 +30,9 @@ class JobRequestSchema(JobRequestBaseSchema):
     date_upload_start = Column(ArrowDateTime, nullable=True)
     date_upload_complete = Column(ArrowDateTime, nullable=True)
 
+    # the date of the next automatic retry of a failed job request
+    date_retry = Column(ArrowDateTime, nullable=True)
+
     # task settings
     last_modified_filter_start = Column(ArrowDateTime, nullable=False)
     last_modified_filter_end = Column(ArrowDateTime, nullable=False)
@@ -4,6 +4,7 @@
 from .cleaner import Cleaner
 from .convert_path_pipe import ConvertPathPipe
 from .download_path_pipe import DownloadPathPipe
+from .retry_failed import RetryFailed
 from .schedule_next_download import ScheduleNextDownload
 from .task_abc import TaskABC
 from .task_path_pipe_abc import TaskPathPipeABC
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import TYPE_CHECKING
 
 # third-party
+from more import IndicatorHashIndex
 from schema import JobRequestSchema
 from tasks.model import TaskSettingModel
 from tcex.backports import cached_property
@@ -109,6 +110,19 @@ class Cleaner(TaskABC):
             # log exception
             self.log.exception('failure=failed-cleaning-job-request')
 
+    def _clean_indicator_hash_index(self):
+        """Remove indicators from the hash index older than indicator_hash_ttl_days.
+
+        The Bloom filter is rebuilt afterwards when it is filling up (see rebuild_bloom), dropping
+        the evicted indicators from it.
+        """
+        indicator_hash_index = IndicatorHashIndex(self.settings.base_path)
+        indicator_hash_index.evict(self.settings.indicator_hash_ttl_days)
+        if self.settings.indicator_dedup_enabled:
+            indicator_hash_index.rebuild_bloom(
+                self.settings.indicator_bloom_min_capacity, self.settings.indicator_bloom_fp_rate
+            )
+
     @property
     def _disk_usage(self) -> int:
         """Return True if the disk usage has been exceeded."""
@@ -131,6 +145,7 @@ class Cleaner(TaskABC):
         """Run the general cleaner task."""
         # clean db
         self._clean_job_requests()
+        self._clean_indicator_hash_index()
 
         # only launch cleaner if disk usage is greater than defined percentage
         # remove directories until disk usage is less than defined percentage or 2 days
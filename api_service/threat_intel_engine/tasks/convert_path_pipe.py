@@ -2,9 +2,11 @@
 # standard library
 import gzip
 import json
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 # third-party
+from more import IndicatorHashIndex
+from more.batch_size_controller import BatchSizeController
 from more.transforms import IndicatorTransform
 from schema import JobRequestSchema
 from tasks.model import TaskSettingPipeModel
@@ -41,6 +43,10 @@ class ConvertPathPipe(TaskPathPipeABC):
         super().__init__(settings, tcex)
 
         # properties
+        self.indicator_transform = IndicatorTransform(self.settings, self.tcex)
+
+        # compile the transform in the parent, forked runs share it copy-on-write
+        self.indicator_transform.compile()
 
     @staticmethod
     def _has_ti_data(data: dict) -> bool:
@@ -49,7 +55,19 @@ class ConvertPathPipe(TaskPathPipeABC):
             return True
         return False
 
-    def run(self, _: str, input_dir: 'Path', output_dir: 'Path'):
+    def _reset_counts(self, request_id: str):
+        """Reset counts for request_id."""
+        self._db_reset_counts(
+            request_id,
+            [
+                'count_convert_bloom_false_positive',
+                'count_convert_bloom_negative',
+                'count_convert_indicator_duplicate',
+                'count_convert_indicator_unique',
+            ],
+        )
+
+    def run(self, request_id: str, input_dir: 'Path', output_dir: 'Path'):
         """Run the task.
 
         The request_id, input_dir, and output_dir are passed to the run method of all task. For
@@ -57,30 +75,101 @@ class ConvertPathPipe(TaskPathPipeABC):
         converted data to disk and is the input directory for the next task in the pipe.
         """
 
-        # get an instance of the transform classes, this class will take
-        # the provider data and convert it to ThreatConnect batch format.
-        indicator_transform = IndicatorTransform(self.settings, self.tcex).transform
+        # reset counts in case previous attempt failed
+        self._reset_counts(request_id)
+
+        # a new instance per run picks up the latest Bloom filter built by the cleaner
+        indicator_hash_index = None
+        if self.settings.indicator_dedup_enabled:
+            indicator_hash_index = IndicatorHashIndex(self.settings.base_path)
+
+        try:
+            counts = self._convert_files(input_dir, output_dir, indicator_hash_index)
+            if indicator_hash_index is not None:
+                counts.update(
+                    {
+                        'count_convert_bloom_false_positive': (
+                            indicator_hash_index.bloom_false_positive
+                        ),
+                        'count_convert_bloom_negative': indicator_hash_index.bloom_negative,
+                    }
+                )
+                self._db_increment_counts(request_id, counts)
+                self.log.info(
+                    f'task-event=indicator-dedup, request-id={request_id}, '
+                    f'duplicate={counts["count_convert_indicator_duplicate"]}, '
+                    f'unique={counts["count_convert_indicator_unique"]}'
+                )
+                self._log_bloom_metrics(request_id, indicator_hash_index, counts)
+        finally:
+            if indicator_hash_index is not None:
+                indicator_hash_index.close()
+
+    def _convert_files(
+        self,
+        input_dir: 'Path',
+        output_dir: 'Path',
+        indicator_hash_index: Optional[IndicatorHashIndex],
+    ) -> dict:
+        """Convert the files of the input directory, returning the dedup counts."""
+        counts = {'count_convert_indicator_duplicate': 0, 'count_convert_indicator_unique': 0}
+        seen = set()
 
         # iterate over all files in the input directory, which should be the output of the download
-        # task. The files are sorted to ensure the data is processed in the correct order.
-        for domain_file in sorted(input_dir.glob('*indicators*')) or []:
+        # task. The files are sorted to ensure the data is processed in the correct order. When the
+        # download is streamed the files are processed as they are published.
+        for domain_file in self._input_files(input_dir, '*indicators*'):
             # by default the files are gzipped, so open the file in text mode and load the json
             with gzip.open(domain_file, mode='rt', encoding='utf-8') as fh:
                 contents = json.load(fh)
 
             # if the file is not empty, then transform the data and write the results to disk.
             if contents:
-                transforms = self.tcex.api.tc.ti_transforms(contents, indicator_transform)
+                # the transform class takes the provider data and
+                # converts it to ThreatConnect batch format.
+                transforms = self.indicator_transform.ti_transforms(contents)
 
                 # retrieve the batch data from the transform
                 data = transforms.batch
+
+                # drop indicators that were already uploaded and have not changed since
+                if indicator_hash_index is not None and data.get('indicator'):
+                    data['indicator'], duplicates = indicator_hash_index.filter_unchanged(
+                        data['indicator'], seen
+                    )
+                    counts['count_convert_indicator_duplicate'] += duplicates
+                    counts['count_convert_indicator_unique'] += len(data['indicator'])
+
                 if self._has_ti_data(data):
                     # use built-in method to write the data to
                     # disk, this method also updates heartbeat
                     self._write_batch_data(data, output_dir, 'domain')
 
+        return counts
+
+    def _log_bloom_metrics(
+        self, request_id: str, indicator_hash_index: IndicatorHashIndex, counts: dict
+    ):
+        """Log the Bloom filter size, false-positive rate and lookups saved for the job."""
+        bloom = indicator_hash_index.bloom
+        if bloom is None:
+            self.log.info(f'task-event=indicator-bloom, request-id={request_id}, status=not-built')
+            return
+
+        # observed rate: false positives out of all indicators that were not duplicates
+        false_positive = counts['count_convert_bloom_false_positive']
+        negative = counts['count_convert_bloom_negative']
+        fp_rate_observed = false_positive / (false_positive + negative or 1)
+        self.log.info(
+            f'task-event=indicator-bloom, request-id={request_id}, '
+            f'size-bytes={bloom.size}, count={bloom.count}, capacity={bloom.capacity}, '
+            f'fp-rate-target={bloom.fp_rate}, fp-rate-estimate={bloom.fp_rate_estimate:.6f}, '
+            f'fp-rate-observed={fp_rate_observed:.6f}, false-positive={false_positive}, '
+            f'lookup-saved={negative}'
+        )
+
     @staticmethod
-    def _lazy_chunk(iterable, chunk_size=5_000):
+    def _lazy_chunk(iterable, chunk_size: int = 5_000):
         """Break iterable into chunks without consuming it first."""
         chunk = []
         for i in iterable:
@@ -96,17 +185,30 @@ class ConvertPathPipe(TaskPathPipeABC):
         # update the task heartbeat
         self.update_heartbeat()
 
+        # the batch size is adjusted by Upload using the latency of the submitted batches
+        batch_size = self.batch_size_controller.batch_size
         total_data_length = len(data.get('group', [])) + len(data.get('indicator', []))
 
-        if total_data_length < 5_000:
+        if total_data_length < batch_size:
             self._write_results(data, output_dir, type_)
         else:
             if data.get('group', []):
                 self._write_results({'group': data['group']}, output_dir, type_)
             if data.get('indicator', []):
-                for chunk in self._lazy_chunk(data['indicator']):
+                for chunk in self._lazy_chunk(data['indicator'], batch_size):
                     self._write_results({'indicator': chunk}, output_dir, type_)
 
+    @cached_property
+    def batch_size_controller(self) -> BatchSizeController:
+        """Return the batch size controller."""
+        return BatchSizeController(
+            self.settings.batch_size,
+            self.settings.batch_size_min,
+            self.settings.batch_size_max,
+            self.settings.batch_latency_target_seconds,
+            enabled=self.settings.batch_size_adaptive,
+        )
+
     @cached_property
     def task_settings(self) -> 'TaskSettingPipeModel':
         """Return the task settings.
@@ -126,4 +228,7 @@ class ConvertPathPipe(TaskPathPipeABC):
             description='Converts the CTI data into the ThreatConnect batch format.',
             max_execution_minutes=20,
             name='Convert',
+            stream_output=(
+                self.settings.pipe_streaming_enabled and self.settings.pipe_streaming_upload
+            ),
         )
@@ -1,10 +1,23 @@
 """Task Module"""
 # standard library
-from typing import TYPE_CHECKING
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Optional
 
 # third-party
+import arrow
 from model.job_request_model import JobRequestModel
-from more import Metrics, session
+from more import (
+    BackpressureController,
+    Checkpoint,
+    KeysetCursor,
+    Metrics,
+    StageBacklog,
+    TimeWindow,
+    TimeWindowSplitter,
+    session,
+)
+from more.datetime_util import any_to_datetime
 from schema import JobRequestSchema
 from tasks.model import TaskSettingPipeModel
 from tasks.task_path_pipe_abc import TaskPathPipeABC
@@ -36,7 +49,10 @@ class DownloadPathPipe(TaskPathPipeABC):
 
     """
 
-    def __init__(self, settings: 'BaseModel', tcex: 'TcEx', provider_sdk: any):
+    checkpoint_filename = 'checkpoint.json'
+    chunk_size = 5_000
+
+    def __init__(self, settings: 'BaseModel', tcex: 'TcEx', provider_sdk: any, tasks: 'Tasks'):
         """Initialize class properties."""
         super().__init__(settings, tcex)
 
@@ -44,6 +60,7 @@ class DownloadPathPipe(TaskPathPipeABC):
         self.log = tcex.log
         self.metrics = Metrics()
         self.provider_sdk = provider_sdk
+        self.tasks = tasks
 
     def _process_counts(self, request_id: str, counts: dict):
         """Report metrics to the metrics table and counts to the job request table."""
@@ -66,6 +83,45 @@ class DownloadPathPipe(TaskPathPipeABC):
             },
         )
 
+    def _dir_size(self, path: 'Path') -> int:
+        """Return the bytes of the files in the directory."""
+        size_bytes = 0
+        for fqfn in path.rglob('*'):
+            try:
+                if fqfn.is_file():
+                    size_bytes += fqfn.stat().st_size
+            except OSError:
+                # the file was moved or removed by the downstream task
+                pass
+        return size_bytes
+
+    def _stage_backlogs(self) -> List[StageBacklog]:
+        """Return the backlog of the downstream pipe tasks."""
+        window_minutes = self.settings.throttle_throughput_window_minutes
+        since = arrow.utcnow().shift(minutes=-window_minutes)
+        pipe_tasks = sorted(
+            [t for t in self.tasks.all() if t.task_settings.task_type == 'path_pipe'],
+            key=lambda t: t.task_settings.index,
+        )
+
+        backlogs = []
+        for task in pipe_tasks[1:]:
+            request_dirs = [d for d in task.task_settings.working_dir_in.iterdir() if d.is_dir()]
+            date_field = getattr(JobRequestSchema, task.task_settings.date_field_complete)
+            query = session.query(JobRequestSchema).filter(  # pylint: disable=no-member
+                date_field >= since
+            )
+            completed = self.db.get_record(query, 'count', 'Unexpected error getting job count.')
+            backlogs.append(
+                StageBacklog(
+                    name=task.task_settings.slug,
+                    queue_depth=len(request_dirs),
+                    size_bytes=sum(self._dir_size(d) for d in request_dirs),
+                    throughput=round(completed / window_minutes, 4),
+                )
+            )
+        return backlogs
+
     def _throttle_download(self) -> bool:
         """Throttle download to prevent too much stale data on disk.
 
@@ -96,8 +152,13 @@ class DownloadPathPipe(TaskPathPipeABC):
             f'task-event=throttle-download, count={count}, final-status={Tasks.status_final}'
         )
 
-        # block download if the count is greater than the throttle limit
-        if count >= self.settings.throttle_limit:
+        # block download if the count is greater than the throttle limit (evaluated once)
+        throttle_limit = self.throttle_limit
+        if count >= throttle_limit:
+            self.log.trace(
+                f'task-event=launch-preflight-check-skip, action={self.task_settings.name}, '
+                f'reason=throttle-limit-hit, count={count}, throttle-limit={throttle_limit}'
+            )
             return True
         return False
 
@@ -111,10 +172,6 @@ class DownloadPathPipe(TaskPathPipeABC):
         """
         # pylint: disable=no-member
         if self._throttle_download():
-            self.log.trace(
-                f'task-event=launch-preflight-check-skip, action={self.task_settings.name}, '
-                f'reason=throttle-limit-hit, throttle-limit={self.settings.throttle_limit}'
-            )
             return
 
         # process "scheduled" tasks first, then ad-hoc request,
@@ -153,43 +210,278 @@ class DownloadPathPipe(TaskPathPipeABC):
         the download task input comes from the job request table and therefore the input_dir is
         not used. The output_dir is used to write the downloaded data to disk and is the input
         directory for the next task in the pipe.
+
+        The windows, the written chunks and the last page key of each window are stored in a
+        checkpoint in the output_dir. A run of a job request that was killed or failed resumes
+        from the checkpoint and the chunks written by the previous run are passed to Convert.
         """
+        checkpoint = Checkpoint(output_dir / self.checkpoint_filename, self.log)
+        windows = self._checkpoint_windows(checkpoint, request_id)
+        self._delete_orphan_chunks(checkpoint, output_dir)
+
+        # publish the chunks of a resumed run (streaming only)
+        for chunk in self._checkpoint_chunks(checkpoint):
+            self._stream_publish(output_dir / chunk['filename'])
+
+        with ThreadPoolExecutor(
+            self.settings.download_window_workers, thread_name_prefix='download-window'
+        ) as executor:
+            # windows are downloaded concurrently, each window writes its own chunks
+            futures = [
+                executor.submit(self._download_window, checkpoint, output_dir, index, window)
+                for index, window in enumerate(windows)
+            ]
+            for future in futures:
+                future.result()
+
+        # collect the counts of all the TI types to be written as count in job
+        # request table  and metrics for the dashboard in the metrics table
+        ti_type_counts = {}
+        for chunk in self._checkpoint_chunks(checkpoint):
+            for ti_type, count in chunk['counts'].items():
+                ti_type_counts[ti_type] = ti_type_counts.get(ti_type, 0) + count
+
+        # update job request counts and dashboard metrics
+        self._process_counts(request_id, ti_type_counts)
+
+        # a failed Convert or Upload must not resume from this checkpoint
+        checkpoint.set('complete', True)
+
+        if self.provider_sdk.http_pool is not None:
+            self.provider_sdk.http_pool.log_metrics('download-complete')
+
+    def _checkpoint_chunks(self, checkpoint: Checkpoint) -> List[dict]:
+        """Return the chunks written for all windows."""
+        return [
+            chunk
+            for index in range(len(checkpoint.get('windows', [])))
+            for chunk in checkpoint.get(f'window-{index}', {}).get('chunks', [])
+        ]
+
+    def _checkpoint_file(self, request_dir: 'Path') -> 'Path':
+        """Return the checkpoint file of the request dir."""
+        return request_dir / f'{self.task_settings.name_camel}_data' / self.checkpoint_filename
+
+    def _checkpoint_windows(self, checkpoint: Checkpoint, request_id: str) -> List['TimeWindow']:
+        """Return the windows of the job request, stored in the checkpoint on the first run."""
+        windows = checkpoint.get('windows')
+        if windows is not None:
+            windows = [TimeWindow(arrow.get(s), arrow.get(e), c) for s, e, c in windows]
+            self.log.info(
+                f'task-event=download-resume, request-id={request_id}, windows={len(windows)}, '
+                f'chunks={len(self._checkpoint_chunks(checkpoint))}'
+            )
+            return windows
+
         # looking up the record here in the forked process, to ensure
         # no conflicts with the orm model when we update the record later
         request = JobRequestModel.from_orm(self._db_get_request_by_id(request_id))
 
+        # split the job window into sub-windows small enough to be downloaded concurrently
+        windows = self._split_window(
+            any_to_datetime(request.last_modified_filter_start),
+            any_to_datetime(request.last_modified_filter_end),
+        )
+        checkpoint.set(
+            'windows', [[w.start.isoformat(), w.end.isoformat(), w.count] for w in windows]
+        )
+        self.log.info(
+            f'task-event=download-windows, request-id={request_id}, windows={len(windows)}, '
+            f'count={sum(w.count or 0 for w in windows)}'
+        )
+        return windows
+
+    def _create_request_dir(self, request_id: str, priority: str) -> 'Path':
+        """Return the request dir, reusing the dir of an incomplete previous run."""
+        request_dir = self._resumable_request_dir(request_id)
+
+        # a failed dir that is not resumed (e.g., the checkpoint is complete) is not retried
+        failed_dir = self.failed_request_dir(request_id)
+        if failed_dir is not None and failed_dir != request_dir:
+            self.log.info(
+                f'task-event=download-delete-failed-dir, request-id={request_id}, '
+                f'failed-dir={failed_dir}'
+            )
+            shutil.rmtree(failed_dir, ignore_errors=True)
+
+        if request_dir is None:
+            return super()._create_request_dir(request_id, priority)
+
+        # cleanup other task directories of the request
+        for directory in self.task_settings.working_dir_in.glob(f'*{request_id}*'):
+            if directory.is_dir() and directory != request_dir:
+                shutil.rmtree(directory)
+
+        # the dir of a failed run was moved to the failed dir
+        if request_dir.parent != self.task_settings.working_dir_in:
+            request_dir = self.requeue_failed_request_dir(request_dir)
+
+        self.log.info(
+            f'task-event=download-resume, request-id={request_id}, request-dir={request_dir}'
+        )
+        return request_dir
+
+    def _delete_orphan_chunks(self, checkpoint: Checkpoint, output_dir: 'Path'):
+        """Delete chunks written by a previous run after its last checkpoint update."""
+        filenames = {chunk['filename'] for chunk in self._checkpoint_chunks(checkpoint)}
+        for chunk_file in output_dir.glob('*indicators*'):
+            if chunk_file.name not in filenames:
+                self.log.info(f'task-event=download-delete-orphan-chunk, filename={chunk_file}')
+                chunk_file.unlink()
+
+    def _download_window(
+        self, checkpoint: Checkpoint, output_dir: 'Path', index: int, window: 'TimeWindow'
+    ):
+        """Download the indicators of the time window, resuming from the checkpoint."""
+        key = f'window-{index}'
+        state = checkpoint.get(key) or {'chunks': [], 'complete': False, 'cursor': None}
+        if state['complete'] is True:
+            return
+
+        tql = self._tql(window.start, window.end)
+        if not self.settings.provider_keyset_paging:
+            # offset paging can only be resumed per window, the chunk files are added to the
+            # checkpoint once the window is complete (the files of an interrupted run are orphans)
+            chunks = []
+            indicators = []
+            for indicator in self.provider_sdk.get_all(tql, self.settings.external_owner):
+                indicators.append(indicator)
+                if len(indicators) >= self.chunk_size:
+                    chunks.append(self._write_chunk_file(output_dir, key, indicators))
+                    indicators = []
+            if indicators:
+                chunks.append(self._write_chunk_file(output_dir, key, indicators))
+            self._write_chunk(checkpoint, output_dir, key, state, chunks, None, True)
+            return
+
+        cursor = KeysetCursor(*state['cursor']) if state['cursor'] is not None else None
+        indicators = []
+        for data, cursor in self.provider_sdk.get_pages_keyset(
+            tql, self.settings.external_owner, cursor
+        ):
+            indicators.extend(data)
+            if len(indicators) >= self.chunk_size:
+                chunk = self._write_chunk_file(output_dir, key, indicators)
+                state = self._write_chunk(checkpoint, output_dir, key, state, [chunk], cursor)
+                indicators = []
+        chunks = [self._write_chunk_file(output_dir, key, indicators)] if indicators else []
+        self._write_chunk(checkpoint, output_dir, key, state, chunks, cursor, True)
+
+    def _resumable_request_dir(self, request_id: str) -> Optional['Path']:
+        """Return the request dir of an incomplete previous run, None if there is none."""
+        request_dirs = sorted(
+            self.task_settings.working_dir_in.glob(f'*{request_id}'), reverse=True
+        )
+        request_dirs.append(self.failed_request_dir(request_id))
+        for request_dir in filter(None, request_dirs):
+            checkpoint_file = self._checkpoint_file(request_dir)
+            if checkpoint_file.is_file() and not Checkpoint(checkpoint_file).get('complete'):
+                return request_dir
+        return None
+
+    def _split_window(self, start: 'arrow.Arrow', end: 'arrow.Arrow') -> List['TimeWindow']:
+        """Return the sub-windows of the job window, split by the number of indicators."""
+        splitter = TimeWindowSplitter(
+            lambda s, e: self.provider_sdk.count(self._tql(s, e), self.settings.external_owner),
+            self.settings.download_window_max_count,
+            self.settings.download_window_min_seconds,
+            self.log,
+        )
+        return splitter.split(start, end)
+
+    def _tql(self, start: 'arrow.Arrow', end: 'arrow.Arrow') -> str:
+        """Return the TQL for indicators last modified in the window [start, end)."""
         # Example Filter Definition:
         # for this example, we will assume that the remote API accepts start and end dates, as well
         # as a TQL query and owner
-        last_modified_filter_start = self.tcex.utils.any_to_datetime(
-            request.last_modified_filter_start
-        ).strftime('%Y-%m-%d %H:%M:%S')
-        last_modified_filter_end = self.tcex.utils.any_to_datetime(
-            request.last_modified_filter_end
-        ).strftime('%Y-%m-%d %H:%M:%S')
-
-        tql = (
+        last_modified_filter_start = start.strftime('%Y-%m-%d %H:%M:%S')
+        last_modified_filter_end = end.strftime('%Y-%m-%d %H:%M:%S')
+        return (
             f'{self.settings.tql} AND lastModified GEQ "{last_modified_filter_start}" '
             f'AND lastModified LT "{last_modified_filter_end}"'
         )
 
-        # collect the counts of all the TI types to be written as count in job
-        # request table  and metrics for the dashboard in the metrics table
-        ti_type_counts = {}
-        indicators = []
-        for indicator in self.provider_sdk.get_all(tql, self.settings.external_owner):
-            indicators.append(indicator)
+    def _task_setup(self, request_dir: 'Path'):
+        """Configure task setup, keeping the output of a resumed run."""
+        if self._checkpoint_file(request_dir).is_file():
+            output_dir = self._checkpoint_file(request_dir).parent
+            return output_dir, output_dir
+        return super()._task_setup(request_dir)
+
+    # pylint: disable=too-many-arguments
+    def _write_chunk(
+        self,
+        checkpoint: Checkpoint,
+        output_dir: 'Path',
+        key: str,
+        state: dict,
+        chunks: List[dict],
+        cursor: Optional[KeysetCursor],
+        complete: bool = False,
+    ) -> dict:
+        """Add the written chunks to the window state in the checkpoint and publish them.
+
+        The new window state is returned. The state in the checkpoint is replaced, not updated in
+        place, since the other download threads serialize the checkpoint (under its lock).
+        """
+        state = {
+            'chunks': state['chunks'] + chunks,
+            'complete': complete,
+            'cursor': list(cursor) if cursor is not None else None,
+        }
+        checkpoint.set(key, state)
+
+        # publish the chunks once they are in the checkpoint, so a resumed run never deletes them
+        for chunk in chunks:
+            self._stream_publish(output_dir / chunk['filename'])
+        return state
+
+    def _write_chunk_file(self, output_dir: 'Path', key: str, indicators: List[dict]) -> dict:
+        """Write a chunk of indicators (not published) and return the chunk of the window state."""
+        counts = {}
+        for indicator in indicators:
             ti_type = indicator.get('type')
-            if ti_type in ti_type_counts:
-                ti_type_counts[ti_type] += 1
-            else:
-                ti_type_counts[ti_type] = 1
+            counts[ti_type] = counts.get(ti_type, 0) + 1
 
         # use built-in method to write the data to disk, this method also updates heartbeat
-        self._write_results(indicators, output_dir, 'indicators')
+        chunk_file = self._write_results(indicators, output_dir, f'indicators-{key}', publish=False)
+        return {'counts': counts, 'filename': chunk_file.name}
 
-        # update job request counts and dashboard metrics
-        self._process_counts(request_id, ti_type_counts)
+    @cached_property
+    def backpressure(self) -> Optional[BackpressureController]:
+        """Return the controller of the throttle limit, None if the limit is fixed."""
+        if self.settings.throttle_adaptive is False:
+            return None
+
+        return BackpressureController(
+            self.settings.throttle_limit,
+            limit_min=self.settings.throttle_limit_min,
+            limit_max=self.settings.throttle_limit_max,
+            disk_max_bytes=self.settings.throttle_disk_max_mb * 1_024**2,
+            backlog_minutes_max=self.settings.throttle_backlog_minutes_max,
+            evaluate_seconds=self.settings.throttle_evaluate_seconds,
+            log=self.log,
+        )
+
+    @property
+    def controllers(self) -> dict:
+        """Return the state of the provider rate limiter and the throttle controller."""
+        controllers = {}
+        if self.backpressure is not None:
+            controllers['backpressure'] = self.backpressure.state
+        if self.provider_sdk.rate_limiter is not None:
+            controllers['rate_limiter'] = self.provider_sdk.rate_limiter.state
+        return controllers
+
+    @property
+    def throttle_limit(self) -> int:
+        """Return the limit of in-flight job requests."""
+        if self.backpressure is None:
+            return self.settings.throttle_limit
+
+        if self.backpressure.due:
+            self.backpressure.evaluate(self._stage_backlogs())
+        return self.backpressure.limit
 
     @cached_property
     def task_settings(self) -> 'TaskSettingPipeModel':
@@ -210,4 +502,5 @@ class DownloadPathPipe(TaskPathPipeABC):
             description='Downloads the threat intel data from provider API.',
             max_execution_minutes=20,
             name='Download',
+            stream_output=self.settings.pipe_streaming_enabled,
         )
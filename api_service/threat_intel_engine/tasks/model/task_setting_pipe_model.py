@@ -41,6 +41,11 @@ class TaskSettingPipeModel(TaskSettingModel):
     # used to create input directory
     previous_task_name: Optional[str] = Field(None, description='The name of the previous task.')
 
+    # publish output files to the next task while the task is running
+    stream_output: bool = Field(
+        False, description='Indicates if output files are streamed to the next task.'
+    )
+
     # the type of task (e.g., path_pipe, standalone)
     task_type: str = Field('path_pipe', description='The type of task (e.g., pipe, single).')
 
@@ -0,0 +1,131 @@
+"""Retry Failed"""
+# standard library
+import shutil
+from typing import TYPE_CHECKING, List
+
+# third-party
+import arrow
+from schema import JobRequestSchema
+from tasks.model import TaskSettingModel
+from tcex.backports import cached_property
+
+from .task_abc import TaskABC
+
+if TYPE_CHECKING:
+    # third-party
+    from pydantic import BaseModel
+    from tcex import TcEx
+
+    from .task_path_pipe_abc import TaskPathPipeABC
+    from .tasks import Tasks
+
+
+class RetryFailed(TaskABC):
+    """Task Module
+
+    Task Flow:
+
+    1. launch_preflight_checks - run pre-flight checks before launching task (run method)
+    2. launch - launch task, typically as multiprocessing.Process
+    3. run - task entry point
+
+    The retry failed task re-queues failed job requests once their retry date (set by the pipe
+    task that failed, see _task_schedule_retry) has passed. The request dir is moved from the
+    failed dir back to the working dir of the task that failed. When more than one task failed
+    (e.g., the producer and consumer of a stream) the earliest task of the pipe is retried.
+
+    Like the other tasks, the retries run in a forked process supervised by the heartbeat
+    watchdog, so a slow move of a large request dir does not block the scheduler.
+    """
+
+    def __init__(self, settings: 'BaseModel', tcex: 'TcEx', tasks: 'Tasks'):
+        """Initialize class properties."""
+        super().__init__(settings, tcex)
+        self.tasks = tasks
+
+    def _get_jobs(self) -> List[JobRequestSchema]:
+        """Return the failed job requests that are due for a retry."""
+        query = (
+            self.session.query(JobRequestSchema)
+            .filter(
+                JobRequestSchema.status == self.settings.status_failed,
+                JobRequestSchema.date_retry.isnot(None),
+                JobRequestSchema.date_retry <= arrow.utcnow(),
+                JobRequestSchema.count_retry < self.settings.retry_max_attempts,
+            )
+            .order_by(JobRequestSchema.date_retry.asc())
+        )
+        return self.db.get_record(query, 'all', 'Unexpected error getting failed job requests.')
+
+    @property
+    def _pipe_tasks(self) -> List['TaskPathPipeABC']:
+        """Return the pipe tasks in pipe order."""
+        return sorted(
+            [t for t in self.tasks.all() if t.task_settings.task_type == 'path_pipe'],
+            key=lambda t: t.task_settings.index,
+        )
+
+    def _retry(self, job: JobRequestSchema):
+        """Re-queue the job request in the earliest failed task of the pipe."""
+        pipe_tasks = self._pipe_tasks
+        retry_index = 0
+        failed_dirs = [task.failed_request_dir(job.request_id) for task in pipe_tasks]
+        for index, failed_dir in enumerate(failed_dirs):
+            if failed_dir is not None:
+                retry_index = index
+                break
+
+        # the output of the tasks after the retried task is incomplete
+        for failed_dir in failed_dirs[retry_index + 1 :]:  # noqa: E203
+            if failed_dir is not None:
+                shutil.rmtree(failed_dir, ignore_errors=True)
+
+        retry_task = pipe_tasks[retry_index]
+        if retry_task.task_settings.pipe_task_start is True:
+            # the first task picks up pending job requests and resumes a failed request dir
+            status = self.settings.status_pending
+        else:
+            retry_task.requeue_failed_request_dir(failed_dirs[retry_index])
+            status = pipe_tasks[retry_index - 1].task_settings.status_complete
+
+        job.count_retry = (job.count_retry or 0) + 1
+        job.date_failed = None
+        job.date_retry = None
+        job.status = status
+        self.db.patch_record(self.session, job, 'Unexpected error updating job request.')
+        self.log.info(
+            f'task-event=retry-failed, request-id={job.request_id}, '
+            f'task-name={retry_task.task_settings.name}, count-retry={job.count_retry}, '
+            f'status={status}'
+        )
+
+    def launch_preflight_checks(self):
+        """Run pre-flight check before launching task."""
+        self.launch()
+
+    def run(self):
+        """Retry the failed job requests that are due (forked, see TaskABC.launch)."""
+        for job in self._get_jobs():
+            # the watchdog kills the task when a retry takes more than max_execution_minutes
+            self.update_heartbeat()
+            try:
+                self._retry(job)
+            except Exception:
+                self.log.exception(f'task-event=retry-failed, request-id={job.request_id}')
+
+    @cached_property
+    def task_settings(self) -> 'TaskSettingModel':
+        """Return the task settings.
+
+        Tasks have standard model that is used to define the task settings. This method returns
+        the settings model for the retry failed task. Any additional settings can be defined in
+        this property.
+        """
+
+        return TaskSettingModel(
+            description='Retries failed job requests with exponential backoff.',
+            max_execution_minutes=10,
+            name='Retry Failed',
+            schedule_period=1,
+            schedule_unit='minutes',
+        )
@@ -165,6 +165,11 @@ class TaskABC(ABC):
     def cleaner(self):
         """Clean up the task."""
 
+    @property
+    def controllers(self) -> dict:
+        """Return the state of the adaptive controllers of the task (e.g., rate limiter)."""
+        return {}
+
     @property
     def data(self) -> BaseModel:
         """Return data for the task."""
@@ -176,6 +181,7 @@ class TaskABC(ABC):
         class _Data(BaseModel):
             """Data model for process."""
 
+            controllers: Optional[dict] = self.controllers or None
             name: Optional[str] = self.task_settings.name
             max_execution_minutes: Optional[int] = self.task_settings.max_execution_minutes
             process: Optional[Metadata]
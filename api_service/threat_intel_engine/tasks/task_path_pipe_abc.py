@@ -3,12 +3,13 @@
 import gzip
 import json
 import os
+import random
 import shutil
 import threading
 import time
 from abc import ABC, abstractmethod
 from functools import partial
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Iterator, List, Optional
 
 # third-party
 import arrow
@@ -48,11 +49,24 @@ class TaskPathPipeABC(TaskABC, ABC):
         b. runs task start logic
         c. calls task.run() method
         b. calls task.complete() method
+
+    Streaming (task_settings.stream_output):
+
+    The request dir is published to the next task when the task starts, and output files are
+    hard linked into it as they are written (sealed). The next task consumes the files while
+    they arrive (_input_files) until the end-of-stream marker is written on completion.
     """
 
     request_id_file = 'request_id.txt'
+    stream_eos_file = '.eos'
+    stream_failed_file = '.failed'
+    stream_file = '.stream'
+    stream_poll_seconds = 1
     task_settings: TaskSettingPipeModel
 
+    # the output dir published to the next task (streaming only)
+    _stream_data_dir: Optional['Path'] = None
+
     def _check_pause_file(self):
         """Return True if paused requested."""
         super()._check_pause_file()
@@ -118,6 +132,49 @@ class TaskPathPipeABC(TaskABC, ABC):
         fqfn.mkdir(parents=True, exist_ok=True)
         return fqfn
 
+    def _input_files(self, input_dir: 'Path', pattern: str = '*') -> Iterator['Path']:
+        """Yield the input files in order, waiting for the files of a streaming previous task."""
+        if not (input_dir / self.stream_file).is_file():
+            yield from sorted(f for f in input_dir.glob(pattern) if not f.name.startswith('.'))
+            return
+
+        processed = set()
+        while True:
+            # check the markers before listing, all files published before the marker are listed
+            eos = (input_dir / self.stream_eos_file).is_file()
+            if (input_dir / self.stream_failed_file).is_file():
+                raise RuntimeError('The previous task failed before completing the stream.')
+
+            input_files = sorted(
+                f
+                for f in input_dir.glob(pattern)
+                if not f.name.startswith('.') and f.name not in processed
+            )
+            for input_file in input_files:
+                processed.add(input_file.name)
+                yield input_file
+
+            if eos is True:
+                self.log.info(
+                    f'task-event-path-pipe=stream-complete, task-name={self.task_settings.name}, '
+                    f'file-count={len(processed)}'
+                )
+                return
+
+            if not input_files:
+                # the previous task touches the stream file every time a file is published
+                idle = time.time() - (input_dir / self.stream_file).stat().st_mtime
+                if idle > self.task_settings.max_execution_minutes * 60:
+                    raise RuntimeError(f'No files published by the previous task in {idle:.0f}s.')
+
+                self.update_heartbeat()
+                time.sleep(self.stream_poll_seconds)
+
+    @property
+    def _failed_suffix(self) -> str:
+        """Return the suffix of the request dirs moved to the failed dir by this task."""
+        return f'{self.settings.file_config_separator}{self.task_settings.slug}'
+
     @property
     def _next_request_dir(self) -> 'Path':
         """Return the next task directory ordered by filename (date)."""
@@ -131,6 +188,68 @@ class TaskPathPipeABC(TaskABC, ABC):
         else:  # pylint: disable=useless-else-on-loop
             return None
 
+    def _stream_close(self, request_id: str, request_dir: 'Path'):
+        """Hand off the rest of the request dir and write the end-of-stream marker."""
+        stream_dir = self._stream_data_dir.parent
+        if not stream_dir.is_dir():
+            raise RuntimeError(f'Stream dir {stream_dir} was removed by the next task.')
+
+        # move the remaining content (e.g., the output of previous tasks) to the stream dir
+        for path in request_dir.iterdir():
+            if not (stream_dir / path.name).exists():
+                shutil.move(str(path), str(stream_dir))
+
+        # set date fields, the complete status is only set if the next task has not started
+        now = arrow.utcnow()
+        query = self.session.query(JobRequestSchema).filter_by(request_id=request_id)
+        query.update(
+            {field: now for field in self._task_date_fields_complete}, synchronize_session=False
+        )
+        query.filter(JobRequestSchema.status == self.task_settings.status_active).update(
+            {'status': self.task_settings.status_complete}, synchronize_session=False
+        )
+        self.session.commit()
+
+        (self._stream_data_dir / self.stream_eos_file).touch()
+        shutil.rmtree(request_dir)
+        self.log.info(
+            f'task-event-path-pipe=stream-close, task-name={self.task_settings.name}, '
+            f'request_id={request_id}, stream-dir={stream_dir}'
+        )
+
+    def _stream_open(self, request_id: str, request_dir: 'Path', output_dir: 'Path'):
+        """Publish the request dir to the next task before any output is written."""
+        stream_dir = self.task_settings.working_dir_out / request_dir.name
+        if not stream_dir.is_dir():
+            # the next task picks up any dir in its working dir, so stage the dir first
+            staging_dir = self.task_settings.base_path / 'stream_staging' / request_dir.name
+            self._fresh_dir(staging_dir / output_dir.name)
+            self._write_request_id_file(request_id, staging_dir)
+            (staging_dir / output_dir.name / self.stream_file).touch()
+            os.replace(staging_dir, stream_dir)
+
+        self._stream_data_dir = stream_dir / output_dir.name
+
+        # a retry of a failed task publishes to the same dir if it was not yet consumed
+        (self._stream_data_dir / self.stream_failed_file).unlink(missing_ok=True)
+
+        self.log.info(
+            f'task-event-path-pipe=stream-open, task-name={self.task_settings.name}, '
+            f'request_id={request_id}, stream-dir={stream_dir}'
+        )
+
+    def _stream_publish(self, path: 'Path'):
+        """Publish a sealed output file to the next task (streaming only)."""
+        if self._stream_data_dir is None:
+            return
+
+        target = self._stream_data_dir / path.name
+        if not target.exists():
+            os.link(path, target)
+
+        # the next task detects a stalled stream by the modification time of the stream file
+        (self._stream_data_dir / self.stream_file).touch()
+
     @staticmethod
     def _fresh_dir(directory: 'Path'):
         """Remove directory if exist and then create new directory."""
@@ -221,6 +340,11 @@ class TaskPathPipeABC(TaskABC, ABC):
 
     def _task_complete(self, request_id: str, request_dir: 'Path'):
         """Run tasks startup logic."""
+        if self._stream_data_dir is not None:
+            # the request dir was published to the next task when the task started
+            self._stream_close(request_id, request_dir)
+            return
+
         # set db date fields to be updated
         self._task_set_status(
             request_id,
@@ -236,42 +360,96 @@ class TaskPathPipeABC(TaskABC, ABC):
         )
         shutil.move(str(request_dir), self.task_settings.working_dir_out)
 
-    def _task_complete_failed(self, request_id: str, request_dir: 'Path'):
+    def _task_complete_failed(self, request_id: str, request_dir: Optional['Path']):
         """Run tasks startup logic."""
         # set db date fields to be updated
         try:
             self._task_set_status(request_id, 'failed', ['date_failed'])
+            self._task_schedule_retry(request_id)
         except Exception:
             self.log.error(
                 'task-event-path-pipe=task-complete-failed, action=failed-to-update-status'
             )
 
+        # the next task stops consuming the stream
+        if self._stream_data_dir is not None and self._stream_data_dir.is_dir():
+            (self._stream_data_dir / self.stream_failed_file).touch()
+
+        # the first task of the pipe creates the request dir after the task started
+        if request_dir is None:
+            return
+
         # move to next task
         self.log.error(
             f'task-event-path-pipe=task-failed, action=move-to-failed-dir, '
             f'task-name={self.task_settings.name}, request_id={request_id}, '
             f'request-dir={request_dir}, working-dir-out={self.task_settings.failed_working_dir}'
         )
-        shutil.move(str(request_dir), self.task_settings.failed_working_dir)
+        # the task slug is appended, the producer and consumer of a stream use the same name
+        failed_dir = (
+            self.task_settings.failed_working_dir / f'{request_dir.name}{self._failed_suffix}'
+        )
+        if failed_dir.exists():
+            # left over from a previous attempt of the job request
+            shutil.rmtree(failed_dir)
+        shutil.move(str(request_dir), str(failed_dir))
+
+    def _task_schedule_retry(self, request_id: str):
+        """Set the date of the automatic retry of the failed job request.
+
+        The delay is doubled for every retry, capped at retry_backoff_max_minutes and randomized
+        between 50% and 100%, so job requests that failed in the same outage are spread out.
+        """
+        job_request = self._db_get_request_by_id(request_id)
+        count_retry = job_request.count_retry or 0
+        if count_retry >= self.settings.retry_max_attempts:
+            job_request.date_retry = None
+            self.log.warning(
+                f'task-event-path-pipe=retry-exhausted, request_id={request_id}, '
+                f'count-retry={count_retry}'
+            )
+        else:
+            delay = min(
+                self.settings.retry_backoff_max_minutes,
+                self.settings.retry_backoff_minutes * 2**count_retry,
+            )
+            job_request.date_retry = arrow.utcnow().shift(
+                minutes=random.uniform(delay / 2, delay)  # nosec
+            )
+            self.log.info(
+                f'task-event-path-pipe=retry-scheduled, request_id={request_id}, '
+                f'count-retry={count_retry}, date-retry={job_request.date_retry}'
+            )
+        self.db.patch_record(self.session, job_request, 'Failed to schedule job request retry.')
 
     def _write_request_id_file(self, request_id: str, fqfn: 'Path'):
         """Write request id to file."""
         (fqfn / self.request_id_file).open('w').write(request_id)
 
-    def _write_results(self, data: List[dict], output_dir: 'Path', type_: str):
-        """Write results to a compressed file."""
+    def _write_results(
+        self, data: List[dict], output_dir: 'Path', type_: str, publish: bool = True
+    ) -> 'Path':
+        """Write results to a compressed file and return the file path.
+
+        When streaming, the file is published to the next task unless publish is False.
+        """
         # update the task heartbeat
         self.update_heartbeat()
 
         # write data to file in output directory (next task input directory)
+        results_file = output_dir / self._write_results_filename(type_)
         with gzip.open(
-            output_dir / self._write_results_filename(type_),
+            results_file,
             'wt',
             encoding='utf-8',
             compresslevel=9,
         ) as f:
             json.dump(data, f)
 
+        if publish is True:
+            self._stream_publish(results_file)
+        return results_file
+
     def _write_results_filename(self, file_type) -> str:
         """Return new filename for the given type."""
         name = f'{self.settings.file_config_separator}'.join(
@@ -279,6 +457,15 @@ class TaskPathPipeABC(TaskABC, ABC):
         )
         return f'{name}{self.settings.extension_json}{self.settings.extension_gzip}'
 
+    def failed_request_dir(self, request_id: str) -> Optional['Path']:
+        """Return the request dir moved to the failed dir by this task, None if there is none."""
+        for failed_dir in self.task_settings.failed_working_dir.glob(
+            f'*{request_id}{self._failed_suffix}'
+        ):
+            if failed_dir.is_dir():
+                return failed_dir
+        return None
+
     # pylint: disable=arguments-differ
     def launch(self, request_id: str, request_dir: Optional['Path'] = None, **kwargs):
         """Launch the task."""
@@ -335,6 +522,19 @@ class TaskPathPipeABC(TaskABC, ABC):
             target=self.run_pipe_task,
         )
 
+    def requeue_failed_request_dir(self, failed_dir: 'Path') -> 'Path':
+        """Move a request dir from the failed dir back to the working dir of this task."""
+        end = len(failed_dir.name) - len(self._failed_suffix)
+        request_dir = self.task_settings.working_dir_in / failed_dir.name[:end]
+        if request_dir.exists():
+            shutil.rmtree(request_dir)
+        shutil.move(str(failed_dir), str(request_dir))
+        self.log.info(
+            f'task-event-path-pipe=requeue-failed-request-dir, '
+            f'task-name={self.task_settings.name}, request-dir={request_dir}'
+        )
+        return request_dir
+
     @abstractmethod
     def run(self, request_id: str, input_dir: 'Path', output_dir: 'Path'):
         """Run the task."""
@@ -367,6 +567,10 @@ class TaskPathPipeABC(TaskABC, ABC):
         input_dir, output_dir = self._task_setup(request_dir)
 
         try:
+            # publish the request dir to the next task, which consumes the output as it is written
+            if self.task_settings.stream_output and not self.task_settings.pipe_task_complete:
+                self._stream_open(request_id, request_dir, output_dir)
+
             # run the task core logic
             self.run(request_id, input_dir, output_dir)
 
@@ -3,12 +3,19 @@
 import gzip
 import json
 import re
-from typing import TYPE_CHECKING, Dict
+import time
+from typing import TYPE_CHECKING, Dict, List, Tuple
 
 # third-party
-from schema import BatchErrorSchema, JobRequestSchema
+import arrow
+from model import BatchErrorStorage
+from more import IndicatorHashIndex
+from more.batch_size_controller import BatchSizeController
+from schema import BatchErrorSchema, BatchErrorSummarySchema, JobRequestSchema
+from sqlalchemy.dialects.sqlite import insert
 from tasks.model import TaskSettingPipeModel
 from tasks.task_path_pipe_abc import TaskPathPipeABC
+from tcex.api.tc.v2.batch import BatchSubmit
 from tcex.backports import cached_property
 
 if TYPE_CHECKING:
@@ -16,33 +23,93 @@ if TYPE_CHECKING:
     from pathlib import Path
 
     # third-party
-    from tcex.api.tc.v2.batch import BatchSubmit
+    from more import HttpPool
+    from pydantic import BaseModel
+    from tcex import TcEx
+    from tcex.sessions.tc_session import TcSession
+
+# parse the code and reason from the errorReason (e.g., "Error (0x1001): <reason>")
+BATCH_ERROR_REASON_PATTERN = re.compile(r'\w\s\((?P<code>0x[0-9A-F]{4})\):\s(?P<reason>.*)')
+
+# mask the variable values (e.g., the indicator) of a reason to build the reason template
+BATCH_ERROR_TEMPLATE_PATTERNS = [
+    (re.compile(r'"[^"]*"'), '"<value>"'),
+    (re.compile(r"'[^']*'"), "'<value>'"),
+    (re.compile(r'\b\S*(?:\d|@|://)\S*\b'), '<value>'),
+]
+
+BATCH_ERROR_CODES = {
+    '0x1001': 'General Error',
+    '0x1002': 'Permission Error',
+    '0x1003': 'JsonSyntax Error',
+    '0x1004': 'Internal Error',
+    '0x1005': 'Invalid Indicator Error',
+    '0x1006': 'Invalid Group Error',
+    '0x1007': 'Item Not Found Error',
+    '0x1008': 'Indicator Limit Error',
+    '0x1009': 'Association Error',
+    '0x100A': 'Duplicate Item Error',
+    '0x100B': 'File IO Error',
+    '0x2001': 'Indicator Partial Loss Error',
+    '0x2002': 'Group Partial Loss Error',
+    '0x2003': 'File Hash Merge Error',
+    '0x3001': 'File Hash Merge Error',
+}
 
 
 class UploadPathPipe(TaskPathPipeABC):
     """Process to submit JSON files to TC batch API."""
 
+    def __init__(self, settings: 'BaseModel', tcex: 'TcEx', http_pool: 'HttpPool'):
+        """Initialize class properties."""
+        super().__init__(settings, tcex)
+
+        # properties
+        self.http_pool = http_pool
+
     @staticmethod
     def _batch_error_codes(code: str) -> Dict[str, str]:
         """Return static list of Batch error codes and short description"""
-        _error_codes = {
-            '0x1001': 'General Error',
-            '0x1002': 'Permission Error',
-            '0x1003': 'JsonSyntax Error',
-            '0x1004': 'Internal Error',
-            '0x1005': 'Invalid Indicator Error',
-            '0x1006': 'Invalid Group Error',
-            '0x1007': 'Item Not Found Error',
-            '0x1008': 'Indicator Limit Error',
-            '0x1009': 'Association Error',
-            '0x100A': 'Duplicate Item Error',
-            '0x100B': 'File IO Error',
-            '0x2001': 'Indicator Partial Loss Error',
-            '0x2002': 'Group Partial Loss Error',
-            '0x2003': 'File Hash Merge Error',
-            '0x3001': 'File Hash Merge Error',
+        return BATCH_ERROR_CODES.get(code, 'Unknown')
+
+    @staticmethod
+    def _batch_error_reason_template(reason: str) -> str:
+        """Return the reason with the variable values masked."""
+        for pattern, replacement in BATCH_ERROR_TEMPLATE_PATTERNS:
+            reason = pattern.sub(replacement, reason)
+        return reason
+
+    def _batch_error_row(self, error: dict, request_id: str) -> dict:
+        """Return the DB row of a batch error."""
+        error_reason = error.get('errorReason') or ''
+        parsed_error = BATCH_ERROR_REASON_PATTERN.search(error_reason)
+        code = parsed_error.group('code') if parsed_error else 'Unknown'
+        return {
+            'code': code,
+            'message': self._batch_error_codes(code),
+            'reason': parsed_error.group('reason') if parsed_error else error_reason,
+            'request_id': request_id,
         }
-        return _error_codes.get(code, 'Unknown')
+
+    def _batch_error_summaries(self, rows: List[dict], request_id: str) -> List[dict]:
+        """Return the occurrences of the batch error rows counted by (code, reason template)."""
+        summaries: Dict[Tuple[str, str], dict] = {}
+        for row in rows:
+            reason_template = self._batch_error_reason_template(row['reason'])
+            summary = summaries.get((row['code'], reason_template))
+            if summary is None:
+                summary = summaries[(row['code'], reason_template)] = {
+                    'code': row['code'],
+                    'count': 0,
+                    'message': row['message'],
+                    'reason_template': reason_template,
+                    'request_id': request_id,
+                    'samples': [],
+                }
+            summary['count'] += 1
+            if len(summary['samples']) < self.settings.batch_error_samples:
+                summary['samples'].append(row['reason'])
+        return list(summaries.values())
 
     def _batch_errors(
         self, batch_submit: 'BatchSubmit', batch_id: int, request_id: str, output_dir: 'Path'
@@ -51,30 +118,8 @@ class UploadPathPipe(TaskPathPipeABC):
         batch_errors = []
         try:
             batch_errors = batch_submit.errors(batch_id)
-            for error in batch_errors:
-                error_reason = error.get('errorReason')
-                parsed_error = re.search(
-                    r'\w\s\((?P<code>0x[0-9]{4})\):\s(?P<reason>.*)', error_reason
-                )
-                code = parsed_error.group('code') if parsed_error else 'Unknown'
-                record = self.db.create_record(
-                    BatchErrorSchema,
-                    {
-                        'code': code,
-                        'message': self._batch_error_codes(code),
-                        'reason': parsed_error.group('reason') if parsed_error else error_reason,
-                        'request_id': request_id,
-                    },
-                    'Unexpected error creating batch error record.',
-                )
-                self.db.add_record(
-                    self.session, record, 'Unexpected error adding batch error record.'
-                )
-
             if batch_errors:
-                self._db_increment_counts(request_id, {'count_batch_error': len(batch_errors)})
-
-                # write errors to disk
+                # write errors to disk, the file does not depend on the DB inserts
                 filename = f'{self.settings.file_config_separator}'.join(
                     [request_id, 'batch-errors.csv.gz']
                 )
@@ -83,6 +128,21 @@ class UploadPathPipe(TaskPathPipeABC):
                     for error in batch_errors:
                         fh.write(f'''{error.get('errorReason')}\n''')
 
+                rows = [self._batch_error_row(error, request_id) for error in batch_errors]
+                if self.settings.batch_error_storage != BatchErrorStorage.full:
+                    self._db_upsert_batch_error_summaries(
+                        request_id, self._batch_error_summaries(rows, request_id)
+                    )
+                if self.settings.batch_error_storage != BatchErrorStorage.summary:
+                    self.db.bulk_insert(
+                        self.session,
+                        BatchErrorSchema,
+                        rows,
+                        'Unexpected error adding batch error records.',
+                    )
+
+                self._db_increment_counts(request_id, {'count_batch_error': len(batch_errors)})
+
         except RuntimeError:
             raise
         except Exception:
@@ -103,8 +163,57 @@ class UploadPathPipe(TaskPathPipeABC):
 
         return poll_status
 
+    def _db_upsert_batch_error_summaries(self, request_id: str, summaries: List[dict]):
+        """Insert the batch error summaries, adding the counts to any existing summary.
+
+        The samples of an existing summary are merged with the new samples, up to
+        batch_error_samples distinct reasons.
+        """
+        query = self.session.query(
+            BatchErrorSummarySchema.code,
+            BatchErrorSummarySchema.reason_template,
+            BatchErrorSummarySchema.samples,
+        ).filter_by(request_id=request_id)
+        existing = {
+            (r.code, r.reason_template): r.samples
+            for r in self.db.get_record(
+                query, 'all', 'Unexpected error getting batch error summaries.'
+            )
+            or []
+        }
+        for summary in summaries:
+            samples = list(existing.get((summary['code'], summary['reason_template'])) or [])
+            for sample in summary['samples']:
+                if len(samples) >= self.settings.batch_error_samples:
+                    break
+                if sample not in samples:
+                    samples.append(sample)
+            summary['samples'] = samples
+
+        table = BatchErrorSummarySchema.__table__
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.request_id, table.c.code, table.c.reason_template],
+            set_={
+                'count': table.c.count + statement.excluded.count,
+                'date_last_updated': arrow.utcnow(),
+                'samples': statement.excluded.samples,
+            },
+        )
+        try:
+            self.session.execute(statement, summaries)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            self.log.exception('failure=failed-adding-batch-error-summaries')
+
     def _reset_counts(self, request_id: str):
         """Reset counts for request_id."""
+        # summaries are counts too, remove any added by a previous attempt
+        self.db.delete_all(
+            self.session.query(BatchErrorSummarySchema).filter_by(request_id=request_id),
+            'Unexpected error deleting batch error summaries.',
+        )
         self._db_reset_counts(
             request_id,
             ['count_batch_error', 'count_batch_group_success', 'count_batch_indicator_success'],
@@ -114,8 +223,12 @@ class UploadPathPipe(TaskPathPipeABC):
         """Submit the batch file."""
         action = 'Create'
         batch_id = None
-        batch_submit = self.tcex.v2.batch_submit(
+        start = time.perf_counter()
+        batch_submit = BatchSubmit(
+            self.tcex.inputs,
+            self.session_tc,
             action='Create',
+            halt_on_error=False,
             owner=self.settings.owner,
             tag_write_type='Append',
             security_label_write_type='Append',
@@ -171,14 +284,31 @@ class UploadPathPipe(TaskPathPipeABC):
 
         try:
             # poll for batch status
+            submit_seconds = time.perf_counter() - start
             poll_status = self._batch_poll(batch_submit, batch_id)
-            if poll_status.get('status') != 'Success':
-                return
+            poll_seconds = time.perf_counter() - start - submit_seconds
 
             # get indicator counts from response instead of json
             # loading file data. this should keep memory usage lower.
             batch_status = poll_status.get('data', {}).get('batchStatus', {})
 
+            # adjust the size of the next batches written by convert
+            self.batch_size_controller.record(
+                request_id,
+                len(data.get('group', [])) + len(data.get('indicator', [])),
+                submit_seconds,
+                poll_seconds,
+                poll_status.get('status'),
+                count_success=(
+                    batch_status.get('successGroupCount', 0)
+                    + batch_status.get('successIndicatorCount', 0)
+                ),
+                count_error=batch_status.get('errorCount', 0),
+            )
+
+            if poll_status.get('status') != 'Success':
+                return
+
             success_group_count = batch_status.get('successGroupCount', 0)
             success_indicator_count = batch_status.get('successIndicatorCount', 0)
 
@@ -197,6 +327,11 @@ class UploadPathPipe(TaskPathPipeABC):
                         'count_batch_indicator_success': success_indicator_count,
                     },
                 )
+
+            # record the uploaded indicators, used by convert to drop unchanged indicators. when
+            # the batch had errors it is unknown which indicators failed, so nothing is recorded.
+            if self.settings.indicator_dedup_enabled and not batch_status.get('errorCount'):
+                self.indicator_hash_index.add(data.get('indicator', []))
         except Exception:
             self.log.exception('failure=failed-submitting-batch')
             raise
@@ -209,12 +344,44 @@ class UploadPathPipe(TaskPathPipeABC):
         # reset counts in case previous attempt failed
         self._reset_counts(request_id)
 
-        for batch_file in sorted(input_dir.iterdir()):
+        for batch_file in self._input_files(input_dir):
             # update the task heartbeat
             self.update_heartbeat()
 
             self._submit_batch(batch_file, request_id, output_dir)
 
+        self.http_pool.log_metrics('upload-complete')
+
+    @cached_property
+    def session_tc(self) -> 'TcSession':
+        """Return the TC session of the batch submits of this process.
+
+        The session is created in the task process (after fork) and reused for every batch file,
+        so the create, submit, and poll requests of all files share the pooled connections.
+        """
+        return self.http_pool.mount(self.tcex.get_session_tc(), 'tc-batch')
+
+    @cached_property
+    def batch_size_controller(self) -> BatchSizeController:
+        """Return the batch size controller."""
+        return BatchSizeController(
+            self.settings.batch_size,
+            self.settings.batch_size_min,
+            self.settings.batch_size_max,
+            self.settings.batch_latency_target_seconds,
+            enabled=self.settings.batch_size_adaptive,
+        )
+
+    @property
+    def controllers(self) -> dict:
+        """Return the state of the batch size controller."""
+        return {'batch_size': self.batch_size_controller.state}
+
+    @cached_property
+    def indicator_hash_index(self) -> IndicatorHashIndex:
+        """Return the indicator hash index."""
+        return IndicatorHashIndex(self.settings.base_path)
+
     @cached_property
     def task_settings(self) -> 'TaskSettingPipeModel':
         """Return the task settings."""
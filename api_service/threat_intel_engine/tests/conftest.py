@@ -0,0 +1,101 @@
+"""Pytest configuration"""
+# standard library
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# third-party
+import arrow
+import pytest
+from tcex.logger.trace_logger import TraceLogger  # pylint: disable=no-name-in-module
+
+# the app modules are imported as top-level modules (e.g., "from more import session")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# the app store DB is opened in TC_DB_PATH when the "more" package is imported
+os.environ.setdefault('TC_DB_PATH', tempfile.mkdtemp(prefix='threat-intel-engine-'))
+
+
+def _delete_rows(engine):
+    """Delete the rows of every table."""
+    # third-party
+    from more import Base
+
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture
+def db():
+    """Return the engine of an app store with empty tables."""
+    # third-party
+    from more import Base, engine, session
+
+    Base.metadata.create_all(engine)
+    _delete_rows(engine)
+    yield engine
+
+    session.remove()
+    _delete_rows(engine)
+
+
+@pytest.fixture
+def job_request(db):
+    """Return the request id of a pending job request."""
+    # third-party
+    from schema import JobRequestSchema
+
+    now = arrow.utcnow()
+    with db.begin() as conn:
+        conn.execute(
+            JobRequestSchema.__table__.insert(),
+            {
+                'job_type': 'scheduled',
+                'last_modified_filter_end': now,
+                'last_modified_filter_start': now.shift(hours=-1),
+                'request_id': 'request-1',
+                'status': 'pending',
+            },
+        )
+    return 'request-1'
+
+
+@pytest.fixture
+def settings(tmp_path):
+    """Return the app settings with the base path in a temporary directory."""
+    # third-party
+    from model import SettingsModel
+
+    return SettingsModel(
+        base_path=tmp_path,
+        date_started=arrow.utcnow(),
+        external_owner='External Owner',
+        owner='Owner',
+        tql='typeName in ("Address")',
+        working_dir_batch='batch_working_dir',
+        working_dir_convert='convert_working_dir',
+        working_dir_copy_group_files='copy_group_files_working_dir',
+        working_dir_download='download_working_dir',
+        working_dir_upload='upload_working_dir',
+    )
+
+
+@pytest.fixture
+def tcex():
+    """Return the tcex properties used by the tasks."""
+    return SimpleNamespace(log=TraceLogger('tcex.test'))
+
+
+@pytest.fixture
+def indicator_transform(settings, tcex):
+    """Return the indicator transform model of the app."""
+    # third-party
+    from more.transforms import IndicatorTransform
+    from tcex.api.tc.ti_transform.model import IndicatorTransformModel
+
+    tcex.api = SimpleNamespace(
+        tc=SimpleNamespace(indicator_transform=lambda t: IndicatorTransformModel(**t))
+    )
+    return IndicatorTransform(settings, tcex).transform
@@ -0,0 +1,152 @@
+"""Test the API service request handling."""
+# standard library
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# third-party
+import falcon
+import falcon.testing
+import pytest
+from api import AppPool, AppPoolTimeout, RequestLimiter, RequestLimitReached
+from api_service_falcon import ApiServiceFalcon
+
+
+class BlockingResource:
+    """Resource that blocks until it is released."""
+
+    def __init__(self):
+        """Initialize class properties."""
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def on_get(self, _req: falcon.Request, resp: falcon.Response):
+        """Handle GET requests."""
+        self.entered.set()
+        self.release.wait(10)
+        resp.media = {'status': 'ok'}
+
+
+class Response:
+    """WSGI start_response that records the status and headers."""
+
+    def __init__(self):
+        """Initialize class properties."""
+        self.headers: dict = {}
+        self.status = None
+
+    def __call__(self, status: str, headers: list, exc_info=None):
+        """Record the response status and headers."""
+        self.status = status
+        self.headers = dict(headers)
+
+
+@pytest.fixture
+def resource():
+    """Return the blocking resource (released on teardown)."""
+    resource_ = BlockingResource()
+    yield resource_
+    resource_.release.set()
+
+
+@pytest.fixture
+def service(resource):
+    """Return the API service with one app in the pool and a short pool timeout."""
+
+    def _build_falcon_app() -> falcon.App:
+        """Return an app routing to the blocking resource."""
+        app = falcon.App()
+        app.add_route('/block', resource)
+        return app
+
+    service_ = ApiServiceFalcon.__new__(ApiServiceFalcon)
+    service_.app_pool_size = 1
+    service_.app_pool_timeout = 0.1
+    service_.build_falcon_app = _build_falcon_app
+    service_.log = logging.getLogger('tcex')
+    service_.max_concurrent_requests = 1
+    return service_
+
+
+def test_app_pool_timeout():
+    """A checkout raises AppPoolTimeout when no app is returned before the timeout."""
+    pool = AppPool(object, 1, 0.05)
+    with pool.checkout():
+        with pytest.raises(AppPoolTimeout):
+            with pool.checkout():
+                pass
+
+    with pool.checkout():
+        assert pool.metrics['in_use'] == 1
+    assert pool.metrics['timeout_count'] == 1
+    assert pool.metrics['checkout_count'] == 2
+
+
+def test_handle_request_pool_timeout(resource, service):
+    """A request that can not check out an app before the timeout gets a 503."""
+    thread = threading.Thread(
+        target=service._handle_request,
+        args=(falcon.testing.create_environ(path='/block'), Response()),
+    )
+    thread.start()
+    assert resource.entered.wait(10)
+
+    response = Response()
+    body = service._handle_request(falcon.testing.create_environ(path='/block'), response)
+    resource.release.set()
+    thread.join(10)
+
+    assert response.status == falcon.HTTP_503
+    assert response.headers['Retry-After'] == '1'
+    assert 'No app available' in json.loads(b''.join(body))['description']
+    assert service.app_pool.metrics['timeout_count'] == 1
+
+
+def test_request_limiter():
+    """Requests beyond the limit are rejected at once, a slot is free again on exit."""
+    limiter = RequestLimiter(1)
+    with limiter.admit():
+        assert limiter.metrics['in_flight'] == 1
+        with pytest.raises(RequestLimitReached):
+            with limiter.admit():
+                pass
+
+    with limiter.admit():
+        pass
+
+    metrics = limiter.metrics
+    assert (metrics['admitted_count'], metrics['rejected_count']) == (2, 1)
+    assert (metrics['in_flight'], metrics['in_flight_max']) == (0, 1)
+    assert metrics['latency_ms']['count'] == 2
+
+
+def test_event_callback_limit_reached(resource, service):
+    """A request on a tcex request thread gets a 503 while the limit is in flight."""
+    # the tcex api service runs the event callback on its request thread pool
+    with ThreadPoolExecutor(max_workers=5) as request_thread_pool:
+        blocked_response = Response()
+        blocked = request_thread_pool.submit(
+            service.api_event_callback,
+            falcon.testing.create_environ(path='/block'),
+            blocked_response,
+        )
+        assert resource.entered.wait(10)
+
+        response = Response()
+        body = request_thread_pool.submit(
+            service.api_event_callback, falcon.testing.create_environ(path='/block'), response
+        ).result(10)
+
+        # the rejected request does not wait for an app or for the blocked request
+        assert response.status == falcon.HTTP_503
+        assert response.headers['Retry-After'] == '1'
+        assert 'busy' in json.loads(b''.join(body))['description']
+        assert service.app_pool.metrics['wait_count'] == 0
+
+        resource.release.set()
+        assert json.loads(b''.join(blocked.result(10))) == {'status': 'ok'}
+        assert blocked_response.status == falcon.HTTP_200
+
+    metrics = service.service_metrics()['request_limiter']
+    assert (metrics['admitted_count'], metrics['rejected_count']) == (1, 1)
@@ -0,0 +1,74 @@
+"""Test the adaptive throttle limit."""
+# third-party
+import pytest
+from more import BackpressureController, StageBacklog
+
+
+def _stage(name: str = 'convert', queue_depth: int = 0, size_bytes: int = 0, throughput=0.0):
+    """Return the backlog of a stage."""
+    return StageBacklog(name, queue_depth, size_bytes, throughput)
+
+
+@pytest.fixture
+def controller():
+    """Return a controller with a limit of 4 in [1, 8]."""
+    return BackpressureController(4, limit_min=1, limit_max=8, disk_max_bytes=1_000)
+
+
+@pytest.mark.parametrize(
+    'stages,limit,reasons',
+    [
+        # the disk usage of all stages is over the max
+        (
+            [_stage(size_bytes=600), _stage('upload', size_bytes=600)],
+            2,
+            ['disk-over-max:1200>1000'],
+        ),
+        # a queue without any completed request
+        ([_stage(queue_depth=2)], 3, ['convert-stalled:queue=2']),
+        # the request in progress alone is not a stall
+        ([_stage(queue_depth=1)], 4, ['steady']),
+        # 40 minutes to drain the queue
+        (
+            [_stage(queue_depth=20, throughput=0.5), _stage('upload', queue_depth=1)],
+            3,
+            ['convert-behind:backlog-minutes=40.0'],
+        ),
+        ([_stage(queue_depth=10, throughput=0.5)], 4, ['steady']),
+        ([_stage(throughput=0.5), _stage('upload')], 5, ['downstream-idle']),
+    ],
+)
+def test_decide(controller, stages, limit, reasons):
+    """The limit is halved, decreased, increased or kept based on the downstream backlog."""
+    assert controller.evaluate(stages) == limit
+    assert controller.reasons == reasons
+    assert controller.history[-1]['limit'] == limit
+    assert controller.history[-1]['stages'][0] == stages[0]._asdict()
+
+
+def test_decide_bounds():
+    """The limit stays within [limit_min, limit_max], including the initial limit."""
+    controller = BackpressureController(20, limit_min=2, limit_max=5, disk_max_bytes=1_000)
+    assert controller.limit == 5
+    assert controller.evaluate([_stage()]) == 5
+
+    for _ in range(3):
+        controller.evaluate([_stage(queue_depth=5)])
+    assert controller.limit == 2
+    assert controller.evaluate([_stage(size_bytes=2_000)]) == 2
+    assert controller.reasons == ['disk-over-max:2000>1000']
+
+    assert BackpressureController(0, limit_min=0).limit == 1
+
+
+def test_due(controller, monkeypatch):
+    """An evaluation is due once evaluate_seconds passed since the last evaluation."""
+    now = [100.0]
+    monkeypatch.setattr('more.backpressure_controller.time.monotonic', lambda: now[0])
+    assert controller.due is True
+
+    controller.evaluate([_stage()])
+    now[0] += controller.evaluate_seconds - 1
+    assert controller.due is False
+    now[0] += 1
+    assert controller.due is True
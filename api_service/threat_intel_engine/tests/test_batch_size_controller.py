@@ -0,0 +1,75 @@
+"""Test the adaptive batch size."""
+# third-party
+import pytest
+from more import session
+from more.batch_size_controller import BatchSizeController
+from schema import BatchSampleSchema
+
+
+@pytest.fixture
+def controller(db):
+    """Return a controller with a size in [100, 10000] and a latency target of 100 seconds."""
+    return BatchSizeController(1_000, 100, 10_000, 100)
+
+
+@pytest.mark.parametrize(
+    'size,batch_size,latency_seconds,status,expected',
+    [
+        # a failed batch halves the smaller of the size and the batch
+        (1_000, 1_000, 50, 'Failed', (500, 'failed')),
+        (1_000, 600, 50, None, (300, 'failed')),
+        (150, 150, 50, 'Failed', (100, 'failed')),
+        # a batch below half of the size is partial
+        (1_000, 400, 500, 'Success', (1_000, 'partial')),
+        # within 10% of the latency target
+        (1_000, 1_000, 105, 'Success', (1_000, 'steady')),
+        # the ratio of 10 and 0.1 is clamped to 1.25 and 0.5
+        (1_200, 1_200, 10, 'Success', (1_500, 'increase')),
+        (1_000, 1_000, 1_000, 'Success', (500, 'decrease')),
+        # 833.3 is rounded to the step
+        (1_000, 1_000, 120, 'Success', (800, 'decrease')),
+        # bounded to the max size
+        (9_600, 9_600, 10, 'Success', (10_000, 'increase')),
+        (10_000, 10_000, 10, 'Success', (10_000, 'steady')),
+    ],
+)
+def test_next(controller, size, batch_size, latency_seconds, status, expected):
+    """The next size follows the latency of the batch and its status."""
+    assert controller._next(size, batch_size, latency_seconds, status) == expected
+
+
+def test_record(controller, job_request):
+    """Every sample is recorded and the next size is read from the latest sample."""
+    assert controller.batch_size == 1_000
+
+    assert controller.record(job_request, 1_000, 5, 5, 'Success', count_success=1_000) == 1_200
+    assert controller.batch_size == 1_200
+    assert controller.record(job_request, 1_200, 5, 5, 'Failed', count_error=1_200) == 600
+    assert controller.batch_size == 600
+
+    samples = controller.samples()
+    assert [(s['reason'], s['batch_size_next']) for s in samples] == [
+        ('failed', 600),
+        ('increase', 1_200),
+    ]
+    assert samples[1]['count_success'] == 1_000
+
+
+def test_record_disabled(db, job_request):
+    """A disabled controller records the samples and keeps the initial size."""
+    controller = BatchSizeController(1_000, 100, 10_000, 100, enabled=False)
+
+    assert controller.record(job_request, 1_000, 5, 5, 'Success') == 1_000
+    assert controller.batch_size == 1_000
+    assert controller.samples()[0]['reason'] == 'disabled'
+
+
+def test_record_prunes_history(controller, job_request, monkeypatch):
+    """Only the last history_size samples are kept."""
+    monkeypatch.setattr(controller, 'history_size', 3)
+    for _ in range(6):
+        controller.record(job_request, 1_000, 50, 50, 'Success')
+
+    ids = [s.id for s in session.query(BatchSampleSchema).order_by(BatchSampleSchema.id)]
+    assert len(ids) == 3
+    assert ids == list(range(ids[0], ids[0] + 3))
@@ -0,0 +1,44 @@
+"""Test the Bloom filter."""
+# third-party
+from more.bloom_filter import BloomFilter
+
+
+def test_add_and_lookup(tmp_path):
+    """Added keys are always found, other keys are found at about the target fp rate."""
+    keys = [f'added-{i}' for i in range(10_000)]
+    with BloomFilter.build(tmp_path / 'test.bloom', keys, 10_000, 0.01) as bloom:
+        assert all(key in bloom for key in keys)
+        assert bloom.count == 10_000
+
+        false_positives = sum(f'other-{i}' in bloom for i in range(20_000))
+        assert false_positives / 20_000 < 0.02
+        assert 0.005 < bloom.fp_rate_estimate < 0.015
+
+
+def test_add_writable_persisted(tmp_path):
+    """Keys added to a writable filter are visible to the readers after a flush."""
+    path = tmp_path / 'test.bloom'
+    reader = BloomFilter.build(path, [], 1_000, 0.01)
+
+    with BloomFilter(path, writable=True) as bloom:
+        bloom.add('key')
+        bloom.flush()
+
+    assert 'key' in reader
+    with BloomFilter(path) as bloom:
+        assert 'key' in bloom
+        assert (bloom.capacity, bloom.count, bloom.fp_rate) == (1_000, 1, 0.01)
+    reader.close()
+
+
+def test_build_replaces(tmp_path):
+    """A build replaces the file, a filter opened before keeps the previous keys."""
+    path = tmp_path / 'test.bloom'
+    previous = BloomFilter.build(path, ['previous'], 1_000, 0.01)
+
+    with BloomFilter.build(path, ['next'], 1_000, 0.01) as bloom:
+        assert 'next' in bloom
+        assert 'previous' not in bloom
+    assert 'previous' in previous
+    assert not path.with_suffix('.bloom.tmp').exists()
+    previous.close()
@@ -0,0 +1,77 @@
+"""Test the columnar fast path against the tcex TI transform."""
+# standard library
+import random
+
+# third-party
+import pytest
+import tcex
+from more.transforms import ColumnarTransform, CompiledTiTransforms
+from tcex.api.tc.ti_transform import TiTransforms
+
+DATETIMES = [
+    '2023-01-02T03:04:05Z',
+    '2023-01-02T03:04:05.678Z',
+    '2023-01-02T03:04:05.678901Z',
+    '2023-01-02T03:04:05+00:00',
+    '2023-01-02T03:04:05-05:00',
+    '2023-01-02 03:04:05',
+    '2023-01-02',
+    '1672628645',
+    1672628645,
+    None,
+]
+
+
+def _ti_dict(rng: random.Random, index: int) -> dict:
+    """Return a random TI dict, a few of which need the per-record engine."""
+    ti_dict = {
+        'confidence': rng.choice([None, 0, 25, 100, '50']),
+        'dateAdded': rng.choice(DATETIMES),
+        'id': index,
+        'lastModified': rng.choice(DATETIMES),
+        'rating': rng.choice([None, 0, 2.5, 5, '3']),
+        'summary': rng.choice([f'10.0.{index // 256}.{index % 256}', f'host-{index}.example.com']),
+        'type': rng.choice(['Address', 'Host', 'URL', 'File']),
+    }
+    for key in rng.sample(sorted(ti_dict), rng.choice([0, 0, 0, 1])):
+        # missing fields (a missing summary or type is an error)
+        del ti_dict[key]
+    if rng.random() < 0.05:
+        ti_dict['tags'] = rng.choice([[], [{'name': 'tag'}]])
+    return ti_dict
+
+
+def test_tcex_version():
+    """The columnar output was verified against the TiTransform of this tcex version."""
+    assert tcex.__version__ == '3.0.11'
+
+
+def test_columnar_equivalent_randomized(indicator_transform, monkeypatch):
+    """3,000 random TI dicts have the same batch with the columnar path as with TiTransforms."""
+    monkeypatch.setattr(ColumnarTransform, 'chunk_size', 1_000)
+    rng = random.Random(38)
+    ti_dicts = [_ti_dict(rng, index) for index in range(3_000)]
+
+    columnar = ColumnarTransform.get([indicator_transform])
+    assert columnar is not None
+    # most records take the columnar path, the others are processed by the per-record engine
+    columnar_count = sum(item is not None for item in columnar.transform_chunk(ti_dicts))
+    assert 2_500 < columnar_count < 3_000
+
+    expected = TiTransforms(ti_dicts, [indicator_transform]).batch
+    assert CompiledTiTransforms(ti_dicts, [indicator_transform]).batch == expected
+    assert len(expected['indicator']) > 2_500
+
+
+@pytest.mark.parametrize(
+    'ti_dict',
+    [
+        {'id': 1, 'summary': '1.1.1.1', 'type': 'Address', 'tags': [{'name': 'tag'}]},
+        {'id': 2, 'summary': '1.1.1.1'},
+        {'id': 3, 'summary': '1.1.1.1', 'type': 'Address', 'rating': 'high'},
+        {'id': 4, 'summary': '1.1.1.1', 'type': 'Address', 'lastModified': ['2023-01-02']},
+    ],
+)
+def test_columnar_fallback(indicator_transform, ti_dict):
+    """Records the columnar path does not support are left to the per-record engine."""
+    assert ColumnarTransform.get([indicator_transform]).transform_chunk([ti_dict]) == [None]
@@ -0,0 +1,63 @@
+"""Test the compiled TI transform against the tcex TI transform."""
+# third-party
+import tcex
+from more.transforms import CompiledTiTransform
+from tcex.api.tc.ti_transform import TiTransform
+
+TI_DICTS = [
+    {
+        'confidence': 50,
+        'dateAdded': '2023-01-02T03:04:05Z',
+        'id': 1,
+        'lastModified': '2023-01-02T03:04:05.678Z',
+        'rating': 3,
+        'summary': '1.1.1.1',
+        'type': 'Address',
+    },
+    {
+        'dateAdded': '2023-01-02T03:04:05+02:00',
+        'id': 2,
+        'lastModified': '1672628645',
+        'summary': 'example.com',
+        'type': 'Host',
+    },
+    {'id': 3, 'lastModified': '2023-01-02', 'summary': 'https://example.com', 'type': 'URL'},
+    {'id': 4, 'summary': '2.2.2.2', 'tags': [{'name': 'tag'}], 'type': 'Address'},
+    {'id': 5, 'summary': '3.3.3.3'},
+    {'id': 6, 'confidence': None, 'rating': None, 'summary': '4.4.4.4', 'type': 'Address'},
+]
+
+
+def _batch(cls: type, ti_dict: dict, transform) -> object:
+    """Return the batch item of the TI dict or the type of the exception raised."""
+    try:
+        return cls(ti_dict, [transform]).batch
+    except Exception as ex:
+        return type(ex)
+
+
+def test_tcex_version():
+    """The overridden TiTransform methods were verified against this tcex version."""
+    assert tcex.__version__ == '3.0.11'
+
+
+def test_compiled_ti_transform_equivalent(indicator_transform):
+    """The compiled transform returns the same batch items (and errors) as TiTransform."""
+    CompiledTiTransform.compile(indicator_transform)
+
+    for ti_dict in TI_DICTS:
+        assert _batch(CompiledTiTransform, ti_dict, indicator_transform) == _batch(
+            TiTransform, ti_dict, indicator_transform
+        ), ti_dict
+
+
+def test_compiled_ti_transform_shares_compiled_state(indicator_transform):
+    """The paths and callables are compiled once, the tcex initialization is kept."""
+    CompiledTiTransform.compile(indicator_transform)
+    assert {'summary', 'type', 'lastModified', 'tags[].name'} <= set(
+        CompiledTiTransform.expressions
+    )
+
+    transform = CompiledTiTransform(TI_DICTS[0], indicator_transform)
+    assert transform.transforms == [indicator_transform]
+    assert transform.utils is not None
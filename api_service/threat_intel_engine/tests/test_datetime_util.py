@@ -0,0 +1,63 @@
+"""Test the datetime util against the tcex datetime parser."""
+# third-party
+import pytest
+from more.datetime_util import TC_DATETIME_FORMAT, any_to_datetime, tc_datetime
+from tcex.utils import Utils
+
+DATETIME_EXPRESSIONS = [
+    '2023-01-02',
+    '2023-01-02T03:04',
+    '2023-01-02T03:04:05',
+    '2023-01-02 03:04:05',
+    '2023-01-02T03:04:05Z',
+    '2023-01-02T03:04:05.6Z',
+    '2023-01-02T03:04:05.678Z',
+    '2023-01-02T03:04:05.678901Z',
+    '2023-01-02T03:04:05+00:00',
+    '2023-01-02T03:04:05+05:30',
+    '2023-01-02T03:04:05-0800',
+    '2023-01-02T23:59:59-05',
+    '2024-02-29T12:00:00Z',
+    '0999-01-02T03:04:05Z',
+    '1672628645',
+    '1672628645.5',
+    '1672628645678',
+    '1672628645678901',
+    1672628645,
+    1672628645.25,
+    'Mon, 02 Jan 2023 03:04:05 +0000',
+    'January 2, 2023',
+]
+
+
+@pytest.mark.parametrize('value', DATETIME_EXPRESSIONS)
+def test_any_to_datetime(value):
+    """The parsed datetime and its offset are the same as the tcex any_to_datetime."""
+    expected = Utils.any_to_datetime(value)
+    parsed = any_to_datetime(value)
+    assert parsed == expected
+    assert parsed.utcoffset() == expected.utcoffset()
+
+
+@pytest.mark.parametrize('value', DATETIME_EXPRESSIONS)
+def test_tc_datetime(value):
+    """The TC datetime is the same as the tcex any_to_datetime formatted with strftime."""
+    assert tc_datetime(value) == Utils.any_to_datetime(value).strftime(TC_DATETIME_FORMAT)
+
+
+@pytest.mark.parametrize('tz', ['UTC', 'US/Pacific', '-07:00'])
+def test_any_to_datetime_tz(tz):
+    """The datetime is converted to the timezone the same way as the tcex any_to_datetime."""
+    value = '2023-01-02T03:04:05+05:30'
+    expected = Utils.any_to_datetime(value, tz)
+    parsed = any_to_datetime(value, tz)
+    assert parsed == expected
+    assert parsed.utcoffset() == expected.utcoffset()
+
+
+def test_invalid():
+    """Values that can not be parsed raise the same error as the tcex any_to_datetime."""
+    with pytest.raises(RuntimeError):
+        tc_datetime('not a date')
+    with pytest.raises(RuntimeError):
+        any_to_datetime('2023-01-02T03:04:05Z', 'Not/A_Timezone')
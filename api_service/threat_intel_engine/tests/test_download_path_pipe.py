@@ -0,0 +1,171 @@
+"""Test the window download of the download task."""
+# standard library
+import gzip
+import json
+from types import SimpleNamespace
+
+# third-party
+import arrow
+import pytest
+from more import Checkpoint, KeysetCursor, StageBacklog
+from schema import JobRequestSchema
+from tasks.download_path_pipe import DownloadPathPipe
+
+INDICATORS = [{'id': i, 'type': 'Address' if i % 2 else 'Host'} for i in range(12)]
+
+
+class FakeProviderSdk:
+    """Provider SDK returning the INDICATORS."""
+
+    http_pool = None
+
+    def get_all(self, tql: str, owner: str):
+        """Yield the indicators one by one."""
+        yield from INDICATORS
+
+    def get_pages_keyset(self, tql: str, owner: str, cursor: KeysetCursor = None):
+        """Yield pages of 2 indicators after the cursor."""
+        indicators = [i for i in INDICATORS if cursor is None or i['id'] > cursor.id]
+        for index in range(0, len(indicators), 2):
+            end = index + 2
+            data = indicators[index:end]
+            yield data, KeysetCursor(data[-1]['id'])
+
+
+@pytest.fixture
+def download(settings, tcex, monkeypatch):
+    """Return the download task writing chunks of 5 indicators."""
+    monkeypatch.setattr(DownloadPathPipe, 'chunk_size', 5)
+    return DownloadPathPipe(settings, tcex, FakeProviderSdk(), None)
+
+
+def _chunks(output_dir, state: dict) -> list:
+    """Return the indicators of the chunks of the window state."""
+    chunks = []
+    for chunk in state['chunks']:
+        with gzip.open(output_dir / chunk['filename'], 'rt') as fh:
+            chunks.append(json.load(fh))
+    return chunks
+
+
+@pytest.mark.parametrize('keyset', [False, True])
+def test_download_window_chunks(download, tmp_path, keyset):
+    """The indicators of a window are written in chunks of chunk_size."""
+    download.settings.provider_keyset_paging = keyset
+    checkpoint = Checkpoint(tmp_path / 'checkpoint.json')
+    window = SimpleNamespace(start=arrow.get('2023-01-01'), end=arrow.get('2023-01-02'))
+
+    download._download_window(checkpoint, tmp_path, 0, window)
+
+    state = checkpoint.get('window-0')
+    assert state['complete'] is True
+    assert state['cursor'] == ([11] if keyset else None)
+    assert [len(c) for c in _chunks(tmp_path, state)] == ([6, 6] if keyset else [5, 5, 2])
+    assert [i for c in _chunks(tmp_path, state) for i in c] == INDICATORS
+    assert [c['counts'] for c in state['chunks']][-1] == (
+        {'Address': 3, 'Host': 3} if keyset else {'Address': 1, 'Host': 1}
+    )
+
+
+def test_download_window_keyset_resume(download, tmp_path):
+    """A keyset window resumes after the cursor of the last chunk in the checkpoint."""
+    download.settings.provider_keyset_paging = True
+    checkpoint = Checkpoint(tmp_path / 'checkpoint.json')
+    checkpoint.set('window-0', {'chunks': [], 'complete': False, 'cursor': [5]})
+    window = SimpleNamespace(start=arrow.get('2023-01-01'), end=arrow.get('2023-01-02'))
+
+    download._download_window(checkpoint, tmp_path, 0, window)
+
+    assert [i for c in _chunks(tmp_path, checkpoint.get('window-0')) for i in c] == INDICATORS[6:]
+
+
+def test_write_chunk_replaces_state(download, tmp_path, monkeypatch):
+    """The window state in the checkpoint is replaced, the previous state is not mutated."""
+    monkeypatch.setattr(download, '_stream_publish', lambda path: None)
+    checkpoint = Checkpoint(tmp_path / 'checkpoint.json')
+    checkpoint.set('window-0', {'chunks': [], 'complete': False, 'cursor': None})
+    previous = checkpoint.get('window-0')
+
+    chunk = {'counts': {'Host': 1}, 'filename': 'indicators-window-0.json.gz'}
+    state = download._write_chunk(
+        checkpoint, tmp_path, 'window-0', previous, [chunk], KeysetCursor(1)
+    )
+
+    assert previous == {'chunks': [], 'complete': False, 'cursor': None}
+    assert checkpoint.get('window-0') is state
+    assert state == {'chunks': [chunk], 'complete': False, 'cursor': [1]}
+    assert Checkpoint(tmp_path / 'checkpoint.json').get('window-0') == state
+
+
+def _pipe_task(tmp_path, slug: str, index: int, task_type: str = 'path_pipe'):
+    """Return a task of the pipe with a request dir of 100 bytes in its working dir."""
+    working_dir_in = tmp_path / f'{slug}_working_dir'
+    (working_dir_in / f'0#1#request-{slug}').mkdir(parents=True)
+    (working_dir_in / f'0#1#request-{slug}' / 'indicators.json.gz').write_bytes(b'0' * 100)
+    # a file in the working dir (e.g., the PAUSE file) is not a request dir
+    (working_dir_in / 'PAUSE').touch()
+    return SimpleNamespace(
+        task_settings=SimpleNamespace(
+            date_field_complete=f'date_{slug}_complete',
+            index=index,
+            slug=slug,
+            task_type=task_type,
+            working_dir_in=working_dir_in,
+        )
+    )
+
+
+def test_stage_backlogs(settings, tcex, db, tmp_path):
+    """The backlog of each downstream pipe task is read from its working dir and the DB."""
+    tasks = [
+        _pipe_task(tmp_path, 'upload', 2),
+        _pipe_task(tmp_path, 'download', 0),
+        _pipe_task(tmp_path, 'convert', 1),
+        _pipe_task(tmp_path, 'cleaner', None, task_type='task'),
+    ]
+    download = DownloadPathPipe(
+        settings, tcex, FakeProviderSdk(), SimpleNamespace(all=lambda: tasks)
+    )
+    download.settings.throttle_throughput_window_minutes = 60
+
+    now = arrow.utcnow()
+    with db.begin() as conn:
+        conn.execute(
+            JobRequestSchema.__table__.insert(),
+            [
+                {
+                    'date_convert_complete': date_convert_complete,
+                    'job_type': 'scheduled',
+                    'last_modified_filter_end': now,
+                    'last_modified_filter_start': now.shift(hours=-1),
+                    'request_id': f'request-{i}',
+                    'status': 'convert complete',
+                }
+                # only the requests completed in the throughput window are counted
+                for i, date_convert_complete in enumerate(
+                    [now.shift(minutes=-5), now.shift(minutes=-50), now.shift(minutes=-90)]
+                )
+            ],
+        )
+
+    assert download._stage_backlogs() == [
+        StageBacklog('convert', queue_depth=1, size_bytes=100, throughput=round(2 / 60, 4)),
+        StageBacklog('upload', queue_depth=1, size_bytes=100, throughput=0.0),
+    ]
+
+
+def test_preflight_throttle_limit_evaluated_once(download, job_request, db, monkeypatch):
+    """A throttled launch reads (and evaluates) the throttle limit once."""
+    calls = []
+    monkeypatch.setattr(
+        DownloadPathPipe, 'throttle_limit', property(lambda self: calls.append(1) or 1)
+    )
+    with db.begin() as conn:
+        conn.execute(
+            JobRequestSchema.__table__.update().values(status=download.task_settings.status_active)
+        )
+
+    download.launch_preflight_checks()
+
+    assert calls == [1]
+    assert download.process is None
@@ -0,0 +1,130 @@
+"""Test the ETag and compression handling of the API responses."""
+# standard library
+import gzip
+import json
+from typing import Optional
+
+# third-party
+import falcon
+import falcon.testing
+import pytest
+from api import TaskResource
+from api.middleware import CompressionMiddleware, HttpCacheMiddleware, InjectablesMiddleware
+from pydantic import BaseModel
+
+
+class TaskSettings(BaseModel):
+    """Task settings used by the task resource."""
+
+    description: str = 'Test task.'
+    name: str = 'Download'
+    paused: bool = False
+    paused_file: bool = False
+    paused_file_global: bool = False
+    slug: str = 'download'
+    task_type: str = 'path_pipe'
+    index: int = 0
+
+
+class Task:
+    """Task with adaptive controllers and no running process."""
+
+    def __init__(self):
+        """Initialize class properties."""
+        self.controllers = {'backpressure': {'limit': 4, 'reasons': ['initial']}}
+        self.process = None
+        self.task_settings = TaskSettings()
+
+    @property
+    def data(self) -> BaseModel:
+        """Return data for the task."""
+
+        class _Data(BaseModel):
+            """Data model for the task."""
+
+            controllers: Optional[dict] = self.controllers
+            name: str = self.task_settings.name
+
+        return _Data()
+
+
+class Tasks:
+    """Task manager with a single task."""
+
+    def __init__(self):
+        """Initialize class properties."""
+        self.task = Task()
+
+    def all(self) -> list:
+        """Return all tasks."""
+        return [self.task]
+
+
+@pytest.fixture
+def tasks():
+    """Return the tasks."""
+    return Tasks()
+
+
+@pytest.fixture
+def client(tasks):
+    """Return a test client of an app with the middleware in the order of the service."""
+    app = falcon.App(
+        middleware=[
+            CompressionMiddleware(),
+            InjectablesMiddleware(tasks=tasks),
+            HttpCacheMiddleware(),
+        ]
+    )
+    app.add_route('/api/task', TaskResource())
+    return falcon.testing.TestClient(app)
+
+
+def test_etag_not_modified(client, tasks):
+    """A conditional request gets a 304 until the controller state of a task changes."""
+    result = client.simulate_get('/api/task')
+    etag = result.headers['etag']
+    assert result.json[0]['controllers']['backpressure']['limit'] == 4
+    assert not etag.startswith('W/')
+
+    result = client.simulate_get('/api/task', headers={'If-None-Match': etag})
+    assert result.status == falcon.HTTP_304
+    assert result.content == b''
+
+    # e.g., the throttle limit is evaluated in the service process while no task runs
+    tasks.task.controllers = {'backpressure': {'limit': 3, 'reasons': ['downstream-idle']}}
+    result = client.simulate_get('/api/task', headers={'If-None-Match': etag})
+    assert result.status == falcon.HTTP_200
+    assert result.headers['etag'] != etag
+    assert result.json[0]['controllers']['backpressure']['limit'] == 3
+
+
+def test_etag_weak_when_compressed(client, tasks):
+    """A compressed response has a weak ETag that still matches a conditional request."""
+    history = [{'limit': 4, 'reasons': [f'steady-{i}']} for i in range(100)]
+    tasks.task.controllers = {'backpressure': {'history': history, 'limit': 4}}
+
+    result = client.simulate_get('/api/task', headers={'Accept-Encoding': 'gzip'})
+    etag = result.headers['etag']
+    assert result.headers['content-encoding'] == 'gzip'
+    assert result.headers['vary'] == 'Accept-Encoding'
+    assert etag.startswith('W/')
+    body = json.loads(gzip.decompress(result.content))
+    assert body[0]['controllers']['backpressure']['history'] == history
+
+    result = client.simulate_get(
+        '/api/task', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}
+    )
+    assert result.status == falcon.HTTP_304
+    assert 'content-encoding' not in result.headers
+
+
+def test_below_minimum_size_not_compressed(client):
+    """A response below the minimum size is returned as is with its strong ETag."""
+    result = client.simulate_get('/api/task', headers={'Accept-Encoding': 'gzip'})
+
+    assert len(result.content) < CompressionMiddleware().minimum_size
+    assert 'content-encoding' not in result.headers
+    assert result.headers['vary'] == 'Accept-Encoding'
+    assert not result.headers['etag'].startswith('W/')
+    assert result.json[0]['name'] == 'Download'
@@ -0,0 +1,112 @@
+"""Test the HTTP connection pools of the requests sessions."""
+# standard library
+import multiprocessing
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# third-party
+import pytest
+import requests
+from more import HttpPool
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    """Handler returning an empty 200 response on a keep-alive connection."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Handle GET requests."""
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """Do not log the requests."""
+
+
+@pytest.fixture
+def server_url():
+    """Return the URL of a local HTTP server."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_address[1]}'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session():
+    """Return a session with a retry policy, like the TcSession of tcex."""
+    session_ = requests.Session()
+    session_.mount('https://', HTTPAdapter(max_retries=Retry(total=4, backoff_factor=0.3)))
+    yield session_
+    session_.close()
+
+
+def _child(http_pool: HttpPool, session: requests.Session, parent_adapter: int, queue):
+    """Report the pools of the session in a forked child process."""
+    queue.put(
+        {
+            'adapter_replaced': id(session.get_adapter('http://')) != parent_adapter,
+            'metrics': http_pool.metrics,
+            'pid': os.getpid(),
+        }
+    )
+
+
+def test_mount_keeps_max_retries(session):
+    """The mounted adapter keeps the retry policy of the session and enables keep-alive."""
+    max_retries = session.get_adapter('https://').max_retries
+    HttpPool(pool_maxsize=8).mount(session, 'test')
+
+    for prefix in ('https://', 'http://'):
+        adapter = session.get_adapter(prefix)
+        assert adapter.max_retries is max_retries
+        assert adapter.poolmanager.connection_pool_kw['maxsize'] == 8
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in adapter.socket_options
+
+
+def test_connection_reuse_counted(server_url, session):
+    """Requests on a kept-alive connection are counted as reused."""
+    http_pool = HttpPool()
+    http_pool.mount(session, 'test')
+    for _ in range(4):
+        session.get(server_url).raise_for_status()
+
+    assert http_pool.metrics['sessions']['test'] == {
+        'connections': 1,
+        'requests': 4,
+        'reuse_ratio': 0.75,
+    }
+
+
+def test_fork_child_gets_fresh_pools(server_url, session):
+    """A forked child gets new pools and counters, the parent keeps its own."""
+    http_pool = HttpPool()
+    http_pool.mount(session, 'test')
+    session.get(server_url).raise_for_status()
+    parent_adapter = session.get_adapter('http://')
+
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(http_pool, session, id(parent_adapter), queue))
+    process.start()
+    child = queue.get(timeout=30)
+    process.join(30)
+
+    assert process.exitcode == 0
+    assert child['adapter_replaced'] is True
+    assert child['pid'] == process.pid
+    assert child['metrics']['pid'] == process.pid
+    assert child['metrics']['sessions']['test']['requests'] == 0
+
+    # the parent still uses (and counts) its own pool
+    assert session.get_adapter('http://') is parent_adapter
+    assert http_pool.metrics['pid'] == os.getpid()
+    assert http_pool.metrics['sessions']['test']['requests'] == 1
@@ -0,0 +1,92 @@
+"""Test the indicator hash index."""
+# standard library
+import multiprocessing
+
+# third-party
+import pytest
+from more import IndicatorHashIndex, session
+from more.bloom_filter import BloomFilter
+from schema import IndicatorHashSchema
+
+
+def _indicators(prefix: str, count: int) -> list:
+    """Return batch indicators with a lastModified."""
+    return [{'lastModified': '2023-01-01T00:00:00Z', 'xid': f'{prefix}-{i}'} for i in range(count)]
+
+
+def _add(base_path, prefix: str, count: int):
+    """Add the indicators to the index in chunks (run in a forked process)."""
+    session.remove()
+    indicators = _indicators(prefix, count)
+    for index in range(0, count, 50):
+        end = index + 50
+        IndicatorHashIndex(base_path).add(indicators[index:end])
+
+
+@pytest.fixture
+def base_path(db, tmp_path):
+    """Return the base path with an empty Bloom filter."""
+    BloomFilter.build(tmp_path / IndicatorHashIndex.bloom_filename, [], 10_000, 0.01).close()
+    return tmp_path
+
+
+def test_filter_unchanged(base_path):
+    """Uploaded and unchanged indicators are dropped, changed and new indicators are kept."""
+    IndicatorHashIndex(base_path).add(_indicators('uploaded', 3))
+
+    indicator_hash_index = IndicatorHashIndex(base_path)
+    changed = {'lastModified': '2023-01-02T00:00:00Z', 'xid': 'uploaded-0'}
+    new = _indicators('new', 2)
+    kept, duplicates = indicator_hash_index.filter_unchanged(
+        _indicators('uploaded', 3)[1:] + [changed] + new + new
+    )
+    indicator_hash_index.close()
+
+    assert kept == [changed] + new
+    assert duplicates == 4
+
+
+def test_add_concurrent(base_path):
+    """Concurrent adds from several processes lose no key of the Bloom filter."""
+    session.remove()
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=_add, args=(base_path, f'process-{i}', 500)) for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    # a rebuild while the processes are adding keeps the keys added before and after it
+    IndicatorHashIndex(base_path).rebuild_bloom(10_000, 0.01)
+    for process in processes:
+        process.join(60)
+        assert process.exitcode == 0
+
+    assert session.query(IndicatorHashSchema).count() == 2_000
+    with BloomFilter(base_path / IndicatorHashIndex.bloom_filename) as bloom:
+        assert all(
+            IndicatorHashIndex._bloom_key((i['xid'], i['lastModified'])) in bloom
+            for p in range(4)
+            for i in _indicators(f'process-{p}', 500)
+        )
+
+
+def test_rebuild_bloom_threshold(base_path, caplog):
+    """The filter is rebuilt only when the settings change or it reaches the fill ratio."""
+    indicator_hash_index = IndicatorHashIndex(base_path)
+    assert indicator_hash_index.rebuild_bloom(10_000, 0.01) is False
+    assert indicator_hash_index.rebuild_bloom(20_000, 0.01) is True
+    assert indicator_hash_index.rebuild_bloom(20_000, 0.001) is True
+    assert indicator_hash_index.rebuild_bloom(20_000, 0.001) is False
+
+    # 0.8 of the capacity added since the last build
+    indicator_hash_index.add(_indicators('uploaded', 15_999))
+    assert indicator_hash_index.rebuild_bloom(20_000, 0.001) is False
+    indicator_hash_index.add(_indicators('new', 1))
+    assert indicator_hash_index.rebuild_bloom(20_000, 0.001) is True
+    assert 'reason=fill-ratio' in caplog.text
+    assert indicator_hash_index.bloom.capacity == 32_000
+    assert indicator_hash_index.rebuild_bloom(20_000, 0.001) is False
+    indicator_hash_index.close()
+
+    (base_path / IndicatorHashIndex.bloom_filename).unlink()
+    assert IndicatorHashIndex(base_path).rebuild_bloom(20_000, 0.001) is True
@@ -0,0 +1,112 @@
+"""Test the JSON encoding helpers."""
+# standard library
+import json
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+# third-party
+import arrow
+import pytest
+from more import json_util
+from more.json_util import DatetimeEncoder, iter_json_bytes, json_dumps, json_loads
+
+
+class Color(str, Enum):
+    """Enum for test values."""
+
+    red = 'red'
+
+
+MEDIA = {
+    'count': 3,
+    'data': [
+        {
+            'date_added': arrow.get('2023-01-02T03:04:05.123456+00:00'),
+            'date_naive': datetime(2023, 1, 2, 3, 4, 5),
+            'day': date(2023, 1, 2),
+            'duration': timedelta(minutes=1, microseconds=500),
+            'id': 1,
+            'name': 'é unicode ✓',
+            'ratio': 0.25,
+            'tags': ['a', 'b'],
+        },
+        {
+            'date_added': datetime(2023, 1, 2, 3, 4, 5, 6, tzinfo=timezone.utc),
+            'enum': Color.red,
+            'id': 2,
+            'name': None,
+            'uuid': UUID('12345678-1234-5678-1234-567812345678'),
+            'value': Decimal('1.5'),
+        },
+        {'id': 3, 'nested': {'list': [1, 2, {'a': None}]}},
+    ],
+    'next': None,
+}
+
+
+def _stdlib(obj: object) -> object:
+    """Return the object encoded and decoded with the stdlib encoder used before orjson."""
+    return json.loads(json.dumps(obj, cls=DatetimeEncoder))
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def backend(request, monkeypatch):
+    """Run the test with orjson (when installed) and with the stdlib fallback."""
+    if request.param == 'orjson':
+        if json_util.orjson is None:
+            pytest.skip('orjson is not installed')
+    else:
+        monkeypatch.setattr(json_util, 'orjson', None)
+        monkeypatch.setattr(json_util, '_ITEM_SEPARATOR', b', ')
+        monkeypatch.setattr(json_util, '_KEY_SEPARATOR', b': ')
+    return request.param
+
+
+def test_round_trip(backend):
+    """The encoded media decodes to the same values for both backends."""
+    data = json_dumps(MEDIA)
+
+    assert isinstance(data, bytes)
+    assert json_loads(data) == _stdlib(MEDIA)
+    assert json_loads(data.decode()) == json_loads(data)
+
+
+def test_datetime_encoding(backend):
+    """Arrow, datetime, date and timedelta values are encoded like model.json()."""
+    media = json_loads(json_dumps(MEDIA))
+    row_1, row_2 = media['data'][0], media['data'][1]
+
+    assert row_1['date_added'] == '2023-01-02T03:04:05.123456+00:00'
+    assert row_1['date_naive'] == '2023-01-02T03:04:05'
+    assert row_1['day'] == '2023-01-02'
+    assert row_1['duration'] == 60.0005
+    assert row_2['date_added'] == '2023-01-02T03:04:05.000006+00:00'
+    assert row_2['enum'] == 'red'
+    assert row_2['uuid'] == '12345678-1234-5678-1234-567812345678'
+    assert row_2['value'] == 1.5
+
+
+def test_stdlib_fallback_encoder(monkeypatch):
+    """Without orjson the media is encoded with DatetimeEncoder."""
+    monkeypatch.setattr(json_util, 'orjson', None)
+
+    assert json_dumps(MEDIA) == json.dumps(MEDIA, cls=DatetimeEncoder).encode()
+
+
+def test_iter_json_bytes_identical(backend):
+    """The chunked encoding is byte-identical to json_dumps for both backends."""
+    media = dict(MEDIA, data=MEDIA['data'] * 500)
+    chunks = list(iter_json_bytes(media, chunk_size=1_024))
+
+    assert len(chunks) > 1
+    assert b''.join(chunks) == json_dumps(media)
+    assert b''.join(iter_json_bytes(media['data'])) == json_dumps(media['data'])
+    assert b''.join(iter_json_bytes('scalar')) == json_dumps('scalar')
+
+
+def test_unsupported_type_raises(backend):
+    """Types without an encoder raise a TypeError (as with the stdlib encoder)."""
+    with pytest.raises(TypeError):
+        json_dumps({'value': object()})
@@ -0,0 +1,106 @@
+"""Test the paging of the provider SDK."""
+# standard library
+import re
+import threading
+import time
+
+# third-party
+import pytest
+from more import KeysetCursor, ProviderSdk
+
+TQL = 'typeName in ("Address")'
+
+
+class FakeProvider:
+    """Indicators endpoint serving offset and keyset pages of a list of indicators."""
+
+    def __init__(self, count: int):
+        """Initialize class properties."""
+        # ids are not contiguous and many indicators have the same lastModified
+        self.indicators = [
+            {'id': i * 3, 'lastModified': f'2023-01-02T03:04:{i // 250:02d}Z'} for i in range(count)
+        ]
+        self.lock = threading.Lock()
+        self.requests = []
+
+    def get_page(self, tql, owner, offset, count=False, limit=None, sorting=None) -> dict:
+        """Return a page of indicators."""
+        with self.lock:
+            self.requests.append({'offset': offset, 'sorting': sorting, 'tql': tql})
+        # pages finish out of order
+        time.sleep(0.001 * (offset // ProviderSdk.page_size % 3))
+
+        indicators = self.indicators
+        match = re.fullmatch(rf'\({re.escape(TQL)}\) AND id GT (\d+)', tql)
+        if match is not None:
+            indicators = [i for i in indicators if i['id'] > int(match.group(1))]
+        else:
+            assert tql == TQL
+
+        end = offset + (limit or ProviderSdk.page_size)
+        page = {'data': indicators[offset:end]}
+        if count is True:
+            page['count'] = len(indicators)
+        return page
+
+
+@pytest.fixture
+def provider_sdk(monkeypatch):
+    """Return a provider SDK using a fake provider with 2,500 indicators."""
+    monkeypatch.setattr(ProviderSdk, 'page_size', 1_000)
+    provider_sdk = ProviderSdk('https://provider.example.com/api', 'id', 'secret', workers=3)
+    provider_sdk.provider = FakeProvider(2_500)
+    monkeypatch.setattr(provider_sdk, '_get_page', provider_sdk.provider.get_page)
+    return provider_sdk
+
+
+def test_get_all_concurrent(provider_sdk):
+    """The pages are fetched concurrently and yielded in order."""
+    assert list(provider_sdk.get_all(TQL, 'owner')) == provider_sdk.provider.indicators
+    assert sorted(r['offset'] for r in provider_sdk.provider.requests) == [0, 1_000, 2_000]
+
+
+def test_get_all_count_changed(provider_sdk):
+    """Indicators added after the count are fetched, removed indicators end the paging."""
+    provider = provider_sdk.provider
+    indicators = provider.indicators
+    get_page = provider.get_page
+
+    def _get_page_added(tql, owner, offset, count=False, limit=None, sorting=None):
+        page = get_page(tql, owner, offset, count, limit, sorting)
+        if count is True:
+            provider.indicators = indicators + [{'id': 10_000, 'lastModified': 'added'}]
+        return page
+
+    provider_sdk._get_page = _get_page_added
+    assert list(provider_sdk.get_all(TQL, 'owner')) == provider.indicators
+
+    def _get_page_removed(tql, owner, offset, count=False, limit=None, sorting=None):
+        page = get_page(tql, owner, offset, count, limit, sorting)
+        if count is True:
+            provider.indicators = indicators[:1_500]
+        return page
+
+    provider.indicators = indicators
+    provider_sdk._get_page = _get_page_removed
+    assert list(provider_sdk.get_all(TQL, 'owner')) == indicators[:1_500]
+
+
+def test_get_pages_keyset_boundaries(provider_sdk):
+    """Keyset pages follow the id of the last indicator, without skips or duplicates."""
+    pages = list(provider_sdk.get_pages_keyset(TQL, 'owner'))
+
+    assert [len(data) for data, _ in pages] == [1_000, 1_000, 500]
+    assert [cursor for _, cursor in pages] == [
+        KeysetCursor(2_997),
+        KeysetCursor(5_997),
+        KeysetCursor(7_497),
+    ]
+    assert [i for data, _ in pages for i in data] == provider_sdk.provider.indicators
+    assert [r['tql'] for r in provider_sdk.provider.requests] == [
+        TQL,
+        f'({TQL}) AND id GT 2997',
+        f'({TQL}) AND id GT 5997',
+        f'({TQL}) AND id GT 7497',
+    ]
+    assert {r['sorting'] for r in provider_sdk.provider.requests} == {'id ASC'}
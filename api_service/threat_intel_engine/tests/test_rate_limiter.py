@@ -0,0 +1,91 @@
+"""Test the adaptive provider rate limiter."""
+# standard library
+import multiprocessing
+import os
+import threading
+from types import SimpleNamespace
+
+# third-party
+import pytest
+from more import ProviderSdk, RateLimiter
+from more.rate_limiter import _LOCK_HOLDER
+from requests import HTTPError
+
+
+@pytest.fixture
+def rate_limiter():
+    """Return a rate limiter with a latency target of 1 second."""
+    return RateLimiter(rate=10.0, concurrency_max=8, latency_target_seconds=1.0)
+
+
+@pytest.mark.parametrize(
+    'status_code,latency_seconds,reason,rate,concurrency',
+    [
+        (200, 0.1, 'none', 10.1, 8),
+        (200, 5.0, 'latency', 10.0, 4),
+        (400, 5.0, 'none', 10.0, 8),
+        (404, 0.1, 'none', 10.0, 8),
+        (429, 0.1, 'throttled', 5.0, 4),
+        (503, 0.1, 'error', 5.0, 4),
+        (None, 5.0, 'error', 5.0, 4),
+    ],
+)
+def test_record(rate_limiter, status_code, latency_seconds, reason, rate, concurrency):
+    """Only 429s, server errors, timeouts and slow successful responses decrease the limits."""
+    rate_limiter.record(status_code, latency_seconds)
+
+    state = rate_limiter.state
+    assert state['decrease_reason'] == reason
+    assert state['rate'] == rate
+    assert state['concurrency_limit'] == concurrency
+
+
+def test_retry_after_waited_once(rate_limiter):
+    """The Retry-After of a 429 is waited by the rate limiter, not again by the SDK."""
+    rate_limiter.record(429, 0.1, '30')
+    assert rate_limiter.state['backoff_seconds'] > 29
+
+    error = HTTPError(response=SimpleNamespace(status_code=429, headers={'Retry-After': '30'}))
+    provider_sdk = ProviderSdk('https://provider.example.com/api', 'id', 'secret')
+    assert provider_sdk._retry_delay(error, 0) == 30.0
+
+    provider_sdk.rate_limiter = rate_limiter
+    assert provider_sdk._retry_delay(error, 0) == 0.0
+
+
+def _acquire_and_exit(rate_limiter: RateLimiter, held, release):
+    """Take the shared lock and exit without releasing it (run in a forked process)."""
+    with rate_limiter._locked():
+        held.set()
+        release.wait(30)
+        os._exit(0)
+
+
+def test_lock_recovered(rate_limiter, monkeypatch, caplog):
+    """The lock of a live holder is kept, the lock of a killed holder is released."""
+    monkeypatch.setattr(RateLimiter, 'lock_timeout_seconds', 0.1)
+    context = multiprocessing.get_context('fork')
+    held = context.Event()
+    release = context.Event()
+    process = context.Process(target=_acquire_and_exit, args=(rate_limiter, held, release))
+    process.start()
+    assert held.wait(30)
+
+    recorded = threading.Event()
+    thread = threading.Thread(target=lambda: (rate_limiter.record(200, 0.1), recorded.set()))
+    thread.start()
+
+    # the holder is alive, the caller keeps waiting
+    assert recorded.wait(0.5) is False
+    assert f'event=lock-wait, holder={process.pid}' in caplog.text
+    assert 'event=lock-recover' not in caplog.text
+
+    release.set()
+    process.join(30)
+    assert process.exitcode == 0
+    assert recorded.wait(10) is True
+    thread.join(10)
+
+    assert f'event=lock-recover, holder={process.pid}' in caplog.text
+    assert rate_limiter.state['count_requests'] == 1
+    assert rate_limiter._state[_LOCK_HOLDER] == 0
@@ -0,0 +1,130 @@
+"""Test the batch error export endpoint."""
+# standard library
+import csv
+import io
+import json
+
+# third-party
+import falcon
+import falcon.testing
+import pytest
+from api import ReportBatchErrorExportResource
+from api.middleware import ValidationMiddleware
+from schema import BatchErrorSchema
+
+ROW_COUNT = 95
+
+
+@pytest.fixture
+def batch_errors(db):
+    """Add the batch error rows."""
+    with db.begin() as conn:
+        conn.execute(
+            BatchErrorSchema.__table__.insert(),
+            [
+                {
+                    'code': '0x1001',
+                    'message': f'message, "{i}"',
+                    'reason': f'reason\n{i}' if i % 2 else None,
+                    'request_id': 'request-1' if i < 60 else 'request-2',
+                }
+                for i in range(ROW_COUNT)
+            ],
+        )
+
+
+@pytest.fixture
+def resource(monkeypatch):
+    """Return the resource, recording every chunk the export produces."""
+    resource_ = ReportBatchErrorExportResource()
+    resource_.produced = []
+    monkeypatch.setattr(resource_, 'partition_size', 10)
+
+    iter_rows = resource_._iter_rows
+
+    def _iter_rows(statement, export_format):
+        for chunk in iter_rows(statement, export_format):
+            resource_.produced.append(chunk)
+            yield chunk
+
+    monkeypatch.setattr(resource_, '_iter_rows', _iter_rows)
+    return resource_
+
+
+@pytest.fixture
+def app(resource):
+    """Return the falcon app."""
+    app_ = falcon.App(middleware=[ValidationMiddleware()])
+    app_.add_route('/api/report/batch-error/export', resource)
+    return app_
+
+
+def _environ(query_string: str = '') -> dict:
+    """Return a WSGI environ for an export request."""
+    return falcon.testing.create_environ(
+        path='/api/report/batch-error/export', query_string=query_string
+    )
+
+
+@pytest.mark.usefixtures('batch_errors')
+def test_export_is_streamed(app, resource):
+    """The export reaches the caller before the DB rows are read, one chunk per partition."""
+    headers = {}
+
+    def _start_response(_status, headers_, _exc_info=None):
+        headers.update(headers_)
+
+    body = app(_environ(), _start_response)
+
+    # no partition is read before the body is consumed
+    assert resource.produced == []
+    assert 'content-length' not in {k.lower() for k in headers}
+
+    chunks = []
+    for chunk in body:
+        chunks.append(chunk)
+        # the chunks are produced as they are consumed, not built ahead
+        assert len(resource.produced) == len(chunks)
+
+    assert len(chunks) == 10
+    rows = list(csv.reader(io.StringIO(b''.join(chunks).decode())))
+    assert rows[0] == ['id', 'request_id', 'date_added', 'code', 'message', 'reason']
+    assert len(rows) == ROW_COUNT + 1
+    assert rows[2][4:] == ['message, "1"', 'reason\n1']
+
+
+@pytest.mark.usefixtures('batch_errors')
+def test_export_ndjson(app):
+    """The NDJSON export has one JSON document per row."""
+    client = falcon.testing.TestClient(app)
+    result = client.simulate_get(
+        '/api/report/batch-error/export',
+        params={'format': 'ndjson', 'request_id': 'request-2'},
+    )
+
+    lines = result.text.splitlines()
+    assert result.headers['content-type'] == 'application/x-ndjson'
+    assert 'batch-errors-request-2.ndjson' in result.headers['content-disposition']
+    assert len(lines) == ROW_COUNT - 60
+    assert json.loads(lines[0])['reason'] is None
+
+
+@pytest.mark.usefixtures('batch_errors')
+def test_export_max_rows(app, monkeypatch, resource):
+    """The export stops at max_rows rows."""
+    monkeypatch.setattr(resource, 'max_rows', 25)
+    client = falcon.testing.TestClient(app)
+    result = client.simulate_get('/api/report/batch-error/export', params={'format': 'ndjson'})
+
+    ids = [json.loads(line)['id'] for line in result.text.splitlines()]
+    assert len(ids) == 25
+    assert ids == sorted(ids)
+
+
+@pytest.mark.usefixtures('db')
+def test_export_empty(app):
+    """An export without rows returns the CSV header only."""
+    body = app(_environ(), lambda s, h, e=None: None)
+
+    assert b''.join(body) == b'id,request_id,date_added,code,message,reason\r\n'
+    assert b''.join(app(_environ('format=ndjson'), lambda s, h, e=None: None)) == b''
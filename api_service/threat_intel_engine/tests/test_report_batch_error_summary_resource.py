@@ -0,0 +1,109 @@
+"""Test the batch error summary endpoint."""
+# third-party
+import falcon
+import falcon.testing
+import pytest
+from api import ReportBatchErrorSummaryResource
+from api.middleware import DbMiddleware, InjectablesMiddleware, ValidationMiddleware
+from schema import BatchErrorSummarySchema, JobRequestSchema
+
+
+@pytest.fixture
+def client(settings):
+    """Return the test client."""
+    app = falcon.App(
+        middleware=[
+            DbMiddleware(),
+            InjectablesMiddleware(settings=settings),
+            ValidationMiddleware(),
+        ]
+    )
+    app.add_route('/api/report/batch-error/summary', ReportBatchErrorSummaryResource())
+    return falcon.testing.TestClient(app)
+
+
+@pytest.fixture
+def summaries(db, job_request):
+    """Add the summaries of two requests."""
+    with db.begin() as conn:
+        row = dict(
+            conn.execute(
+                JobRequestSchema.__table__.select().where(
+                    JobRequestSchema.request_id == job_request
+                )
+            )
+            .one()
+            ._mapping
+        )
+        row['request_id'] = 'request-2'
+        conn.execute(JobRequestSchema.__table__.insert(), row)
+
+        template = 'Invalid indicator "<value>"'
+        conn.execute(
+            BatchErrorSummarySchema.__table__.insert(),
+            [
+                {
+                    'code': '0x1005',
+                    'count': 3,
+                    'message': 'Invalid Indicator Error',
+                    'reason_template': template,
+                    'request_id': job_request,
+                    'samples': ['Invalid indicator "b"', 'Invalid indicator "c"'],
+                },
+                {
+                    'code': '0x1005',
+                    'count': 4,
+                    'message': 'Invalid Indicator Error',
+                    'reason_template': template,
+                    'request_id': 'request-2',
+                    'samples': ['Invalid indicator "c"', 'Invalid indicator "a"'],
+                },
+                {
+                    'code': 'Unknown',
+                    'count': 10,
+                    'message': None,
+                    'reason_template': '',
+                    'request_id': 'request-2',
+                    'samples': [''],
+                },
+            ],
+        )
+
+
+@pytest.mark.usefixtures('summaries')
+def test_summary_aggregated_across_requests(client, settings):
+    """The counts are summed and the samples merged per code and reason template.
+
+    A summary without message (e.g., an unknown code) is valid, None values are excluded.
+    """
+    settings.batch_error_samples = 2
+    result = client.simulate_get('/api/report/batch-error/summary')
+
+    assert result.status_code == 200
+    assert result.json == [
+        {
+            'code': 'Unknown',
+            'count': 10,
+            'reason_template': '',
+            'request_count': 1,
+            'samples': [''],
+        },
+        {
+            'code': '0x1005',
+            'count': 7,
+            'message': 'Invalid Indicator Error',
+            'reason_template': 'Invalid indicator "<value>"',
+            'request_count': 2,
+            'samples': ['Invalid indicator "b"', 'Invalid indicator "c"'],
+        },
+    ]
+
+
+@pytest.mark.usefixtures('summaries')
+def test_summary_of_request(client, job_request):
+    """The summary is filtered on the request id."""
+    result = client.simulate_get(
+        '/api/report/batch-error/summary', params={'request_id': job_request}
+    )
+
+    assert [(s['code'], s['count'], s['request_count']) for s in result.json] == [('0x1005', 3, 1)]
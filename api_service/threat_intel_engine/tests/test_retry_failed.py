@@ -0,0 +1,63 @@
+"""Test the retry of failed job requests."""
+# standard library
+import os
+
+# third-party
+import pytest
+from more import Checkpoint
+from tasks.download_path_pipe import DownloadPathPipe
+from tasks.retry_failed import RetryFailed
+
+
+@pytest.fixture
+def download(settings, tcex):
+    """Return the download task."""
+    return DownloadPathPipe(settings, tcex, None, None)
+
+
+def _failed_dir(download: DownloadPathPipe, request_id: str, complete: bool):
+    """Return a failed Download request dir with a checkpoint."""
+    failed_dir = download.task_settings.failed_working_dir / (
+        f'h#1#{request_id}{download._failed_suffix}'
+    )
+    checkpoint_file = download._checkpoint_file(failed_dir)
+    checkpoint_file.parent.mkdir(parents=True)
+    Checkpoint(checkpoint_file).set('complete', complete)
+    return failed_dir
+
+
+def test_retry_failed_forked(settings, tcex, monkeypatch):
+    """The retries run in a forked process supervised by the watchdog."""
+    parent = os.getpid()
+    # run inline, the task would exit the test process
+    monkeypatch.setattr(RetryFailed, 'run_task', lambda self: os._exit(0))
+
+    retry_failed = RetryFailed(settings, tcex, None)
+    retry_failed.launch_preflight_checks()
+    retry_failed.process.join(30)
+
+    assert retry_failed.process.pid != parent
+    assert retry_failed.process.exitcode == 0
+    assert retry_failed.ns.heartbeat is not None
+
+
+def test_download_resumes_incomplete_failed_dir(download, job_request):
+    """A failed dir with an incomplete checkpoint is moved back and resumed."""
+    failed_dir = _failed_dir(download, job_request, complete=False)
+
+    request_dir = download._create_request_dir(job_request, 'high')
+
+    assert not failed_dir.exists()
+    assert request_dir.parent == download.task_settings.working_dir_in
+    assert download._checkpoint_file(request_dir).is_file()
+
+
+def test_download_removes_complete_failed_dir(download, job_request):
+    """A failed dir with a complete checkpoint is removed, the request starts over."""
+    failed_dir = _failed_dir(download, job_request, complete=True)
+
+    request_dir = download._create_request_dir(job_request, 'high')
+
+    assert not failed_dir.exists()
+    assert download.failed_request_dir(job_request) is None
+    assert not download._checkpoint_file(request_dir).is_file()
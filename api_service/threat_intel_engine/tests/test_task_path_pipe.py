@@ -0,0 +1,105 @@
+"""Test the streaming hand-off between the tasks of the pipe."""
+# standard library
+import threading
+
+# third-party
+import pytest
+from more import session
+from schema import JobRequestSchema
+from tasks.download_path_pipe import DownloadPathPipe
+
+
+@pytest.fixture
+def producer(settings, tcex, tmp_path):
+    """Return a task publishing its output to the next task as it is written."""
+    producer_ = DownloadPathPipe(settings, tcex, None, None)
+    producer_.task_settings.pipe_task_start = True
+    producer_.task_settings.working_dir_out = tmp_path / 'next_working_dir'
+    producer_.task_settings.working_dir_out.mkdir()
+    return producer_
+
+
+@pytest.fixture
+def consumer(settings, tcex, monkeypatch):
+    """Return a task consuming the output of the producer."""
+    consumer_ = DownloadPathPipe(settings, tcex, None, None)
+    monkeypatch.setattr(consumer_, 'stream_poll_seconds', 0.01)
+    return consumer_
+
+
+def _open(producer: DownloadPathPipe, request_id: str):
+    """Open the stream of a new request dir and return the request and output dir."""
+    producer._task_set_status(request_id, producer.task_settings.status_active, [])
+    request_dir = producer._create_request_dir(request_id, 'high')
+    _, output_dir = producer._task_setup(request_dir)
+    producer._stream_open(request_id, request_dir, output_dir)
+    return request_dir, output_dir
+
+
+def test_consume_while_writing(producer, consumer, job_request):
+    """Files are consumed as they are published, the stream ends at the EOS marker."""
+    request_dir, output_dir = _open(producer, job_request)
+    stream_dir = producer.task_settings.working_dir_out / request_dir.name
+    consumed = threading.Event()
+
+    def _produce():
+        producer._write_results([{'id': 1}], output_dir, 'indicators')
+        # the next file is only written once the first file was consumed
+        assert consumed.wait(10)
+        producer._write_results([{'id': 2}], output_dir, 'indicators')
+        producer._stream_close(job_request, request_dir)
+
+    thread = threading.Thread(target=_produce)
+    thread.start()
+
+    input_files = []
+    for input_file in consumer._input_files(producer._stream_data_dir):
+        input_files.append(input_file)
+        consumed.set()
+    thread.join(10)
+
+    assert len(input_files) == 2
+    assert all(f.parent == stream_dir / output_dir.name for f in input_files)
+    assert (producer._stream_data_dir / producer.stream_eos_file).is_file()
+    # the rest of the request dir was handed off and the request dir removed
+    assert (stream_dir / producer.request_id_file).is_file()
+    assert not request_dir.exists()
+    job = session.get(JobRequestSchema, job_request)
+    assert job.status == producer.task_settings.status_complete
+
+
+def test_consume_after_eos(producer, consumer, job_request):
+    """A stream that is already complete is consumed without waiting."""
+    request_dir, output_dir = _open(producer, job_request)
+    for index in range(3):
+        producer._write_results([{'id': index}], output_dir, f'indicators-{index}')
+    # a file that is written but not published (e.g., a partial chunk) is not consumed
+    (output_dir / 'indicators-partial.json.gz').touch()
+    producer._stream_close(job_request, request_dir)
+
+    input_files = list(consumer._input_files(producer._stream_data_dir))
+
+    assert [f.name.split('#')[-1] for f in input_files] == [
+        f'indicators-{i}.json.gz' for i in range(3)
+    ]
+
+
+def test_upstream_failure(producer, consumer, job_request):
+    """The consumer stops with an error when the producer fails before the EOS marker."""
+    request_dir, output_dir = _open(producer, job_request)
+    producer._write_results([{'id': 1}], output_dir, 'indicators')
+
+    input_files = consumer._input_files(producer._stream_data_dir)
+    assert next(input_files).name.endswith('indicators.json.gz')
+
+    producer._task_complete_failed(job_request, request_dir)
+    with pytest.raises(RuntimeError, match='previous task failed'):
+        next(input_files)
+
+    assert (producer._stream_data_dir / producer.stream_failed_file).is_file()
+    assert session.get(JobRequestSchema, job_request).status == 'failed'
+    assert producer.failed_request_dir(job_request) is not None
+
+    # a retry publishes to the same stream dir and removes the failed marker
+    _open(producer, job_request)
+    assert not (producer._stream_data_dir / producer.stream_failed_file).exists()
@@ -0,0 +1,167 @@
+"""Test the batch error handling of the upload task."""
+# standard library
+import gzip
+import json
+from types import SimpleNamespace
+
+# third-party
+import pytest
+from model import BatchErrorStorage
+from more import DbUtil, HttpPool, session
+from schema import BatchErrorSchema, BatchErrorSummarySchema, BatchSampleSchema, JobRequestSchema
+from tasks import upload_path_pipe
+from tasks.upload_path_pipe import UploadPathPipe
+
+BATCH_ERRORS = [
+    {'errorReason': 'Error (0x1005): Invalid indicator "1.1.1.1" for type Address'},
+    {'errorReason': 'Error (0x1005): Invalid indicator "2.2.2.2" for type Address'},
+    {'errorReason': 'Error (0x100A): Duplicate item'},
+    {'errorReason': 'Something unexpected happened'},
+    {'errorReason': None},
+    {},
+]
+
+
+@pytest.fixture
+def upload(settings, tcex):
+    """Return the upload task."""
+    return UploadPathPipe(settings, tcex, HttpPool())
+
+
+def _batch_errors(upload: UploadPathPipe, request_id: str, tmp_path) -> list:
+    """Run _batch_errors with the BATCH_ERRORS and return the lines of the errors file."""
+    batch_submit = SimpleNamespace(errors=lambda batch_id: BATCH_ERRORS)
+    upload._batch_errors(batch_submit, 1, request_id, tmp_path)
+
+    with gzip.open(tmp_path / f'{request_id}#batch-errors.csv.gz', 'rt') as fh:
+        return fh.read().splitlines()
+
+
+def test_bulk_insert_counts_and_raises(db):
+    """bulk_insert commits per chunk, returns the count and raises when asked to."""
+    records = ({'code': '0x1001', 'reason': str(i)} for i in range(25))
+    assert DbUtil().bulk_insert(session, BatchErrorSchema, records, 'error', chunk_size=10) == 25
+    assert session.query(BatchErrorSchema).count() == 25
+
+    with pytest.raises(Exception):
+        DbUtil().bulk_insert(
+            session, JobRequestSchema, [{'request_id': None}], 'error', raise_exception=True
+        )
+
+
+def test_batch_error_rows(upload, job_request, tmp_path):
+    """The errors are parsed into rows, a missing reason is stored as an empty reason."""
+    # the batch error report and export read the rows, they are stored by default
+    assert upload.settings.batch_error_storage == BatchErrorStorage.full
+
+    assert len(_batch_errors(upload, job_request, tmp_path)) == len(BATCH_ERRORS)
+
+    rows = session.query(BatchErrorSchema).order_by(BatchErrorSchema.id).all()
+    assert [(r.code, r.message, r.reason) for r in rows] == [
+        ('0x1005', 'Invalid Indicator Error', 'Invalid indicator "1.1.1.1" for type Address'),
+        ('0x1005', 'Invalid Indicator Error', 'Invalid indicator "2.2.2.2" for type Address'),
+        ('0x100A', 'Duplicate Item Error', 'Duplicate item'),
+        ('Unknown', 'Unknown', 'Something unexpected happened'),
+        ('Unknown', 'Unknown', ''),
+        ('Unknown', 'Unknown', ''),
+    ]
+    assert session.query(BatchErrorSummarySchema).count() == 0
+    assert session.get(JobRequestSchema, job_request).count_batch_error == len(BATCH_ERRORS)
+
+
+def test_file_and_summaries_independent_of_insert(upload, job_request, tmp_path, monkeypatch):
+    """A failed DB insert does not truncate the errors file or the summaries."""
+    upload.settings.batch_error_storage = BatchErrorStorage.both
+
+    def _bulk_insert(_session, _schema, records, error_description, **_kwargs):
+        # fail after the first record, like a DB error in the first chunk
+        next(iter(records))
+        upload.log.error(error_description)
+        return 0
+
+    monkeypatch.setattr(upload.db, 'bulk_insert', _bulk_insert)
+    lines = _batch_errors(upload, job_request, tmp_path)
+
+    assert len(lines) == len(BATCH_ERRORS)
+    assert lines[0] == BATCH_ERRORS[0]['errorReason']
+    summaries = session.query(BatchErrorSummarySchema).all()
+    assert sum(s.count for s in summaries) == len(BATCH_ERRORS)
+
+
+def test_summary_samples_merged_up_to_cap(upload, job_request, tmp_path):
+    """The samples of an existing summary are merged with new samples, up to the cap."""
+    upload.settings.batch_error_samples = 3
+    upload.settings.batch_error_storage = BatchErrorStorage.summary
+    for index in range(3):
+        batch_errors = [
+            {'errorReason': f'Error (0x1005): Invalid indicator "{index}.{i}" for type Address'}
+            for i in range(2)
+        ]
+        batch_errors.append(batch_errors[0])
+        batch_submit = SimpleNamespace(errors=lambda batch_id, e=batch_errors: e)
+        upload._batch_errors(batch_submit, index, job_request, tmp_path)
+
+    summary = session.query(BatchErrorSummarySchema).one()
+    assert summary.count == 9
+    assert summary.reason_template == 'Invalid indicator "<value>" for type Address'
+    assert summary.samples == [
+        'Invalid indicator "0.0" for type Address',
+        'Invalid indicator "0.1" for type Address',
+        'Invalid indicator "1.0" for type Address',
+    ]
+
+
+def test_summary_only(upload, job_request, tmp_path):
+    """Only the summaries are stored when batch_error_storage is summary."""
+    upload.settings.batch_error_storage = BatchErrorStorage.summary
+
+    _batch_errors(upload, job_request, tmp_path)
+
+    assert session.query(BatchErrorSchema).count() == 0
+    assert session.query(BatchErrorSummarySchema).count() == 4
+
+
+class FakeBatchSubmit:
+    """Batch submit of tcex that completes every batch."""
+
+    def __init__(self, *_args, **_kwargs):
+        """Initialize class properties."""
+
+    def create_job(self, halt_on_error: bool = True) -> int:
+        """Return the batch id."""
+        return 1
+
+    def errors(self, batch_id: int) -> list:
+        """Return the batch errors."""
+        return []
+
+    def poll(self, batch_id: int) -> dict:
+        """Return the status of the batch."""
+        return {
+            'data': {'batchStatus': {'errorCount': 0, 'successIndicatorCount': 3}},
+            'status': 'Success',
+        }
+
+    def submit_data(self, batch_id: int, content: dict) -> dict:
+        """Return the submit response."""
+        return {'status': 'Queued'}
+
+
+def test_submit_batch_records_sample(upload, job_request, tmp_path, monkeypatch):
+    """A submitted batch is recorded as a batch size sample."""
+    monkeypatch.setattr(upload_path_pipe, 'BatchSubmit', FakeBatchSubmit)
+    upload.settings.indicator_dedup_enabled = False
+    upload.session_tc = None
+    upload.tcex.inputs = None
+
+    batch_file = tmp_path / 'batch.json.gz'
+    with gzip.open(batch_file, 'wt') as fh:
+        json.dump({'group': [], 'indicator': [{'summary': f'1.1.1.{i}'} for i in range(3)]}, fh)
+    upload._submit_batch(batch_file, job_request, tmp_path)
+
+    sample = session.query(BatchSampleSchema).one()
+    assert (sample.batch_size, sample.count_success, sample.status) == (3, 3, 'Success')
+    assert sample.request_id == job_request
+    # a batch below half of the size does not change the size
+    assert sample.reason == 'partial'
+    assert sample.batch_size_next == upload.batch_size_controller.size_initial
@@ -0,0 +1,102 @@
+"""Test the response helpers of the validation module."""
+# standard library
+import json
+from types import SimpleNamespace
+from typing import Optional
+
+# third-party
+import arrow
+import falcon
+from more.json_util import DatetimeEncoder
+from more.validation import response_media, response_stream
+from pydantic import BaseModel
+
+
+class RowModel(BaseModel):
+    """Model Definition"""
+
+    date_added: Optional[arrow.Arrow]
+    id: int
+    name: Optional[str]
+
+    class Config:
+        """Pydantic Config"""
+
+        arbitrary_types_allowed = True
+        json_encoders = {arrow.Arrow: lambda v: v.isoformat()}
+
+
+def _params(**kwargs) -> SimpleNamespace:
+    """Return the field filter params of a request."""
+    params = {
+        'exclude_defaults': False,
+        'exclude_filter': None,
+        'exclude_none': False,
+        'exclude_unset': False,
+        'include_filter': None,
+    }
+    params.update(kwargs)
+    return SimpleNamespace(**params)
+
+
+def _rows(count: int) -> list:
+    """Return rows with unicode, null and datetime values."""
+    date_added = arrow.get('2023-01-02T03:04:05.123456+00:00')
+    return [
+        {'date_added': date_added.shift(seconds=i), 'id': i, 'name': f'row-{i}-é'}
+        if i % 3
+        else {'date_added': None, 'id': i, 'name': None}
+        for i in range(count)
+    ]
+
+
+def _legacy_media(rows: list, **kwargs) -> list:
+    """Return the media as built by model.json() followed by json.loads()."""
+    return [json.loads(RowModel(**row).json(**kwargs)) for row in rows]
+
+
+def test_response_media_matches_model_json():
+    """The dict media encodes to the same JSON as model.json()."""
+    rows = _rows(10)
+    media = response_media(None, rows, RowModel, _params(), from_orm=False)
+
+    assert json.loads(json.dumps(media, cls=DatetimeEncoder)) == _legacy_media(rows)
+
+
+def test_response_media_field_filters():
+    """The include/exclude filters are applied to every row."""
+    rows = _rows(4)
+    media = response_media(
+        None,
+        rows,
+        RowModel,
+        _params(exclude_none=True, include_filter={'id', 'name'}),
+        from_orm=False,
+    )
+
+    assert media == _legacy_media(rows, exclude_none=True, include={'id', 'name'})
+    assert all('date_added' not in row for row in media)
+
+
+def test_response_media_paginated():
+    """The paginated envelope drops unset links like PaginatorResponseModel did."""
+    paginator = SimpleNamespace(next_url='/api/next', previous_url=None, total_count=40)
+    media = response_media(None, _rows(5), RowModel, _params(), paginator, from_orm=False)
+
+    assert list(media) == ['count', 'data', 'next', 'total_count']
+    assert media['count'] == 5
+
+
+def test_response_stream_is_chunked_and_identical():
+    """The streamed body is chunked and decodes to the same document as resp.media."""
+    rows = _rows(2_000)
+    paginator = SimpleNamespace(next_url=None, previous_url=None, total_count=2_000)
+    media = response_media(None, rows, RowModel, _params(), paginator, from_orm=False)
+
+    resp = falcon.Response()
+    response_stream(resp, media)
+    chunks = list(resp.stream)
+
+    assert resp.content_type == falcon.MEDIA_JSON
+    assert len(chunks) > 1
+    assert json.loads(b''.join(chunks)) == json.loads(json.dumps(media, cls=DatetimeEncoder))
@@ -0,0 +1,107 @@
+"""Test the validation plan caching of the validation middleware."""
+# standard library
+from typing import Optional
+
+# third-party
+import falcon
+import falcon.testing
+import pytest
+from api.middleware import ValidationMiddleware
+from model import MultipartFormDataModel
+from more import validation
+from pydantic import BaseModel, Extra, Field
+
+
+class QueryParamModel(BaseModel, extra=Extra.forbid):
+    """Params Model"""
+
+    limit: int = Field(10, description='The number of rows.')
+
+
+class FormDataModel(BaseModel):
+    """Form Data Model"""
+
+    file: MultipartFormDataModel = Field(..., description='Multi-part file data.')
+    name: Optional[str] = Field(None, description='The name.')
+
+
+class PlanResource:
+    """Resource with request validation models."""
+
+    validation_models = {
+        'GET': {'request': {'query_params': QueryParamModel}},
+        'POST': {'request': {'form_data': FormDataModel}},
+    }
+
+    def on_get(self, req: falcon.Request, resp: falcon.Response):
+        """Handle GET requests."""
+        resp.media = {'limit': req.context.params.limit}
+
+
+class NoModelResource:
+    """Resource without validation models."""
+
+    def on_get(self, _req: falcon.Request, resp: falcon.Response):
+        """Handle GET requests."""
+        resp.media = {}
+
+
+@pytest.fixture(autouse=True)
+def clear_plans():
+    """Clear the plan cache between tests."""
+    validation._validation_plans.clear()
+    yield
+    validation._validation_plans.clear()
+
+
+def test_plans_compiled_once_per_resource_class(monkeypatch):
+    """The plans are compiled when the route is added and reused for every instance."""
+    compiled = []
+    plan_init = validation.ValidationPlan.__init__
+
+    def _plan_init(self, models):
+        compiled.append(models)
+        plan_init(self, models)
+
+    monkeypatch.setattr(validation.ValidationPlan, '__init__', _plan_init)
+
+    resource = PlanResource()
+    ValidationMiddleware.compile_resource(resource)
+    assert len(compiled) == 2
+
+    plan = validation.validation_plan(resource, 'GET')
+    assert validation.validation_plan(PlanResource(), 'GET') is plan
+    assert plan.request_query_params is QueryParamModel
+    assert len(compiled) == 2
+
+
+def test_plan_resolves_binary_form_fields():
+    """The binary form fields are resolved from the model schema at compile time."""
+    plan = validation.validation_plan(PlanResource(), 'POST')
+
+    assert plan.request_form_data_binary_fields == ['file']
+
+
+def test_plan_none_is_cached():
+    """Resources and methods without models cache None."""
+    assert validation.validation_plan(NoModelResource(), 'GET') is None
+    assert validation.validation_plan(PlanResource(), 'DELETE') is None
+    assert (NoModelResource, 'GET') in validation._validation_plans
+    assert (PlanResource, 'DELETE') in validation._validation_plans
+
+
+def test_requests_validated_with_cached_plan(monkeypatch):
+    """Requests are validated with the cached plan, without building a new plan."""
+    app = falcon.App(middleware=[ValidationMiddleware()])
+    app.add_route('/plan', PlanResource())
+    ValidationMiddleware.compile_resource(PlanResource())
+
+    def _plan_init(_self, _models):
+        raise AssertionError('validation plan compiled in the request path')
+
+    monkeypatch.setattr(validation.ValidationPlan, '__init__', _plan_init)
+    client = falcon.testing.TestClient(app)
+
+    assert client.simulate_get('/plan', params={'limit': '5'}).json == {'limit': 5}
+    assert client.simulate_get('/plan').json == {'limit': 10}
+    assert client.simulate_get('/plan', params={'bad': '1'}).status_code == 400